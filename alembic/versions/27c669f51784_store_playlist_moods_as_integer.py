@@ -0,0 +1,46 @@
+"""store playlist moods as integer
+
+Revision ID: 27c669f51784
+Revises: 410b66ae6f21
+Create Date: 2026-10-18 14:05:12.481736
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '27c669f51784'
+down_revision: Union[str, Sequence[str], None] = '410b66ae6f21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema: convert pre_mood/post_mood to integer, non-numeric values become NULL."""
+    for column in ('pre_mood', 'post_mood'):
+        op.alter_column(
+            'playlist',
+            column,
+            existing_type=sa.String(length=50),
+            type_=sa.Integer(),
+            existing_nullable=True,
+            postgresql_using=(
+                f"CASE WHEN trim({column}) ~ '^-?[0-9]+$' THEN trim({column})::integer END"
+            ),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema: convert pre_mood/post_mood back to varchar."""
+    for column in ('pre_mood', 'post_mood'):
+        op.alter_column(
+            'playlist',
+            column,
+            existing_type=sa.Integer(),
+            type_=sa.String(length=50),
+            existing_nullable=True,
+            postgresql_using=f"{column}::varchar",
+        )
@@ -0,0 +1,73 @@
+"""create user stats tables
+
+Revision ID: 3bb2e31cac0f
+Revises: 27c669f51784
+Create Date: 2026-10-18 14:48:03.652190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3bb2e31cac0f'
+down_revision: Union[str, Sequence[str], None] = '27c669f51784'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema: create user_stats/user_genre_stats and backfill them from existing playlists."""
+    op.create_table(
+        "user_stats",
+        sa.Column("spotify_id", sa.String(255), sa.ForeignKey("user.spotify_id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("session_count", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("mood_delta_sum", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("mood_delta_count", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("most_frequent_genre", sa.String(255), nullable=True),
+        sa.Column("updated_at", sa.DateTime, nullable=False, server_default=sa.func.now()),
+    )
+    op.create_table(
+        "user_genre_stats",
+        sa.Column("spotify_id", sa.String(255), sa.ForeignKey("user.spotify_id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("name", sa.String(255), primary_key=True),
+        sa.Column("count", sa.Integer, nullable=False, server_default="0"),
+    )
+
+    op.execute(
+        """
+        INSERT INTO user_stats (spotify_id, session_count, mood_delta_sum, mood_delta_count, updated_at)
+        SELECT spotify_id, COUNT(*), COALESCE(SUM(post_mood - pre_mood), 0), COUNT(post_mood - pre_mood), now()
+        FROM playlist
+        GROUP BY spotify_id
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO user_genre_stats (spotify_id, name, count)
+        SELECT p.spotify_id, g.name, COUNT(*)
+        FROM playlist_genre g
+        JOIN playlist p ON p.id = g.playlist_id
+        GROUP BY p.spotify_id, g.name
+        """
+    )
+    op.execute(
+        """
+        UPDATE user_stats s
+        SET most_frequent_genre = (
+            SELECT g.name
+            FROM user_genre_stats g
+            WHERE g.spotify_id = s.spotify_id
+            ORDER BY g.count DESC, g.name
+            LIMIT 1
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("user_genre_stats")
+    op.drop_table("user_stats")
@@ -0,0 +1,43 @@
+"""add playlist_seq counter to user
+
+Revision ID: 410b66ae6f21
+Revises: 5735d02e0d66
+Create Date: 2026-10-18 11:20:37.905114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '410b66ae6f21'
+down_revision: Union[str, Sequence[str], None] = '5735d02e0d66'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema: add per-user playlist sequence counter, seeded from existing playlists."""
+    op.add_column(
+        'user',
+        sa.Column('playlist_seq', sa.Integer(), nullable=False, server_default='0')
+    )
+    op.execute(
+        """
+        UPDATE "user" u
+        SET playlist_seq = seq.max_seq
+        FROM (
+            SELECT spotify_id, MAX(sequence_number) AS max_seq
+            FROM playlist
+            GROUP BY spotify_id
+        ) seq
+        WHERE seq.spotify_id = u.spotify_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema: drop playlist_seq column."""
+    op.drop_column('user', 'playlist_seq')
@@ -0,0 +1,49 @@
+"""create playlist job table
+
+Revision ID: 5735d02e0d66
+Revises: a0f2a21a8396
+Create Date: 2026-10-18 10:02:11.504127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5735d02e0d66'
+down_revision: Union[str, Sequence[str], None] = 'a0f2a21a8396'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "playlist_job",
+        sa.Column("id", sa.String(255), primary_key=True),
+        sa.Column("spotify_id", sa.String(255), sa.ForeignKey("user.spotify_id", ondelete="CASCADE"), nullable=False),
+        sa.Column("pre_mood", sa.Integer, nullable=False),
+        sa.Column("phq9_score", sa.Integer, nullable=False),
+        sa.Column("status", sa.String(20), nullable=False, server_default="queued"),
+        sa.Column("playlist_id", sa.String(255), sa.ForeignKey("playlist.id", ondelete="SET NULL"), nullable=True),
+        sa.Column("error", sa.Text, nullable=True),
+        sa.Column("attempts", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("started_at", sa.DateTime, nullable=True),
+        sa.Column("heartbeat_at", sa.DateTime, nullable=True),
+        sa.Column("finished_at", sa.DateTime, nullable=True),
+        sa.Column("created_at", sa.DateTime, nullable=False, server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime, nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index("ix_playlist_job_status_created_at", "playlist_job", ["status", "created_at"])
+    op.create_index("ix_playlist_job_spotify_id", "playlist_job", ["spotify_id"])
+    op.create_index("ix_playlist_job_playlist_id", "playlist_job", ["playlist_id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_playlist_job_playlist_id", table_name="playlist_job")
+    op.drop_index("ix_playlist_job_spotify_id", table_name="playlist_job")
+    op.drop_index("ix_playlist_job_status_created_at", table_name="playlist_job")
+    op.drop_table("playlist_job")
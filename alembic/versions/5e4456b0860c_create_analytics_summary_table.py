@@ -0,0 +1,38 @@
+"""create analytics summary table
+
+Revision ID: 5e4456b0860c
+Revises: 620ce4e45431
+Create Date: 2026-10-18 17:21:37.418305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e4456b0860c'
+down_revision: Union[str, Sequence[str], None] = '620ce4e45431'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema: create analytics_summary, filled by `python -m app.command.refresh_analytics`."""
+    op.create_table(
+        "analytics_summary",
+        sa.Column("dimension", sa.String(32), primary_key=True),
+        sa.Column("bucket", sa.String(255), primary_key=True),
+        sa.Column("session_count", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("user_count", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("mood_delta_sum", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("mood_delta_count", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("improved_count", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("computed_at", sa.DateTime, nullable=False, server_default=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("analytics_summary")
@@ -0,0 +1,75 @@
+"""add indexes for query patterns
+
+Revision ID: 620ce4e45431
+Revises: 3bb2e31cac0f
+Create Date: 2026-10-18 16:02:51.274309
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '620ce4e45431'
+down_revision: Union[str, Sequence[str], None] = '3bb2e31cac0f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema: index foreign keys, refresh-token lookup, the genre join and playlist per user."""
+    # Model sudah mendeklarasikan uq_playlist_user_seq, tapi belum pernah dibuat oleh migration.
+    # Index-nya yang melayani semua query playlist per user (list, versi, chart, statistik).
+    constraints = sa.inspect(op.get_bind()).get_unique_constraints('playlist')
+    if not any(constraint['name'] == 'uq_playlist_user_seq' for constraint in constraints):
+        # Nomor urut lama dialokasikan dengan max+1 tanpa lock, jadi bisa ada duplikat:
+        # nomori ulang sesi user yang terkena, urut berdasarkan nomor lama lalu waktu dibuat
+        op.execute(
+            """
+            UPDATE playlist p
+            SET sequence_number = ranked.seq
+            FROM (
+                SELECT id, ROW_NUMBER() OVER (
+                    PARTITION BY spotify_id ORDER BY sequence_number, created_at, id
+                ) AS seq
+                FROM playlist
+                WHERE spotify_id IN (
+                    SELECT spotify_id FROM playlist
+                    GROUP BY spotify_id, sequence_number
+                    HAVING COUNT(*) > 1
+                )
+            ) ranked
+            WHERE ranked.id = p.id AND p.sequence_number <> ranked.seq
+            """
+        )
+        op.execute(
+            """
+            UPDATE "user" u
+            SET playlist_seq = GREATEST(u.playlist_seq, seq.max_seq)
+            FROM (
+                SELECT spotify_id, MAX(sequence_number) AS max_seq
+                FROM playlist
+                GROUP BY spotify_id
+            ) seq
+            WHERE seq.spotify_id = u.spotify_id
+            """
+        )
+        op.create_unique_constraint('uq_playlist_user_seq', 'playlist', ['spotify_id', 'sequence_number'])
+
+    # FK ke playlist: dipakai saat memuat track/genre per playlist dan untuk ON DELETE CASCADE
+    op.create_index('ix_playlist_track_playlist_id', 'playlist_track', ['playlist_id'])
+    # (playlist_id, name) juga melayani join genre dashboard/statistik tanpa membaca tabel
+    op.create_index('ix_playlist_genre_playlist_id_name', 'playlist_genre', ['playlist_id', 'name'])
+    # refresh_token hanya dicari dengan "=", hash index tetap kecil walau token panjang
+    op.create_index('ix_user_refresh_token_hash', 'user', ['refresh_token'], postgresql_using='hash')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # upgrade() melewati constraint yang sudah ada, jadi di sini juga tidak boleh gagal bila tidak ada
+    op.execute('ALTER TABLE playlist DROP CONSTRAINT IF EXISTS uq_playlist_user_seq')
+    op.drop_index('ix_user_refresh_token_hash', table_name='user')
+    op.drop_index('ix_playlist_genre_playlist_id_name', table_name='playlist_genre')
+    op.drop_index('ix_playlist_track_playlist_id', table_name='playlist_track')
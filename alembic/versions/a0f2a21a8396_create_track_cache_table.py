@@ -0,0 +1,39 @@
+"""create track cache table
+
+Revision ID: a0f2a21a8396
+Revises: 8a1b2c3d4e5f
+Create Date: 2026-10-18 09:12:40.118273
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a0f2a21a8396'
+down_revision: Union[str, Sequence[str], None] = '8a1b2c3d4e5f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "track_cache",
+        sa.Column("cache_key", sa.String(40), primary_key=True),
+        sa.Column("title", sa.String(255), nullable=False),
+        sa.Column("artist", sa.String(255), nullable=False),
+        sa.Column("market", sa.String(10), nullable=False),
+        sa.Column("uri", sa.String(255), nullable=True),
+        sa.Column("duration_ms", sa.Integer, nullable=True),
+        sa.Column("expires_at", sa.DateTime, nullable=False),
+        sa.Column("created_at", sa.DateTime, nullable=False, server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime, nullable=False, server_default=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("track_cache")
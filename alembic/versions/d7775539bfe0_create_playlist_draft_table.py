@@ -0,0 +1,45 @@
+"""create playlist draft table
+
+Revision ID: d7775539bfe0
+Revises: 5e4456b0860c
+Create Date: 2026-10-18 18:05:12.904731
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7775539bfe0'
+down_revision: Union[str, Sequence[str], None] = '5e4456b0860c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema: create playlist_draft, filled by `python -m app.command.refill_playlist_drafts`."""
+    op.create_table(
+        "playlist_draft",
+        sa.Column("id", sa.String(255), primary_key=True),
+        sa.Column("mood_bucket", sa.Integer, nullable=False),
+        sa.Column("depression_level", sa.String(50), nullable=False),
+        sa.Column("location", sa.String(100), nullable=False),
+        sa.Column("title", sa.String(255), nullable=False),
+        sa.Column("description", sa.Text, nullable=True),
+        sa.Column("tracks", sa.JSON, nullable=False),
+        sa.Column("genres", sa.JSON, nullable=False),
+        sa.Column("created_at", sa.DateTime, nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index(
+        "ix_playlist_draft_bucket",
+        "playlist_draft",
+        ["mood_bucket", "depression_level", "location", "created_at"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_playlist_draft_bucket", table_name="playlist_draft")
+    op.drop_table("playlist_draft")
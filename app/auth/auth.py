@@ -1,11 +1,18 @@
+import hmac
+
 from fastapi import Depends, HTTPException, status, Header
 from fastapi.security import OAuth2PasswordBearer, HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
+from requests.exceptions import RequestException
 
-from ..config.database import get_db
+from ..config.config import ADMIN_API_KEY
+from ..config.database import get_async_db
 from ..model.user import UserModel
 from ..service import service_user
+from . import auth_cache
 
 # Untuk dokumentasi OpenAPI dan form login
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/users/login", auto_error=False)
@@ -24,11 +31,51 @@ async def get_token_from_header(authorization: Optional[str] = Header(None)):
     return None
 
 
+def _is_transient_spotify_error(error: Exception) -> bool:
+    """Rate limiting, Spotify server errors and network failures say nothing about the token itself"""
+    if isinstance(error, RequestException):
+        return True
+    http_status = getattr(error, "http_status", None)
+    return http_status is not None and (http_status == 429 or http_status >= 500)
+
+
+def _validate_token_with_spotify(access_token: str) -> str:
+    print(f"Validating token with Spotify API...")
+    try:
+        spotify_profile = service_user.get_user_profile(access_token)
+    except Exception as e:
+        # Saat Spotify membatasi request, pakai hasil validasi sebelumnya yang masih dalam batas stale
+        stale_spotify_id = auth_cache.get_spotify_id(access_token, allow_stale=True) if _is_transient_spotify_error(e) else None
+        if stale_spotify_id:
+            print(f"Spotify unavailable ({str(e)}), using cached validation for {stale_spotify_id}")
+            return stale_spotify_id
+        raise
+
+    spotify_id = spotify_profile.get("id")
+    if not spotify_id:
+        print("Failed to get Spotify ID from profile")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid Spotify token",
+        )
+
+    auth_cache.set_spotify_id(access_token, spotify_id)
+    return spotify_id
+
+
+def _resolve_spotify_id(access_token: str) -> str:
+    # Validasi token dengan Spotify API, kecuali token baru saja divalidasi
+    spotify_id = auth_cache.get_spotify_id(access_token)
+    if spotify_id is None:
+        spotify_id = _validate_token_with_spotify(access_token)
+    return spotify_id
+
+
 async def get_current_user(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
     token: Optional[str] = Depends(oauth2_scheme),
     header_token: Optional[str] = Depends(get_token_from_header),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get current user from access token in Authorization header and validate with Spotify API
@@ -57,24 +104,22 @@ async def get_current_user(
     
     print(f"Received token: {access_token[:10]}...")
     
+    # Token yang baru divalidasi membawa data user dari cache, tanpa query ke tabel user
+    cached_user = await run_in_threadpool(auth_cache.get_user, access_token)
+    if cached_user is not None:
+        return UserModel(**cached_user, access_token=access_token)
+
     try:
-        # Validasi token dengan Spotify API
-        print(f"Validating token with Spotify API...")
-        spotify_profile = service_user.get_user_profile(access_token)
-        spotify_id = spotify_profile.get("id")
-        
-        if not spotify_id:
-            print("Failed to get Spotify ID from profile")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid Spotify token",
-            )
+        # Validasi token (cache / Spotify API) berjalan di threadpool agar tidak memblokir event loop
+        spotify_id = await run_in_threadpool(_resolve_spotify_id, access_token)
             
         # Cari user berdasarkan spotify_id
-        user = db.query(UserModel).filter(UserModel.spotify_id == spotify_id).first()
+        result = await db.execute(select(UserModel).where(UserModel.spotify_id == spotify_id))
+        user = result.scalars().first()
         
         if not user:
             print(f"User with Spotify ID {spotify_id} not found in database")
+            await run_in_threadpool(auth_cache.invalidate, access_token)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="User not found",
@@ -84,8 +129,12 @@ async def get_current_user(
         if user.access_token != access_token:
             print(f"Updating access token for user {user.spotify_id}")
             user.access_token = access_token
-            db.commit()
-            db.refresh(user)
+            await db.commit()
+            await db.refresh(user)
+        
+        # Akhiri transaksi agar koneksi kembali ke pool selama endpoint berjalan
+        await db.commit()
+        await run_in_threadpool(auth_cache.set_user, access_token, user)
         
         print(f"Successfully authenticated user: {user.name} with Spotify ID: {spotify_id}")
         return user
@@ -104,4 +153,20 @@ async def get_current_user(
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid authentication credentials",
-            )
\ No newline at end of file
+            )
+
+
+async def require_admin_key(x_admin_key: Optional[str] = Header(None)):
+    """
+    Guard for /api/admin endpoints: the X-Admin-Key header must match ADMIN_API_KEY.
+    """
+    if not ADMIN_API_KEY:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Not Found",
+        )
+    if not x_admin_key or not hmac.compare_digest(x_admin_key.encode("utf-8"), ADMIN_API_KEY.encode("utf-8")):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid admin key",
+        )
@@ -0,0 +1,167 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, NamedTuple, Optional
+
+from ..config.config import AUTH_CACHE_SIZE, AUTH_CACHE_STALE_TTL, AUTH_CACHE_TTL
+from ..config.redis import get_redis, mark_redis_down
+
+_REDIS_PREFIX = "auth:token:"
+
+# Kolom user yang disimpan bersama token, cukup untuk endpoint tanpa query tabel user
+USER_FIELDS = ("spotify_id", "email", "name")
+
+
+class AuthCacheEntry(NamedTuple):
+    spotify_id: str
+    validated_at: float
+    user: Optional[Dict[str, Any]] = None
+
+
+_entries: "OrderedDict[str, AuthCacheEntry]" = OrderedDict()
+_lock = threading.Lock()
+_stats = {
+    "memory_hits": 0,
+    "redis_hits": 0,
+    "stale_hits": 0,
+    "misses": 0,
+}
+
+
+def token_hash(access_token: str) -> str:
+    """Tokens are never stored as-is, only their SHA-256 digest"""
+    return hashlib.sha256(access_token.encode("utf-8")).hexdigest()
+
+
+def _count(name: str) -> None:
+    with _lock:
+        _stats[name] += 1
+
+
+def _remember(key: str, entry: AuthCacheEntry) -> None:
+    with _lock:
+        _entries[key] = entry
+        _entries.move_to_end(key)
+        while len(_entries) > AUTH_CACHE_SIZE:
+            _entries.popitem(last=False)
+
+
+def _get_entry(key: str) -> Optional[AuthCacheEntry]:
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None:
+            _entries.move_to_end(key)
+    if entry is not None:
+        return entry
+
+    client = get_redis()
+    if client is None:
+        return None
+    try:
+        raw = client.get(_REDIS_PREFIX + key)
+    except Exception as e:
+        mark_redis_down(e)
+        return None
+    if not raw:
+        return None
+
+    data = json.loads(raw)
+    entry = AuthCacheEntry(spotify_id=data["spotify_id"], validated_at=data["validated_at"], user=data.get("user"))
+    _remember(key, entry)
+    return entry
+
+
+def get_spotify_id(access_token: str, allow_stale: bool = False) -> Optional[str]:
+    """
+    Return the spotify_id a token was validated for within AUTH_CACHE_TTL seconds.
+    With allow_stale, entries up to AUTH_CACHE_STALE_TTL old are accepted as well;
+    this is only used when Spotify itself cannot be reached or is throttling us.
+    """
+    key = token_hash(access_token)
+    in_memory = key in _entries
+    entry = _get_entry(key)
+    if entry is None:
+        if not allow_stale:
+            _count("misses")
+        return None
+
+    age = time.time() - entry.validated_at
+    if age <= AUTH_CACHE_TTL:
+        _count("memory_hits" if in_memory else "redis_hits")
+        return entry.spotify_id
+    if allow_stale and age <= AUTH_CACHE_STALE_TTL:
+        _count("stale_hits")
+        return entry.spotify_id
+
+    if not allow_stale:
+        _count("misses")
+    return None
+
+
+def get_user(access_token: str) -> Optional[Dict[str, Any]]:
+    """
+    Return the cached user fields (USER_FIELDS) for a token validated within
+    AUTH_CACHE_TTL seconds, or None when the user row still has to be loaded.
+    """
+    key = token_hash(access_token)
+    in_memory = key in _entries
+    entry = _get_entry(key)
+    if entry is None or entry.user is None or time.time() - entry.validated_at > AUTH_CACHE_TTL:
+        return None
+    _count("memory_hits" if in_memory else "redis_hits")
+    return dict(entry.user)
+
+
+def set_spotify_id(access_token: str, spotify_id: str) -> None:
+    _store(token_hash(access_token), AuthCacheEntry(spotify_id=spotify_id, validated_at=time.time()))
+
+
+def set_user(access_token: str, user) -> None:
+    """Attach the user's fields to the token's entry, keeping its validation time"""
+    key = token_hash(access_token)
+    entry = _get_entry(key)
+    if entry is None or entry.spotify_id != user.spotify_id:
+        return
+    _store(key, entry._replace(user={field: getattr(user, field) for field in USER_FIELDS}))
+
+
+def _store(key: str, entry: AuthCacheEntry) -> None:
+    _remember(key, entry)
+
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        client.set(
+            _REDIS_PREFIX + key,
+            json.dumps(entry._asdict()),
+            ex=max(AUTH_CACHE_TTL, AUTH_CACHE_STALE_TTL),
+        )
+    except Exception as e:
+        mark_redis_down(e)
+
+
+def invalidate(access_token: Optional[str]) -> None:
+    if not access_token:
+        return
+    key = token_hash(access_token)
+    with _lock:
+        _entries.pop(key, None)
+
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        client.delete(_REDIS_PREFIX + key)
+    except Exception as e:
+        mark_redis_down(e)
+
+
+def get_stats() -> Dict:
+    with _lock:
+        stats = dict(_stats)
+        stats["memory_entries"] = len(_entries)
+    stats["redis_enabled"] = get_redis() is not None
+    return stats
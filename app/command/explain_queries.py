@@ -0,0 +1,265 @@
+"""
+Jalankan EXPLAIN untuk setiap query yang dikirim oleh service dan gagal bila ada Seq Scan
+pada tabel besar.
+
+Jalankan dengan: python -m app.command.explain_queries [--users N] [--playlists N] [--min-rows N]
+
+Butuh PostgreSQL (GROUPING SETS, FOR UPDATE SKIP LOCKED, server-side cursor). Data contoh
+di-seed dan semua service dijalankan dalam satu transaksi yang di-rollback di akhir, jadi
+database yang dipakai tidak berubah. Commit dari service hanya melepas savepoint.
+
+Statement yang benar-benar dikirim ke database direkam lalu di-EXPLAIN dua kali:
+- plan biasa menentukan lulus/gagal: gagal bila planner memilih Seq Scan pada tabel dengan
+  paling sedikit --min-rows baris (tabel kecil memang lebih murah dibaca utuh);
+- plan dengan enable_seqscan=off hanya dilaporkan: Seq Scan yang tersisa berarti tidak ada
+  index yang bisa dipakai sama sekali, walau tabelnya sekarang masih kecil.
+Query batch (refresh analytics) memang membaca seluruh tabel dan hanya dilaporkan.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+from dotenv import find_dotenv, load_dotenv
+
+load_dotenv(find_dotenv())
+
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.database import async_engine
+from app.model.playlist import PlaylistModel
+from app.model.playlist_genre import PlaylistGenreModel
+from app.model.playlist_job import PlaylistJobModel
+from app.model.playlist_track import PlaylistTrackModel
+from app.model.user import UserModel
+from app.schemas.schemas_playlist import PlaylistCreate
+from app.service import (
+    service_analytics,
+    service_playlist,
+    service_playlist_draft,
+    service_playlist_export,
+    service_playlist_job,
+    service_track_cache,
+    service_user,
+    service_user_stats,
+)
+
+GENRES = ["pop", "indie", "jazz", "lofi", "acoustic", "rock"]
+_EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+_TABLES = ("user", "playlist", "playlist_track", "playlist_genre", "playlist_job", "track_cache",
+           "playlist_draft", "user_stats", "user_genre_stats", "analytics_summary")
+
+
+async def seed(conn, users: int, playlists: int) -> List[str]:
+    now = datetime.now()
+    spotify_ids = [f"explain-{uuid.uuid4()}" for _ in range(users)]
+    await conn.execute(insert(UserModel.__table__), [
+        {
+            "spotify_id": spotify_id,
+            "email": f"{spotify_id}@example.com",
+            "name": spotify_id,
+            "access_token": f"access-{spotify_id}",
+            "refresh_token": f"refresh-{spotify_id}",
+            "playlist_seq": playlists,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for spotify_id in spotify_ids
+    ])
+
+    for spotify_id in spotify_ids:
+        playlist_rows, track_rows, genre_rows = [], [], []
+        for seq in range(1, playlists + 1):
+            playlist_id = str(uuid.uuid4())
+            created_at = now - timedelta(days=playlists - seq)
+            playlist_rows.append({
+                "id": playlist_id,
+                "spotify_id": spotify_id,
+                "name": f"Playlist {seq}",
+                "phq9_score": seq % 27,
+                "depression_level": "Ringan",
+                "pre_mood": seq % 10,
+                "post_mood": (seq + 2) % 10 if seq % 3 else None,
+                "duration": 1800000,
+                "total_tracks": 10,
+                "link_playlist": "https://open.spotify.com/playlist/explain",
+                "mode": "healing",
+                "sequence_number": seq,
+                "created_at": created_at,
+                "updated_at": created_at,
+            })
+            track_rows += [
+                {"id": str(uuid.uuid4()), "name": f"Track {i}", "artist": "Artist", "duration": 180000,
+                 "playlist_id": playlist_id, "created_at": created_at, "updated_at": created_at}
+                for i in range(10)
+            ]
+            genre_rows += [
+                {"id": str(uuid.uuid4()), "name": GENRES[(seq + i) % len(GENRES)],
+                 "playlist_id": playlist_id, "created_at": created_at, "updated_at": created_at}
+                for i in range(3)
+            ]
+        await conn.execute(insert(PlaylistModel.__table__), playlist_rows)
+        await conn.execute(insert(PlaylistTrackModel.__table__), track_rows)
+        await conn.execute(insert(PlaylistGenreModel.__table__), genre_rows)
+
+    await conn.execute(insert(PlaylistJobModel.__table__), [
+        {"id": str(uuid.uuid4()), "spotify_id": spotify_id, "pre_mood": 5, "phq9_score": 7,
+         "status": service_playlist_job.JOB_DONE, "attempts": 1, "created_at": now, "updated_at": now}
+        for spotify_id in spotify_ids
+    ])
+    return spotify_ids
+
+
+async def run_services(db: AsyncSession, spotify_ids: List[str]) -> None:
+    """Call every service function that talks to the database (Spotify/AI calls excluded)"""
+    spotify_id = spotify_ids[0]
+
+    await db.run_sync(lambda session: service_user_stats.rebuild_user_stats(session, spotify_id))
+    await db.run_sync(lambda session: service_user.get_user_by_spotify_id(session, spotify_id))
+    await db.run_sync(lambda session: service_user.get_user_by_refresh_token(session, f"refresh-{spotify_id}"))
+    await db.run_sync(lambda session: service_user.create_or_update_user(
+        session,
+        {"access_token": f"access-{spotify_id}", "refresh_token": f"refresh-{spotify_id}"},
+        {"id": spotify_id, "email": f"{spotify_id}@example.com", "display_name": spotify_id},
+    ))
+
+    keys = [service_track_cache.make_cache_key(f"Track {i}", "Artist", "ID") for i in range(5)]
+    await db.run_sync(lambda session: service_track_cache.lookup_many(session, keys))
+    await db.run_sync(lambda session: service_track_cache.store_many([
+        {"cache_key": key, "title": "Track", "artist": "Artist", "market": "ID",
+         "uri": "spotify:track:explain", "duration_ms": 180000}
+        for key in keys
+    ], db=session))
+
+    await db.run_sync(lambda session: service_playlist_draft.claim_draft(session, 4, "Ringan", "Indonesia"))
+    await db.run_sync(service_playlist_draft.get_pool_size)
+
+    created = await db.run_sync(lambda session: service_playlist.save_playlist(
+        session,
+        PlaylistCreate(id=str(uuid.uuid4()), spotify_id=spotify_id, name="Explain", phq9_score=7,
+                       depression_level="Ringan", pre_mood=4, total_tracks=1, duration=180000, mode="healing"),
+        [{"title": "Track", "artist": "Artist", "duration": 180000}],
+        ["pop", "jazz"],
+    ))
+
+    playlists, next_cursor = await service_playlist.get_all_playlists(db, spotify_id, limit=5, include=("tracks", "genres"))
+    await service_playlist.get_all_playlists(db, spotify_id, limit=5, cursor=next_cursor)
+    await service_playlist.get_playlists_page_version(db, spotify_id, limit=5, cursor=next_cursor)
+    await service_playlist.get_playlist_version(db, created.id)
+    await service_playlist.get_user_playlists_version(db, spotify_id)
+    await service_playlist.get_playlist_by_id(db, created.id)
+    await service_playlist.update_playlist(db, created.id, post_mood=7, feedback="explain")
+    await service_playlist.get_dashboard_data(db, spotify_id)
+    await service_playlist.get_chart_mood(db, spotify_id, max_points=10, days=30)
+
+    job = await service_playlist_job.submit_job(db, spotify_id, 4, 7)
+    await service_playlist_job.get_job(db, job.id)
+    claimed = await db.run_sync(lambda session: service_playlist_job.claim_next_job(session))
+    if claimed is not None:
+        await db.run_sync(lambda session: service_playlist_job.heartbeat(session, claimed.id, claimed.attempts))
+        await db.run_sync(lambda session: service_playlist_job.complete_job(session, claimed.id, claimed.attempts, created.id))
+        await db.run_sync(lambda session: service_playlist_job.fail_job(session, claimed.id, claimed.attempts, "explain"))
+
+    async for _ in service_playlist_export.export_playlists(spotify_id, "ndjson", db=db):
+        pass
+
+    for dimension in (None, *service_analytics.DIMENSIONS):
+        await service_analytics.get_analytics(db, dimension)
+
+    await service_playlist.get_playlist_detail(db, created.id)
+    await service_playlist.delete_playlist(db, playlists[-1]["id"])
+
+
+async def run_batch_jobs(db: AsyncSession) -> None:
+    """Jobs that aggregate every row on purpose; their scans are reported, not failed"""
+    await db.run_sync(service_analytics.refresh_analytics)
+
+
+def seq_scans(plan: Dict) -> List[str]:
+    found = []
+    if plan.get("Node Type") == "Seq Scan":
+        found.append(plan.get("Relation Name", "?"))
+    for child in plan.get("Plans", []):
+        found += seq_scans(child)
+    return found
+
+
+async def explain(conn, statement: str, parameters) -> List[str]:
+    result = await conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters)
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return sorted(set(seq_scans(plan[0]["Plan"])))
+
+
+async def main(users: int, playlists: int, min_rows: int) -> int:
+    captured: Dict[str, Tuple] = {}
+    capturing = None
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if capturing and not executemany and statement.lstrip().upper().startswith(_EXPLAINABLE):
+            captured.setdefault(statement, (parameters, capturing))
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", capture)
+    failures = unindexed = 0
+    try:
+        async with async_engine.connect() as conn:
+            await conn.begin()
+            try:
+                spotify_ids = await seed(conn, users, playlists)
+                await conn.exec_driver_sql("ANALYZE " + ", ".join(f'"{table}"' for table in _TABLES))
+                result = await conn.exec_driver_sql(
+                    "SELECT relname, reltuples FROM pg_class WHERE relname = ANY($1) AND relkind = 'r'", (list(_TABLES),)
+                )
+                table_rows = dict(result.all())
+
+                db = AsyncSession(bind=conn, join_transaction_mode="create_savepoint", expire_on_commit=False, autoflush=False)
+                capturing = "lookup"
+                await run_services(db, spotify_ids)
+                capturing = "batch"
+                await run_batch_jobs(db)
+                capturing = None
+
+                natural = [await explain(conn, statement, parameters) for statement, (parameters, _) in captured.items()]
+                # Hanya untuk laporan "tanpa index"; berlaku sampai transaksi di-rollback
+                await conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+                forced = [await explain(conn, statement, parameters) for statement, (parameters, _) in captured.items()]
+
+                for (statement, (_, kind)), scanned, still_scanned in zip(captured.items(), natural, forced):
+                    summary = " ".join(statement.split())[:120]
+                    large = [table for table in scanned if table_rows.get(table, 0) >= min_rows]
+                    if kind == "batch":
+                        print(f"batch (scans {', '.join(scanned) or 'none'}): {summary}")
+                    elif large:
+                        failures += 1
+                        sizes = ", ".join(f"{table} ~{int(table_rows[table])} rows" for table in large)
+                        print(f"SEQ SCAN on {sizes}: {summary}")
+                    elif still_scanned:
+                        unindexed += 1
+                        print(f"no usable index on {', '.join(still_scanned)}: {summary}")
+                    else:
+                        print(f"ok: {summary}")
+            finally:
+                await conn.rollback()
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", capture)
+        await async_engine.dispose()
+
+    print(
+        f"{len(captured)} statements explained: {failures} with a sequential scan on a table of "
+        f"{min_rows}+ rows, {unindexed} with no usable index (enable_seqscan=off, reported only)"
+    )
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="EXPLAIN every service query and fail on sequential scans of large tables")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--playlists", type=int, default=20, help="playlists per user")
+    parser.add_argument("--min-rows", type=int, default=1000, help="a sequential scan fails only on tables at least this large")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.users, args.playlists, args.min_rows)))
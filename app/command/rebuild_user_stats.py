@@ -0,0 +1,34 @@
+"""
+Hitung ulang tabel user_stats dan user_genre_stats dari tabel playlist.
+
+Jalankan dengan: python -m app.command.rebuild_user_stats [--user SPOTIFY_ID]
+Aman dijalankan kapan saja, misalnya setelah data playlist diubah langsung di database.
+"""
+import argparse
+
+from dotenv import find_dotenv, load_dotenv
+
+load_dotenv(find_dotenv())
+
+from app.config.database import DBContext
+from app.service.service_user_stats import rebuild_user_stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild per-user playlist statistics")
+    parser.add_argument("--user", dest="spotify_id", default=None, help="only rebuild this user")
+    args = parser.parse_args()
+
+    with DBContext() as db:
+        try:
+            rebuilt = rebuild_user_stats(db, args.spotify_id)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+    print(f"Rebuilt statistics for {rebuilt} user(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Isi pool draft playlist (playlist_draft) untuk setiap (mood bucket, depression level, lokasi).
+
+Jalankan dengan: python -m app.command.refill_playlist_drafts [--loop] [--target N]
+Tanpa --loop dijalankan sekali (cocok untuk cron). Dengan --loop pool diisi ulang setiap
+DRAFT_REFILL_INTERVAL detik. Pencarian lagu memakai client credentials Spotify aplikasi,
+bukan token pengguna.
+"""
+import argparse
+import signal
+import time
+
+from dotenv import find_dotenv, load_dotenv
+
+load_dotenv(find_dotenv())
+
+from app.config.config import DRAFT_POOL_TARGET, DRAFT_REFILL_INTERVAL, PLAYLIST_LOCATION
+from app.config.database import DBContext
+from app.config.spotify import get_app_spotify
+from app.service.service_playlist_draft import get_pool_size, refill_drafts
+
+_running = True
+
+
+def _stop(signum, frame):
+    global _running
+    print(f"Received signal {signum}, stopping draft refill")
+    _running = False
+
+
+def run_once(target: int) -> None:
+    started = time.monotonic()
+    with DBContext() as db:
+        generated = refill_drafts(db, get_app_spotify(), [PLAYLIST_LOCATION], target=target)
+        pool_size = get_pool_size(db)
+    print(f"Generated {generated} draft(s) in {time.monotonic() - started:.1f}s, {pool_size} fresh draft(s) in the pool")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Top up the pre-generated playlist draft pool")
+    parser.add_argument("--loop", action="store_true", help=f"repeat every DRAFT_REFILL_INTERVAL ({DRAFT_REFILL_INTERVAL}s)")
+    parser.add_argument("--target", type=int, default=DRAFT_POOL_TARGET, help="drafts to keep per bucket")
+    args = parser.parse_args()
+
+    if not args.loop:
+        run_once(args.target)
+        return
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+    while _running:
+        try:
+            run_once(args.target)
+        except Exception as e:
+            print(f"Error refilling playlist drafts: {str(e)}")
+        deadline = time.monotonic() + DRAFT_REFILL_INTERVAL
+        while _running and time.monotonic() < deadline:
+            time.sleep(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Hitung ulang tabel analytics_summary (ringkasan hasil mood seluruh pengguna).
+
+Jalankan dengan: python -m app.command.refresh_analytics [--loop]
+Tanpa --loop dijalankan sekali (cocok untuk cron). Dengan --loop diulang setiap
+ANALYTICS_REFRESH_INTERVAL detik sampai proses dihentikan.
+"""
+import argparse
+import signal
+import time
+
+from dotenv import find_dotenv, load_dotenv
+
+load_dotenv(find_dotenv())
+
+from app.config.config import ANALYTICS_REFRESH_INTERVAL
+from app.config.database import DBContext
+from app.service.service_analytics import refresh_analytics
+
+_running = True
+
+
+def _stop(signum, frame):
+    global _running
+    print(f"Received signal {signum}, stopping analytics refresh")
+    _running = False
+
+
+def run_once() -> None:
+    started = time.monotonic()
+    with DBContext() as db:
+        try:
+            written = refresh_analytics(db)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+    print(f"Analytics refreshed: {written} summary row(s) in {time.monotonic() - started:.1f}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Recompute population-level mood analytics")
+    parser.add_argument("--loop", action="store_true", help=f"repeat every ANALYTICS_REFRESH_INTERVAL ({ANALYTICS_REFRESH_INTERVAL}s)")
+    args = parser.parse_args()
+
+    if not args.loop:
+        run_once()
+        return
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+    while _running:
+        try:
+            run_once()
+        except Exception as e:
+            print(f"Error refreshing analytics: {str(e)}")
+        deadline = time.monotonic() + ANALYTICS_REFRESH_INTERVAL
+        while _running and time.monotonic() < deadline:
+            time.sleep(1)
+
+
+if __name__ == "__main__":
+    main()
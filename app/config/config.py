@@ -13,3 +13,95 @@ DB_POOLSIZE = 50
 DB_MAXOVERFLOW = 25
 DB_POOLTIMEOUT = 30
 DB_POOLRECYCLE = 1800
+
+# Maksimum pencarian Spotify yang berjalan bersamaan per create_playlist
+SPOTIFY_SEARCH_CONCURRENCY = int(os.getenv("SPOTIFY_SEARCH_CONCURRENCY", "5"))
+SPOTIFY_MARKET = os.getenv("SPOTIFY_MARKET", "ID")
+# Base URL Spotify Web API, bisa diarahkan ke server tiruan untuk load test (benchmark/fake_servers.py)
+SPOTIFY_API_PREFIX = os.getenv("SPOTIFY_API_PREFIX", "https://api.spotify.com/v1/")
+
+# Cache hasil pencarian judul/artis -> Spotify URI
+TRACK_CACHE_SIZE = int(os.getenv("TRACK_CACHE_SIZE", "2048"))
+TRACK_CACHE_TTL = int(os.getenv("TRACK_CACHE_TTL", str(7 * 24 * 3600)))  # seconds
+TRACK_CACHE_NEGATIVE_TTL = int(os.getenv("TRACK_CACHE_NEGATIVE_TTL", str(24 * 3600)))  # seconds
+
+# Job queue untuk pembuatan playlist secara asynchronous
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1.0"))  # seconds
+JOB_TIMEOUT = int(os.getenv("JOB_TIMEOUT", "600"))  # seconds without heartbeat before a running job is considered abandoned
+JOB_HEARTBEAT_INTERVAL = float(os.getenv("JOB_HEARTBEAT_INTERVAL", "30"))  # seconds, must stay well below JOB_TIMEOUT
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_MAX_WAIT = int(os.getenv("JOB_MAX_WAIT", "30"))  # maximum long-poll wait in seconds
+
+# Stream jawaban AI dan mulai pencarian Spotify sebelum jawaban selesai
+AI_STREAMING = os.getenv("AI_STREAMING", "true").lower() in ("1", "true", "yes")
+
+# Redis opsional untuk cache yang dibagi antar worker/replica
+REDIS_URL = os.getenv("REDIS_URL")
+
+# Cache validasi token Spotify di get_current_user
+AUTH_CACHE_TTL = int(os.getenv("AUTH_CACHE_TTL", "60"))  # seconds
+AUTH_CACHE_STALE_TTL = int(os.getenv("AUTH_CACHE_STALE_TTL", "600"))  # seconds an entry may be reused while Spotify is throttling
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "10000"))
+
+# Cache respons endpoint baca playlist (Redis, fallback LRU per proses)
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "300"))  # seconds
+# Fallback in-process hanya di-invalidate oleh proses yang sama; 0 mematikannya (disarankan bila ada beberapa replica/worker)
+RESPONSE_CACHE_LOCAL_TTL = int(os.getenv("RESPONSE_CACHE_LOCAL_TTL", "5"))  # seconds
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "2000"))
+
+# Hugging Face router dan connection pool HTTP yang dipakai bersama
+HF_BASE_URL = os.getenv("HF_BASE_URL", "https://router.huggingface.co/v1")
+HF_TIMEOUT = float(os.getenv("HF_TIMEOUT", "120"))  # seconds
+HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "4"))  # number of hosts kept in the pool
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "20"))  # keep-alive connections per host
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60"))  # seconds
+
+# Pool untuk engine async (asyncpg) yang dipakai endpoint async
+DB_ASYNC_POOLSIZE = int(os.getenv("DB_ASYNC_POOLSIZE", "20"))
+DB_ASYNC_MAXOVERFLOW = int(os.getenv("DB_ASYNC_MAXOVERFLOW", "10"))
+
+# Pagination GET /api/playlists/
+PLAYLIST_PAGE_SIZE = int(os.getenv("PLAYLIST_PAGE_SIZE", "20"))
+PLAYLIST_PAGE_MAX = int(os.getenv("PLAYLIST_PAGE_MAX", "100"))
+
+# Jumlah titik maksimum grafik mood (GET /api/playlists/chart/mood)
+CHART_MAX_POINTS = int(os.getenv("CHART_MAX_POINTS", "100"))
+CHART_MAX_POINTS_LIMIT = int(os.getenv("CHART_MAX_POINTS_LIMIT", "500"))
+
+# Export riwayat sesi (GET /api/playlists/export), jumlah playlist per batch cursor
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "200"))
+
+# Endpoint admin (/api/admin), dinonaktifkan bila ADMIN_API_KEY kosong
+ADMIN_API_KEY = os.getenv("ADMIN_API_KEY")
+
+# Interval batch analytics (python -m app.command.refresh_analytics --loop)
+ANALYTICS_REFRESH_INTERVAL = int(os.getenv("ANALYTICS_REFRESH_INTERVAL", "3600"))  # seconds
+
+# Lokasi pengguna yang dikirim ke prompt AI
+PLAYLIST_LOCATION = os.getenv("PLAYLIST_LOCATION", "Indonesia")
+
+# Pool draft playlist yang sudah dibuat AI dan di-resolve ke Spotify, per (mood bucket, depression level, lokasi).
+# Default mati: aktifkan setelah app.command.refill_playlist_drafts dijadwalkan
+DRAFT_POOL_ENABLED = os.getenv("DRAFT_POOL_ENABLED", "false").lower() in ("1", "true", "yes")
+DRAFT_POOL_TARGET = int(os.getenv("DRAFT_POOL_TARGET", "3"))  # drafts kept ready per bucket
+DRAFT_MOOD_BUCKET_SIZE = int(os.getenv("DRAFT_MOOD_BUCKET_SIZE", "2"))  # pre_mood values per bucket
+DRAFT_MIN_TRACKS = int(os.getenv("DRAFT_MIN_TRACKS", "12"))  # resolved tracks required to keep a draft
+DRAFT_MAX_AGE = int(os.getenv("DRAFT_MAX_AGE", str(7 * 24 * 3600)))  # seconds
+DRAFT_PERSONAL_TRACKS = int(os.getenv("DRAFT_PERSONAL_TRACKS", "2"))  # user's saved tracks mixed into a draft
+DRAFT_REFILL_INTERVAL = int(os.getenv("DRAFT_REFILL_INTERVAL", "300"))  # seconds
+
+# Gateway LLM: daftar provider OpenAI-compatible berurutan (JSON), default satu provider Hugging Face
+# contoh: [{"name": "groq", "base_url": "https://router.huggingface.co/v1", "model": "openai/gpt-oss-120b:groq", "api_key_env": "HF_TOKEN", "timeout": 60}]
+HF_MODEL = os.getenv("HF_MODEL", "openai/gpt-oss-120b:groq")
+LLM_PROVIDERS = os.getenv("LLM_PROVIDERS")
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))  # hedge when the first provider is slower than this percentile
+LLM_HEDGE_DEFAULT_DELAY = float(os.getenv("LLM_HEDGE_DEFAULT_DELAY", "20"))  # seconds, until enough latencies are recorded
+LLM_HEDGE_MIN_DELAY = float(os.getenv("LLM_HEDGE_MIN_DELAY", "2"))  # seconds
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "3"))  # consecutive failures before a provider is skipped
+LLM_BREAKER_COOLDOWN = float(os.getenv("LLM_BREAKER_COOLDOWN", "30"))  # seconds before a skipped provider is tried again
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "32"))
+LLM_HEDGE_MAX_CONCURRENCY = int(os.getenv("LLM_HEDGE_MAX_CONCURRENCY", "8"))  # hedged requests in flight at once, 0 disables hedging
+
+# Jumlah prompt lanjutan untuk melengkapi jawaban AI yang tidak lengkap (lagu/judul kurang)
+AI_FOLLOWUP_ATTEMPTS = int(os.getenv("AI_FOLLOWUP_ATTEMPTS", "1"))
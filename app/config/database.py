@@ -1,4 +1,5 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 import os
@@ -13,6 +14,16 @@ engine = create_engine(f"postgresql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{D
     pool_recycle=DB_POOLRECYCLE
 )
 
+# Engine async untuk endpoint async agar query tidak memblokir event loop
+async_engine = create_async_engine(f"postgresql+asyncpg://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}",
+    connect_args={"ssl": False},
+    pool_pre_ping=True,
+    pool_size=DB_ASYNC_POOLSIZE,
+    max_overflow=DB_ASYNC_MAXOVERFLOW,
+    pool_timeout=DB_POOLTIMEOUT,
+    pool_recycle=DB_POOLRECYCLE
+)
+
 def get_db():
     with DBContext() as db:
         try:
@@ -29,6 +40,23 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+# expire_on_commit=False: objek tetap bisa dibaca setelah commit tanpa lazy load (tidak didukung di async)
+AsyncSessionLocal = async_sessionmaker(
+    autoflush=False,
+    expire_on_commit=False,
+    bind=async_engine
+)
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except:
+            await db.rollback()
+            raise
+        else:
+            await db.commit()
+
 Base = declarative_base()
 metadata = Base.metadata
 
@@ -0,0 +1,168 @@
+import os
+import threading
+from typing import Dict, Optional
+
+import httpx
+import requests
+import spotipy
+from openai import OpenAI
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from ..config.config import (
+    HF_BASE_URL,
+    HF_TIMEOUT,
+    HTTP_KEEPALIVE_EXPIRY,
+    HTTP_POOL_CONNECTIONS,
+    HTTP_POOL_MAXSIZE,
+    LLM_HEDGE_MAX_CONCURRENCY,
+    LLM_MAX_CONCURRENCY,
+    SPOTIFY_API_PREFIX,
+)
+
+# Satu koneksi untuk setiap request LLM yang boleh berjalan bersamaan, termasuk hedge
+LLM_POOL_MAXSIZE = LLM_MAX_CONCURRENCY + LLM_HEDGE_MAX_CONCURRENCY
+
+
+class _SharedSessionSpotify(spotipy.Spotify):
+    """
+    spotipy closes its requests session when the client is garbage collected,
+    which would tear down the shared connection pool after every request.
+    """
+
+    def __del__(self):
+        pass
+
+
+class ClientRegistry:
+    """
+    Long-lived HTTP clients with keep-alive connection pools, created once per process.
+
+    Spotify calls share one requests session (one pool per host, HTTP_POOL_MAXSIZE
+    connections each); the per-user access token is set on a lightweight
+    spotipy.Spotify wrapper so the session is never rebuilt. LLM providers (Hugging
+    Face router and any other OpenAI-compatible endpoint) share one pooled httpx client
+    sized for LLM_MAX_CONCURRENCY calls plus LLM_HEDGE_MAX_CONCURRENCY hedges.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {
+            "hf_requests": 0,
+            "hf_connections_opened": 0,
+        }
+
+        self.spotify_session = requests.Session()
+        retry = Retry(
+            total=spotipy.Spotify.max_retries,
+            connect=None,
+            read=False,
+            allowed_methods=frozenset(["GET", "POST", "PUT", "DELETE"]),
+            status=spotipy.Spotify.max_retries,
+            backoff_factor=0.3,
+            status_forcelist=spotipy.Spotify.default_retry_codes,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=HTTP_POOL_CONNECTIONS,
+            pool_maxsize=HTTP_POOL_MAXSIZE,
+            max_retries=retry,
+        )
+        self.spotify_session.mount("https://", adapter)
+        self.spotify_session.mount("http://", adapter)
+
+        self.hf_http_client = httpx.Client(
+            timeout=HF_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=LLM_POOL_MAXSIZE,
+                max_keepalive_connections=LLM_POOL_MAXSIZE,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+            ),
+            event_hooks={"request": [self._trace_hf_request]},
+        )
+        self._llm_clients: Dict[tuple, OpenAI] = {}
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def _trace_hf_request(self, request: httpx.Request) -> None:
+        self._count("hf_requests")
+
+        def trace(event_name, info):
+            if event_name == "connection.connect_tcp.complete":
+                self._count("hf_connections_opened")
+
+        request.extensions["trace"] = trace
+
+    @property
+    def hf_client(self) -> OpenAI:
+        return self.llm_client(HF_BASE_URL, os.getenv("HF_TOKEN"), HF_TIMEOUT)
+
+    def llm_client(self, base_url: str, api_key: Optional[str], timeout: float, max_retries: int = 2) -> OpenAI:
+        """
+        OpenAI-compatible client for one LLM provider, created on first use (OpenAI()
+        fails without an api key). All providers share the pooled httpx client.
+        """
+        key = (base_url, api_key, timeout, max_retries)
+        client = self._llm_clients.get(key)
+        if client is None:
+            with self._lock:
+                client = self._llm_clients.get(key)
+                if client is None:
+                    client = OpenAI(
+                        base_url=base_url,
+                        api_key=api_key,
+                        timeout=timeout,
+                        max_retries=max_retries,
+                        http_client=self.hf_http_client,
+                    )
+                    self._llm_clients[key] = client
+        return client
+
+    def spotify(self, access_token: Optional[str] = None, **kwargs) -> spotipy.Spotify:
+        client = _SharedSessionSpotify(auth=access_token, requests_session=self.spotify_session, **kwargs)
+        client.prefix = SPOTIFY_API_PREFIX
+        return client
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+
+        spotify_pools = {}
+        adapter = self.spotify_session.get_adapter("https://")
+        pools = adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            spotify_pools[pool.host] = {
+                "connections_opened": pool.num_connections,
+                "requests": pool.num_requests,
+            }
+        stats["spotify_pools"] = spotify_pools
+        return stats
+
+    def close(self) -> None:
+        self.spotify_session.close()
+        self.hf_http_client.close()
+
+
+_registry: Optional[ClientRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_client_registry() -> ClientRegistry:
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ClientRegistry()
+    return _registry
+
+
+def close_client_registry() -> None:
+    global _registry
+    with _registry_lock:
+        if _registry is not None:
+            _registry.close()
+            _registry = None
@@ -0,0 +1,56 @@
+import time
+
+from ..config.config import REDIS_URL
+
+try:
+    import redis
+    import redis.asyncio as redis_asyncio
+except ImportError:  # redis is optional, callers fall back to in-process caches
+    redis = None
+    redis_asyncio = None
+
+# Setelah error, Redis dilewati sementara agar request tidak menunggu timeout berulang kali
+REDIS_RETRY_AFTER = 30  # seconds
+
+_client = None
+_async_client = None
+_down_until = 0.0
+
+_CLIENT_OPTIONS = {
+    "socket_timeout": 0.25,
+    "socket_connect_timeout": 0.25,
+    "health_check_interval": 30,
+}
+
+
+def get_redis():
+    """Return a shared Redis client, or None when Redis is not configured, not installed or recently failed"""
+    global _client
+    if redis is None or not REDIS_URL or time.monotonic() < _down_until:
+        return None
+    if _client is None:
+        _client = redis.Redis.from_url(REDIS_URL, **_CLIENT_OPTIONS)
+    return _client
+
+
+def get_async_redis():
+    """Same as get_redis, for code running on the event loop"""
+    global _async_client
+    if redis_asyncio is None or not REDIS_URL or time.monotonic() < _down_until:
+        return None
+    if _async_client is None:
+        _async_client = redis_asyncio.Redis.from_url(REDIS_URL, **_CLIENT_OPTIONS)
+    return _async_client
+
+
+def mark_redis_down(error: Exception) -> None:
+    global _down_until
+    print(f"Redis unavailable, falling back to in-process cache for {REDIS_RETRY_AFTER}s: {str(error)}")
+    _down_until = time.monotonic() + REDIS_RETRY_AFTER
+
+
+async def close_async_redis() -> None:
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
@@ -1,8 +1,13 @@
 import os
-from spotipy.oauth2 import SpotifyOAuth
+from typing import Optional
+
+import spotipy
+from spotipy.oauth2 import SpotifyClientCredentials, SpotifyOAuth
 from spotipy.cache_handler import CacheFileHandler
 from dotenv import load_dotenv, find_dotenv
 
+from .http_client import get_client_registry
+
 load_dotenv(find_dotenv())
 client_id = os.getenv("SP_CLIENT_ID")
 client_secret = os.getenv("SP_CLIENT_SECRET")
@@ -15,4 +20,18 @@ sp_oauth = SpotifyOAuth(
     scope=scope,
     cache_handler=CacheFileHandler(cache_path=".spotify_cache"),
     show_dialog=True,
-)
\ No newline at end of file
+    requests_session=get_client_registry().spotify_session,
+)
+# Client credentials (tanpa login user) untuk pencarian lagu di luar request, misalnya generator draft
+_app_auth_manager: Optional[SpotifyClientCredentials] = None
+
+
+def get_app_spotify() -> spotipy.Spotify:
+    global _app_auth_manager
+    if _app_auth_manager is None:
+        _app_auth_manager = SpotifyClientCredentials(
+            client_id=client_id,
+            client_secret=client_secret,
+            requests_session=get_client_registry().spotify_session,
+        )
+    return get_client_registry().spotify(auth_manager=_app_auth_manager)
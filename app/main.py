@@ -1,3 +1,5 @@
+from contextlib import asynccontextmanager
+
 from dotenv import find_dotenv, load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -8,10 +10,23 @@ from .router.router_user import router_user
 from .router.router_ai import router_ai
 from .router.router_playlist import router_playlist
 from .router.router_health import router as health_router
+from .router.router_admin import router_admin
+from .config.http_client import close_client_registry, get_client_registry
+from .config.redis import close_async_redis
 
 load_dotenv(find_dotenv())
 
-app = FastAPI(title="MindTune API", description="API for MindTune application", version="0.1.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Buat HTTP client (connection pool) sekali saat startup
+    get_client_registry()
+    yield
+    close_client_registry()
+    await close_async_redis()
+
+
+app = FastAPI(title="MindTune API", description="API for MindTune application", version="0.1.0", lifespan=lifespan)
 
 # Configure OpenAPI with security scheme
 def custom_openapi():
@@ -67,6 +82,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Root endpoint with redirect to docs
@@ -78,4 +94,5 @@ def docs():
 app.include_router(router_user, prefix="/api/users", tags=["Users"])
 app.include_router(router_playlist, prefix="/api/playlists", tags=["Playlists"])
 app.include_router(health_router)
+app.include_router(router_admin, prefix="/api/admin", tags=["Admin"])
 
@@ -2,4 +2,9 @@
 from .user import UserModel
 from .playlist import PlaylistModel
 from .playlist_genre import PlaylistGenreModel
-from .playlist_track import PlaylistTrackModel
\ No newline at end of file
+from .playlist_track import PlaylistTrackModel
+from .track_cache import TrackCacheModel
+from .playlist_job import PlaylistJobModel
+from .user_stats import UserStatsModel, UserGenreStatsModel
+from .analytics_summary import AnalyticsSummaryModel
+from .playlist_draft import PlaylistDraftModel
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, DateTime, Integer, String
+from sqlalchemy.sql import func
+
+from ..config.database import Base
+
+
+class AnalyticsSummaryModel(Base):
+    """
+    Population-level mood outcomes, one row per (dimension, bucket). Written only by
+    the refresh_analytics batch so admin reads never scan the playlist tables.
+    """
+    __tablename__ = "analytics_summary"
+
+    dimension = Column(String(32), primary_key=True)  # overall, depression_level, phq9_band, week, genre
+    bucket = Column(String(255), primary_key=True)
+    session_count = Column(Integer, nullable=False, default=0)
+    user_count = Column(Integer, nullable=False, default=0)
+    mood_delta_sum = Column(Integer, nullable=False, default=0)  # sum of post_mood - pre_mood
+    mood_delta_count = Column(Integer, nullable=False, default=0)  # sessions with both moods set
+    improved_count = Column(Integer, nullable=False, default=0)  # sessions with post_mood > pre_mood
+    computed_at = Column(DateTime, nullable=False, default=func.now())
@@ -11,13 +11,13 @@ class PlaylistModel(Base):
         UniqueConstraint('spotify_id', 'sequence_number', name='uq_playlist_user_seq'),
     )
 
-    id = Column(Integer, primary_key=True, autoincrement=True)
+    id = Column(String(255), primary_key=True)
     spotify_id = Column(String(255), ForeignKey("user.spotify_id", ondelete="CASCADE"), nullable=False)
     name = Column(String(255), nullable=False)
     phq9_score = Column(Integer, nullable=True)
     depression_level = Column(String(50), nullable=True)
-    pre_mood = Column(String(50), nullable=True)
-    post_mood = Column(String(50), nullable=True)
+    pre_mood = Column(Integer, nullable=True)
+    post_mood = Column(Integer, nullable=True)
     duration = Column(Integer, nullable=True)  # Duration in milliseconds
     total_tracks = Column(Integer, nullable=True)
     link_playlist = Column(String(255), nullable=True)
@@ -0,0 +1,25 @@
+from sqlalchemy import JSON, Column, DateTime, Index, Integer, String, Text
+from sqlalchemy.sql import func
+
+from ..config.database import Base
+
+
+class PlaylistDraftModel(Base):
+    """
+    A playlist generated ahead of time by the AI and already resolved to Spotify tracks.
+    Each draft is handed out once: create_playlist deletes it when it claims it.
+    """
+    __tablename__ = "playlist_draft"
+    __table_args__ = (
+        Index("ix_playlist_draft_bucket", "mood_bucket", "depression_level", "location", "created_at"),
+    )
+
+    id = Column(String(255), primary_key=True)
+    mood_bucket = Column(Integer, nullable=False)
+    depression_level = Column(String(50), nullable=False)
+    location = Column(String(100), nullable=False)
+    title = Column(String(255), nullable=False)
+    description = Column(Text, nullable=True)
+    tracks = Column(JSON, nullable=False)  # [{"title", "artist", "uri", "duration"}] in playlist order
+    genres = Column(JSON, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=func.now())
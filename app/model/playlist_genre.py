@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, DateTime, Enum, ForeignKey, Integer, String, Text
+from sqlalchemy import Boolean, Column, DateTime, Enum, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
@@ -7,10 +7,13 @@ from ..config.database import Base
 
 class PlaylistGenreModel(Base):
     __tablename__ = "playlist_genre"
+    __table_args__ = (
+        Index("ix_playlist_genre_playlist_id_name", "playlist_id", "name"),
+    )
 
-    id = Column(Integer, primary_key=True, autoincrement=True)
+    id = Column(String(255), primary_key=True)
     name = Column(String(100), nullable=False)
-    playlist_id = Column(Integer, ForeignKey("playlist.id", ondelete="CASCADE"), nullable=False)
+    playlist_id = Column(String(255), ForeignKey("playlist.id", ondelete="CASCADE"), nullable=False)
     created_at = Column(DateTime, nullable=False, default=func.now())
     updated_at = Column(DateTime, nullable=False, default=func.now(), onupdate=func.now())
 
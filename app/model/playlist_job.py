@@ -0,0 +1,29 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+
+from ..config.database import Base
+
+
+class PlaylistJobModel(Base):
+    __tablename__ = "playlist_job"
+    __table_args__ = (
+        Index("ix_playlist_job_status_created_at", "status", "created_at"),
+    )
+
+    id = Column(String(255), primary_key=True)
+    spotify_id = Column(String(255), ForeignKey("user.spotify_id", ondelete="CASCADE"), nullable=False, index=True)
+    pre_mood = Column(Integer, nullable=False)
+    phq9_score = Column(Integer, nullable=False)
+    status = Column(String(20), nullable=False, default="queued")  # queued, running, done, failed
+    playlist_id = Column(String(255), ForeignKey("playlist.id", ondelete="SET NULL"), nullable=True, index=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    started_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)  # refreshed by the worker while the job runs
+    finished_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=func.now())
+    updated_at = Column(DateTime, nullable=False, default=func.now(), onupdate=func.now())
+
+    # Relationships
+    user = relationship("UserModel", passive_deletes=True)
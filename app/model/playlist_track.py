@@ -8,11 +8,11 @@ from ..config.database import Base
 class PlaylistTrackModel(Base):
     __tablename__ = "playlist_track"
 
-    id = Column(Integer, primary_key=True, autoincrement=True)
+    id = Column(String(255), primary_key=True)
     name = Column(String(255), nullable=False)
     artist = Column(String(255), nullable=False)
     duration = Column(Integer, nullable=True)  # Duration in milliseconds
-    playlist_id = Column(Integer, ForeignKey("playlist.id", ondelete="CASCADE"), nullable=False)
+    playlist_id = Column(String(255), ForeignKey("playlist.id", ondelete="CASCADE"), nullable=False, index=True)
     created_at = Column(DateTime, nullable=False, default=func.now())
     updated_at = Column(DateTime, nullable=False, default=func.now(), onupdate=func.now())
 
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, DateTime, Integer, String
+from sqlalchemy.sql import func
+
+from ..config.database import Base
+
+
+class TrackCacheModel(Base):
+    __tablename__ = "track_cache"
+
+    cache_key = Column(String(40), primary_key=True)  # sha1 of normalized title/artist/market
+    title = Column(String(255), nullable=False)
+    artist = Column(String(255), nullable=False)
+    market = Column(String(10), nullable=False)
+    uri = Column(String(255), nullable=True)  # NULL means Spotify had no match (negative entry)
+    duration_ms = Column(Integer, nullable=True)
+    expires_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=func.now())
+    updated_at = Column(DateTime, nullable=False, default=func.now(), onupdate=func.now())
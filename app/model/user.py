@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, DateTime, Enum, ForeignKey, Integer, String, Text
+from sqlalchemy import Boolean, Column, DateTime, Enum, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
@@ -7,12 +7,16 @@ from ..config.database import Base
 
 class UserModel(Base):
     __tablename__ = "user"
+    __table_args__ = (
+        Index("ix_user_refresh_token_hash", "refresh_token", postgresql_using="hash"),
+    )
 
     spotify_id = Column(String(255), primary_key=True, unique=True)
     email = Column(String(255), nullable=False, unique=True)
     name = Column(String(255), nullable=False)
     access_token = Column(Text, nullable=True)
     refresh_token = Column(Text, nullable=True)
+    playlist_seq = Column(Integer, nullable=False, default=0)  # last allocated playlist.sequence_number
     created_at = Column(DateTime, nullable=False, default=func.now())
     updated_at = Column(DateTime, nullable=False, default=func.now(), onupdate=func.now())
     
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy.sql import func
+
+from ..config.database import Base
+
+
+class UserStatsModel(Base):
+    """Per-user dashboard counters, kept in sync with the playlist table on every write"""
+    __tablename__ = "user_stats"
+
+    spotify_id = Column(String(255), ForeignKey("user.spotify_id", ondelete="CASCADE"), primary_key=True)
+    session_count = Column(Integer, nullable=False, default=0)
+    mood_delta_sum = Column(Integer, nullable=False, default=0)  # sum of post_mood - pre_mood
+    mood_delta_count = Column(Integer, nullable=False, default=0)  # playlists with both moods set
+    most_frequent_genre = Column(String(255), nullable=True)
+    updated_at = Column(DateTime, nullable=False, default=func.now(), onupdate=func.now())
+
+
+class UserGenreStatsModel(Base):
+    __tablename__ = "user_genre_stats"
+
+    spotify_id = Column(String(255), ForeignKey("user.spotify_id", ondelete="CASCADE"), primary_key=True)
+    name = Column(String(255), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
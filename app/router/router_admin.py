@@ -0,0 +1,27 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth.auth import require_admin_key
+from app.config.database import get_async_db
+from app.service import service_analytics
+
+router_admin = APIRouter(dependencies=[Depends(require_admin_key)])
+
+
+@router_admin.get("/analytics")
+async def get_analytics_endpoint(
+    dimension: Optional[str] = Query(None, description="overall, depression_level, phq9_band, week atau genre"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Ringkasan hasil mood seluruh pengguna dari tabel analytics_summary.
+    Data dihitung oleh batch refresh_analytics, endpoint ini tidak men-scan tabel playlist.
+    """
+    if dimension is not None and dimension not in service_analytics.DIMENSIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown dimension: {dimension}"
+        )
+    return await service_analytics.get_analytics(db, dimension)
@@ -1,6 +1,5 @@
 from fastapi import APIRouter, Depends
 from typing import List, Optional
-import json
 
 from ..service import service_ai
 
@@ -20,7 +19,7 @@ def test_playlist_healing(
     )
 
     result_str = service_ai.call_hf_api(prompt)
-    result_parsed = json.loads(result_str)
+    result_parsed = service_ai.complete_playlist_response(result_str, pre_mood, phq9, location)
 
     return {
         "result": result_parsed 
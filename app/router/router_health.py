@@ -1,8 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 
-from app.config.database import get_db
+from app.auth import auth_cache
+from app.auth.auth import require_admin_key
+from app.config.database import get_async_db
+from app.config.http_client import get_client_registry
+from app.service import service_ai, service_llm_gateway, service_response_cache, service_track_cache
 
 router = APIRouter(
     prefix="/api/health",
@@ -11,14 +15,14 @@ router = APIRouter(
 
 
 @router.get("", status_code=status.HTTP_200_OK)
-async def health_check(db: Session = Depends(get_db)):
+async def health_check(db: AsyncSession = Depends(get_async_db)):
     """
     Health check endpoint untuk memastikan API dan database berjalan dengan baik.
     Endpoint ini digunakan oleh script monitoring untuk memverifikasi status aplikasi.
     """
     try:
         # Periksa koneksi database
-        db.execute(text("SELECT 1"))
+        await db.execute(text("SELECT 1"))
         
         return {
             "status": "healthy",
@@ -29,4 +33,20 @@ async def health_check(db: Session = Depends(get_db)):
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail=f"API tidak sehat: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+@router.get("/stats", status_code=status.HTTP_200_OK, dependencies=[Depends(require_admin_key)])
+async def stats():
+    """
+    Statistik internal per proses (hit/miss cache) untuk mengukur penghematan trafik Spotify,
+    serta jumlah token dan latency panggilan AI. Hanya untuk admin (header X-Admin-Key).
+    """
+    return {
+        "track_cache": service_track_cache.get_stats(),
+        "auth_cache": auth_cache.get_stats(),
+        "response_cache": service_response_cache.get_stats(),
+        "http_clients": get_client_registry().get_stats(),
+        "ai": service_ai.get_stats(),
+        "llm_providers": service_llm_gateway.get_stats(),
+    }
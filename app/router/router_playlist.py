@@ -1,12 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+import time
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
-from app.config.database import get_db
+from app.config.database import get_async_db, get_db
 from app.auth.auth import get_current_user
 from app.model.user import UserModel
-from app.schemas.schemas_playlist import PlaylistResponse, PlaylistUpdate, DashboardResponse, ChartMoodItem
-from app.service.service_playlist import create_playlist, get_all_playlists, get_playlist_by_id, update_playlist, get_dashboard_data, delete_playlist, get_chart_mood
+from app.config.config import CHART_MAX_POINTS, CHART_MAX_POINTS_LIMIT, JOB_MAX_WAIT, JOB_POLL_INTERVAL, PLAYLIST_PAGE_MAX, PLAYLIST_PAGE_SIZE
+from app.schemas.schemas_playlist import PlaylistListItem, PlaylistResponse, PlaylistUpdate, DashboardResponse, ChartMoodItem
+from app.schemas.schemas_playlist_job import PlaylistJobResponse
+from app.service import service_playlist_job
+from app.service import service_playlist, service_playlist_export, service_response_cache
+from app.service.service_playlist import PLAYLIST_INCLUDES, create_playlist, get_all_playlists, get_playlist_by_id, update_playlist, get_dashboard_data, delete_playlist, get_chart_mood
+from app.util import util_serializer
+from app.util.util_convert_time import time_ago_valid_for
+from app.util.util_etag import etag_matches, make_etag, not_modified
 
 router_playlist = APIRouter()
 
@@ -18,20 +32,62 @@ async def create_playlist_endpoint(
     db: Session = Depends(get_db),
     current_user: UserModel = Depends(get_current_user)
 ):
-    playlist = create_playlist(db, current_user.spotify_id, pre_mood, phq9)
+    # Pipeline Spotify/AI masih sync (juga dipakai worker), jalankan di threadpool
+    playlist = await run_in_threadpool(create_playlist, db, current_user.spotify_id, pre_mood, phq9)
     return playlist
 
 
+@router_playlist.get("/jobs/create", response_model=PlaylistJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_playlist_job_endpoint(
+    pre_mood: int,
+    phq9: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_user)
+):
+    job = await service_playlist_job.submit_job(db, current_user.spotify_id, pre_mood, phq9)
+    return job
+
+
+@router_playlist.get("/jobs/{job_id}", response_model=PlaylistJobResponse)
+async def get_playlist_job_endpoint(
+    job_id: str,
+    wait: int = Query(0, ge=0, le=JOB_MAX_WAIT, description="Long-poll: seconds to wait for the job to finish"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_user)
+):
+    spotify_id = current_user.spotify_id
+    deadline = time.monotonic() + wait
+    while True:
+        job = await service_playlist_job.get_job(db, job_id)
+        if job.spotify_id != spotify_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not authorized to access this job"
+            )
+
+        if job.status in (service_playlist_job.JOB_DONE, service_playlist_job.JOB_FAILED) or time.monotonic() >= deadline:
+            break
+
+        # Lepaskan koneksi database selama menunggu
+        await db.commit()
+        await asyncio.sleep(JOB_POLL_INTERVAL)
+
+    response = PlaylistJobResponse.model_validate(job)
+    if job.status == service_playlist_job.JOB_DONE and job.playlist_id:
+        response.playlist = PlaylistResponse.model_validate(await get_playlist_by_id(db, job.playlist_id))
+    return response
+
+
 @router_playlist.get("/{playlist_id}/feedback", response_model=PlaylistResponse)
 async def update_playlist_feedback(
     playlist_id: str,
     post_mood: int,
     feedback: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_user)
 ):
     # First check if the playlist exists and belongs to the current user
-    playlist = get_playlist_by_id(db, playlist_id)
+    playlist = await get_playlist_by_id(db, playlist_id)
     
     if playlist.spotify_id != current_user.spotify_id:
         raise HTTPException(
@@ -40,7 +96,7 @@ async def update_playlist_feedback(
         )
     
     # Update the playlist
-    updated_playlist = update_playlist(
+    updated_playlist = await update_playlist(
         db, 
         playlist_id, 
         post_mood=post_mood, 
@@ -50,62 +106,156 @@ async def update_playlist_feedback(
     return updated_playlist
 
 
-@router_playlist.get("/", response_model=List[PlaylistResponse])
+@router_playlist.get("/", response_model=List[PlaylistListItem], response_model_exclude_unset=True)
 async def get_all_playlists_endpoint(
-    db: Session = Depends(get_db),
+    request: Request,
+    limit: int = Query(PLAYLIST_PAGE_SIZE, ge=1, le=PLAYLIST_PAGE_MAX),
+    cursor: Optional[int] = Query(None, description="sequence_number dari item terakhir halaman sebelumnya (header X-Next-Cursor)"),
+    include: Optional[str] = Query(None, description="Relasi tambahan, dipisah koma: tracks,genres"),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_user)
 ):
-    playlists = get_all_playlists(db, current_user.spotify_id)
-    return playlists
+    includes = [name.strip() for name in include.split(",") if name.strip()] if include else []
+    unknown = [name for name in includes if name not in PLAYLIST_INCLUDES]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown include value(s): {', '.join(unknown)}"
+        )
+
+    cache = await service_response_cache.lookup(current_user.spotify_id, "playlists", (limit, cursor, sorted(includes)))
+    if cache.entry is not None:
+        return cache.entry.to_response(request.headers.get("if-none-match"))
+
+    # Cek versi halaman dulu; bila klien sudah punya versi terbaru tidak perlu query dan serialisasi penuh
+    version = await service_playlist.get_playlists_page_version(db, current_user.spotify_id, limit=limit, cursor=cursor)
+    etag = make_etag("playlists", current_user.spotify_id, limit, cursor, sorted(includes), version)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+
+    playlists, next_cursor = await get_all_playlists(
+        db,
+        current_user.spotify_id,
+        limit=limit,
+        cursor=cursor,
+        include=includes,
+    )
+    headers = {"X-Next-Cursor": str(next_cursor)} if next_cursor is not None else {}
+    body = util_serializer.dumps(playlists)
+    ttl = min(time_ago_valid_for(playlist["created_at"]) for playlist in playlists) if playlists else None
+    return await cache.store(etag, body, headers, ttl=ttl)
+
+
+@router_playlist.get("/export")
+async def export_playlists_endpoint(
+    format: str = Query("ndjson", description="ndjson atau csv"),
+    gzip: bool = Query(False, description="Kompres response dengan gzip"),
+    current_user: UserModel = Depends(get_current_user)
+):
+    if format not in service_playlist_export.EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown export format: {format}"
+        )
+
+    headers = {
+        "Content-Disposition": f'attachment; filename="mindtune-export-{date.today().isoformat()}.{format}"',
+        "Cache-Control": "no-store",
+    }
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+
+    return StreamingResponse(
+        service_playlist_export.export_playlists(current_user.spotify_id, format, gzip=gzip),
+        media_type=service_playlist_export.EXPORT_FORMATS[format],
+        headers=headers,
+    )
 
 
 @router_playlist.get("/{playlist_id}", response_model=PlaylistResponse)
 async def get_playlist_endpoint(
     playlist_id: str,
-    db: Session = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_user)
 ):
-    playlist = get_playlist_by_id(db, playlist_id)
-    
+    # Entri cache hanya disimpan untuk pemilik playlist, jadi cache hit sudah pasti boleh diakses
+    cache = await service_response_cache.lookup(current_user.spotify_id, "playlist", (playlist_id,))
+    if cache.entry is not None:
+        return cache.entry.to_response(request.headers.get("if-none-match"))
+
+    version = await service_playlist.get_playlist_version(db, playlist_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail=f"Playlist with ID {playlist_id} not found")
+
     # Check if the playlist belongs to the current user
-    if playlist.spotify_id != current_user.spotify_id:
+    if version[0] != current_user.spotify_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to access this playlist"
         )
-    
-    return playlist
+
+    etag = make_etag("playlist", playlist_id, version)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+
+    playlist = await service_playlist.get_playlist_detail(db, playlist_id)
+    body = util_serializer.dumps(playlist)
+    return await cache.store(etag, body, ttl=time_ago_valid_for(playlist["created_at"]))
 
 @router_playlist.delete("/{playlist_id}")
 async def delete_playlist_endpoint(
     playlist_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_user)
 ):
-    playlist = get_playlist_by_id(db, playlist_id)
+    playlist = await get_playlist_by_id(db, playlist_id)
     if playlist.spotify_id != current_user.spotify_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to delete this playlist"
         )
 
-    delete_playlist(db, playlist_id)
+    await delete_playlist(db, playlist_id)
     return {"detail": "Playlist berhasil dihapus"}
 
 
 @router_playlist.get("/dashboard/stats", response_model=DashboardResponse)
 async def get_dashboard_endpoint(
-    db: Session = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_user)
 ):
-    dashboard_data = get_dashboard_data(db, current_user.spotify_id)
-    return dashboard_data
+    cache = await service_response_cache.lookup(current_user.spotify_id, "dashboard")
+    if cache.entry is not None:
+        return cache.entry.to_response(request.headers.get("if-none-match"))
+
+    version = await service_playlist.get_user_playlists_version(db, current_user.spotify_id)
+    etag = make_etag("dashboard", current_user.spotify_id, version)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+
+    dashboard_data = await get_dashboard_data(db, current_user.spotify_id)
+    return await cache.store(etag, util_serializer.dumps(dashboard_data.model_dump()))
 
 
 @router_playlist.get("/chart/mood", response_model=List[ChartMoodItem])
 async def get_chart_mood_endpoint(
-    db: Session = Depends(get_db),
+    request: Request,
+    max_points: int = Query(CHART_MAX_POINTS, ge=1, le=CHART_MAX_POINTS_LIMIT, description="Jumlah titik maksimum, sesi dirata-rata per bucket bila lebih banyak"),
+    days: Optional[int] = Query(None, ge=1, description="Hanya sesi dalam N hari terakhir"),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_user)
 ):
-    chart = get_chart_mood(db, current_user.spotify_id)
-    return chart
\ No newline at end of file
+    window_start = service_playlist.chart_window_start(days) if days is not None else None
+    cache = await service_response_cache.lookup(current_user.spotify_id, "chart_mood", (max_points, window_start))
+    if cache.entry is not None:
+        return cache.entry.to_response(request.headers.get("if-none-match"))
+
+    version = await service_playlist.get_user_playlists_version(db, current_user.spotify_id)
+    etag = make_etag("chart_mood", current_user.spotify_id, max_points, window_start, version)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+
+    chart = await get_chart_mood(db, current_user.spotify_id, max_points=max_points, days=days)
+    return await cache.store(etag, util_serializer.dumps(chart))
\ No newline at end of file
@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from ..config.database import get_db
 from ..service import service_user
 from ..schemas.schemas_user import UserBase
+from ..auth import auth_cache
 from ..auth.auth import get_current_user
 from ..model.user import UserModel
 
@@ -48,7 +49,7 @@ def refresh_token(
     db: Session = Depends(get_db)
 ):
     # Get current user
-    user = db.query(UserModel).filter(UserModel.refresh_token == refresh_token).first()
+    user = service_user.get_user_by_refresh_token(db, refresh_token)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -59,6 +60,7 @@ def refresh_token(
     token_info = service_user.refresh_access_token(refresh_token)
 
     # Update user with new tokens
+    auth_cache.invalidate(user.access_token)
     user.access_token = token_info.get("access_token")
     if token_info.get("refresh_token"):
         user.refresh_token = token_info.get("refresh_token")
@@ -0,0 +1,22 @@
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class AITrack(BaseModel):
+    title: str = Field(min_length=1)
+    artist: str = Field(min_length=1)
+
+    class Config:
+        str_strip_whitespace = True
+
+
+class AIPlaylist(BaseModel):
+    """A playlist reply of the AI after validation; invalid tracks are already dropped"""
+    playlist_title: Optional[str] = None
+    description: Optional[str] = None
+    playlist: List[AITrack] = []
+    genres: List[str] = []
+
+    class Config:
+        str_strip_whitespace = True
@@ -24,6 +24,8 @@ class PlaylistBase(BaseModel):
 
     class Config:
         from_attributes = True
+        # pre_mood/post_mood disimpan sebagai integer, response tetap berupa string
+        coerce_numbers_to_str = True
         json_encoders = {
             datetime: lambda dt: dt.strftime("%d/%m/%Y %H:%M")
         }
@@ -33,11 +35,11 @@ class PlaylistCreate(BaseModel):
     id: str
     spotify_id: str
     name: str
-    sequence_number: int
+    sequence_number: Optional[int] = None  # allocated when the playlist is saved
     phq9_score: Optional[int] = None
     depression_level: Optional[str] = None
-    pre_mood: Optional[str] = None
-    post_mood: Optional[str] = None
+    pre_mood: Optional[int] = None
+    post_mood: Optional[int] = None
     duration: Optional[int] = None
     total_tracks: Optional[int] = None
     link_playlist: Optional[str] = None
@@ -46,17 +48,26 @@ class PlaylistCreate(BaseModel):
 
 
 class PlaylistUpdate(BaseModel):
-    post_mood: Optional[str] = None
+    post_mood: Optional[int] = None
     feedback: Optional[str] = None
 
 
-class PlaylistResponse(PlaylistBase):
+class PlaylistSummaryResponse(PlaylistBase):
     created_at: datetime
     time_ago: Optional[str] = None
+
+
+class PlaylistResponse(PlaylistSummaryResponse):
     tracks: List[PlaylistTrackResponse] = []
     genres: List[PlaylistGenreResponse] = []
 
 
+class PlaylistListItem(PlaylistSummaryResponse):
+    # Hanya ada di response bila diminta lewat parameter include
+    tracks: Optional[List[PlaylistTrackResponse]] = None
+    genres: Optional[List[PlaylistGenreResponse]] = None
+
+
 class DashboardResponse(BaseModel):
     total_sessions: int
     avg_mood_improvement: Optional[float] = None
@@ -75,4 +86,5 @@ class ChartMoodItem(BaseModel):
     post_mood: Optional[str] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+        coerce_numbers_to_str = True
\ No newline at end of file
@@ -0,0 +1,23 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+from .schemas_playlist import PlaylistResponse
+
+
+class PlaylistJobResponse(BaseModel):
+    id: str
+    status: str
+    pre_mood: int
+    phq9_score: int
+    playlist_id: Optional[str] = None
+    error: Optional[str] = None
+    attempts: int = 0
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    playlist: Optional[PlaylistResponse] = None
+
+    class Config:
+        from_attributes = True
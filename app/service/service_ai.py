@@ -1,31 +1,182 @@
 import os
 import json
-from typing import List, Optional
-from openai import OpenAI
+import math
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
 from dotenv import load_dotenv, find_dotenv
 import requests
+from pydantic import ValidationError
 from requests.exceptions import RequestException, Timeout, ConnectionError
 
+from app.config.config import AI_FOLLOWUP_ATTEMPTS
+from app.schemas.schemas_ai import AIPlaylist, AITrack
+from app.service import service_llm_gateway
+from app.util.util_llm_json import parse_llm_json
+
+try:
+    import tiktoken
+except ImportError:  # tiktoken is optional, estimate_tokens falls back to a heuristic
+    tiktoken = None
+
 load_dotenv(find_dotenv())
+
+_stats_lock = threading.Lock()
+_stats = {
+    "calls": 0,
+    "prompt_tokens": 0,
+    "completion_tokens": 0,
+    "latency_seconds": 0.0,
+    "first_token_seconds": 0.0,
+    "streamed_calls": 0,
+    "usage_reported": 0,
+    # Hasil parsing jawaban playlist
+    "responses_valid": 0,
+    "responses_repaired": 0,
+    "followups": 0,
+    "responses_unusable": 0,
+}
+_last_call: Dict = {}
+_encoding = None
+_encoding_loaded = False
+
+
+def _get_encoding():
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        _encoding_loaded = True
+        if tiktoken is not None:
+            try:
+                _encoding = tiktoken.get_encoding("o200k_base")
+            except Exception as e:  # encoding file is downloaded on first use
+                print(f"tiktoken unavailable, estimating tokens from length: {str(e)}")
+    return _encoding
+
+
+def estimate_tokens(text: str) -> int:
+    """Token count of `text` with tiktoken when installed, otherwise ~4 characters per token"""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return math.ceil(len(text) / 4)
+
+
+def _record_call(
+    prompt: str,
+    completion: str,
+    started: float,
+    first_token_at: Optional[float] = None,
+    usage=None,
+    provider: Optional[str] = None,
+) -> None:
+    latency = time.monotonic() - started
+    prompt_tokens = getattr(usage, "prompt_tokens", None) or estimate_tokens(prompt)
+    completion_tokens = getattr(usage, "completion_tokens", None) or estimate_tokens(completion)
+    first_token = first_token_at - started if first_token_at is not None else None
+
+    with _stats_lock:
+        _stats["calls"] += 1
+        _stats["prompt_tokens"] += prompt_tokens
+        _stats["completion_tokens"] += completion_tokens
+        _stats["latency_seconds"] += latency
+        if first_token is not None:
+            _stats["streamed_calls"] += 1
+            _stats["first_token_seconds"] += first_token
+        if usage is not None:
+            _stats["usage_reported"] += 1
+        _last_call.clear()
+        _last_call.update({
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "latency_seconds": round(latency, 3),
+            "first_token_seconds": round(first_token, 3) if first_token is not None else None,
+            "source": "usage" if usage is not None else "estimate",
+            "provider": provider,
+        })
+
+    first_token_info = f", first token after {first_token:.2f}s" if first_token is not None else ""
+    provider_info = f" via {provider}" if provider else ""
+    print(f"AI call{provider_info}: {prompt_tokens} prompt + {completion_tokens} completion tokens in {latency:.2f}s{first_token_info}")
+
+
+def _count(name: str) -> None:
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def get_stats() -> Dict:
+    with _stats_lock:
+        stats = dict(_stats)
+        last_call = dict(_last_call) or None
+    calls, streamed = stats["calls"], stats["streamed_calls"]
+    return {
+        "calls": calls,
+        "prompt_tokens": stats["prompt_tokens"],
+        "completion_tokens": stats["completion_tokens"],
+        "avg_prompt_tokens": round(stats["prompt_tokens"] / calls, 1) if calls else None,
+        "avg_latency_seconds": round(stats["latency_seconds"] / calls, 3) if calls else None,
+        "avg_first_token_seconds": round(stats["first_token_seconds"] / streamed, 3) if streamed else None,
+        "usage_reported": stats["usage_reported"],
+        "responses_valid": stats["responses_valid"],
+        "responses_repaired": stats["responses_repaired"],
+        "followups": stats["followups"],
+        "responses_unusable": stats["responses_unusable"],
+        "token_counter": "tiktoken" if _get_encoding() is not None else "heuristic",
+        "static_prompt_tokens": estimate_tokens(_PROMPT_PREFIX),
+        "last_call": last_call,
+    }
+
+
 def call_hf_api(content: str) -> str:
-    client = OpenAI(
-        base_url="https://router.huggingface.co/v1",
-        api_key=os.getenv("HF_TOKEN"),
-        timeout=120.0  # Set timeout to 120 seconds
-    )
+    started = time.monotonic()
+    try:
+        # Provider dipilih oleh gateway (hedging dan circuit breaker), lihat service_llm_gateway
+        completion, provider = service_llm_gateway.complete([
+            {
+                "role": "user",
+                "content": content
+            }
+        ])
 
+        content_out = completion.choices[0].message.content
+        _record_call(content, content_out or "", started, usage=getattr(completion, "usage", None), provider=provider)
+        return content_out
+    except Timeout:
+        raise Exception("Connection timeout when calling AI service. The service might be overloaded.")
+    except ConnectionError:
+        raise Exception("Connection error when connecting to AI service. Please check your network.")
+    except RequestException as e:
+        raise Exception(f"Request error: {str(e)}")
+    except Exception as e:
+        raise Exception(f"Unexpected error: {str(e)}")
+
+def call_hf_api_stream(content: str) -> Iterator[str]:
+    """Stream the chat completion, yielding content deltas as they arrive"""
+    started = time.monotonic()
+    first_token_at = None
+    parts = []
+    usage = None
+    provider = None
     try:
-        completion = client.chat.completions.create(
-            model="openai/gpt-oss-120b:groq",
-            messages=[
-                {
-                    "role": "user",
-                    "content": content
-                }
-            ],
-        )
-        
-        return completion.choices[0].message.content
+        stream = service_llm_gateway.stream([
+            {
+                "role": "user",
+                "content": content
+            }
+        ])
+
+        for chunk, provider in stream:
+            # Sebagian provider mengirim usage di chunk terakhir
+            usage = getattr(chunk, "usage", None) or usage
+            if chunk.choices and chunk.choices[0].delta.content:
+                if first_token_at is None:
+                    first_token_at = time.monotonic()
+                parts.append(chunk.choices[0].delta.content)
+                yield chunk.choices[0].delta.content
+
+        _record_call(content, "".join(parts), started, first_token_at or time.monotonic(), usage=usage, provider=provider)
     except Timeout:
         raise Exception("Connection timeout when calling AI service. The service might be overloaded.")
     except ConnectionError:
@@ -35,105 +186,253 @@ def call_hf_api(content: str) -> str:
     except Exception as e:
         raise Exception(f"Unexpected error: {str(e)}")
 
+
+# Bagian statis prompt (system + instructions) tidak pernah berubah; di-encode sekali saat import
+_PROMPT_STATIC = {
+    "system": (
+        "You are a clinical-aware music recommender for a healing-mode web app. "
+        "Your output MUST be exactly a JSON object with four keys: "
+        "'playlist_title' (string), 'description' (string), "
+        "'playlist' (array of objects with 'title' and 'artist'), and 'genres' (array of strings)."
+    ),
+    "instructions": {
+        "goal": (
+            "Generate a therapeutic Spotify playlist to help regulate mood using the ISO principle: "
+            "start by reflecting the user's current affect (based on pre_mood) and then gently uplift toward calm, relief, or hope. "
+            "Create a playlist title and description that feel compassionate, soothing, and emotionally validating. "
+            "Songs must align with the mood journey and safety criteria. "
+            "Only include real, existing songs and artists that can be found on Spotify; prioritize popular and culturally relevant tracks for the user's location."
+        ),
+        "title_guidelines": {
+            "creativity_required": True,
+            "avoid_cliches": ["Gentle", "Gentle Dawn", "Calm", "Serenity", "Quiet", "Stillness"],
+            "length_words_range": [3, 6],
+            "no_colon_or_em_dash": True,
+            "prefer_location_language": True,
+            "thematic_requirements": "Evocative, hopeful, and culturally resonant; reflect ISO journey without generic adjectives."
+        },
+        "audio_feature_guidelines": {
+            "map_pre_mood_to_valence": True,
+            "target_uplift_valence": 0.20,
+            "start_energy_range": [0.20, 0.45],
+            "final_energy_range": [0.55, 0.80],
+            "require_tempo_variation_percent": 50,  # require at least ~50% tempo spread across playlist
+            "start_tempo_bpm_range": [60, 90],
+            "middle_tempo_bpm_range": [75, 110],
+            "final_tempo_bpm_range": [95, 130],
+            "tempo_crescendo_required": True,
+            "encourage_instrumentation_mix": True
+        },
+        "sequencing_guidelines": {
+            "early_tracks": "Tracks 1–5 mirror current affect: lower energy/tempo, valence near current mood.",
+            "middle_tracks": "Tracks 6–11 gradually increase valence, energy, and tempo; introduce more rhythmic drive.",
+            "final_tracks": "Tracks 12–15 reach a confident, upbeat resolution: higher energy and tempo within safe lyrical themes.",
+            "end_section_min_high_energy_tracks": 3
+        },
+        "diversity_guidelines": {
+            "max_tracks_per_artist": 1,
+            "min_unique_genres": 3,
+            "min_unique_decades": 2,
+            "avoid_too_many_similar_sounding": True,
+            "prefer_varied_vocal_styles": True,
+            "prefer_mix_of_international_and_local_artists": True,
+            "avoid_specific_titles": ["Holocene", "Heartbeats", "Fast Car"],
+            "avoid_covers_or_near_duplications": True
+        },
+        "curation_rules": {
+            "do_not_repeat_artist_names": True,
+            "do_not_repeat_track_titles": True,
+            "include_at_least_one_instrumental_or_ambient_track": True,
+            "prefer_popular_tracks": True,
+            "include_at_least_one_track_from_user_top_ids_if_fit": True,
+            "playlist_length_exact": 15
+        },
+        "safety": {
+            "avoid_explicit_unless_allowed": True,
+            "avoid_triggering_lyrics": True
+        },
+        "location_guidelines": {
+            "user_location_applied": True,
+            "prefer_local_language_and_artists": True,
+            "include_at_least_five_local_tracks": True,
+            "examples_of_locations": ["Indonesia", "United States", "Japan", "Brazil"]
+        },
+        "output_format": (
+            "Return ONLY a valid JSON object with this structure format:\n\n"
+            "{\n"
+            "  \"playlist_title\": \"<playlist title>\",\n"
+            "  \"description\": \"<1–2 sentences describing the playlist>\",\n"
+            "  \"playlist\": [\n"
+            "    {\"title\": \"<song title 1>\", \"artist\": \"<artist name 1>\"},\n"
+            "    {\"title\": \"<song title 2>\", \"artist\": \"<artist name 2>\"}\n"
+            "  ],\n"
+            "  \"genres\": [\"<genre 1>\", \"<genre 2>\", \"<genre 3>\"]\n"
+            "}\n\n"
+            "DO NOT copy or reuse the example titles, artists, or genres. "
+            "Generate completely new and context-appropriate content for the current user data. "
+            "Ensure playlist tracks follow the diversity and curation rules above. "
+            "The \"playlist\" array MUST contain exactly 15 items. "
+            "Choose only real and verifiable songs/artists; prioritize well-known/popular tracks relevant to the user's location. "
+            "If a user's phq9_score >= phq_threshold_referral (20), include a compassionate referral suggestion as part of the description (one short sentence) but still return the JSON structure exactly as specified."
+        )
+    }
+}
+# JSON ringkas tanpa indentasi dan tanpa escape \uXXXX, kurung kurawal penutup dibuang
+# supaya blok "user" tinggal disambung per request
+_PROMPT_PREFIX = json.dumps(_PROMPT_STATIC, ensure_ascii=False, separators=(",", ":"))[:-1]
+
+
 def build_prompt_playlist_healing(
     pre_mood: int,
     phq9: int,
     location: str,
     top_ids: Optional[List[str]] = None
 ) -> str:
+    user = {
+        "pre_mood_slider": pre_mood,
+        "phq9_score": phq9,
+        "user_location": location or "Indonesia",
+        "top_spotify_ids": top_ids or []
+    }
+    return _PROMPT_PREFIX + ',"user":' + json.dumps(user, ensure_ascii=False, separators=(",", ":")) + "}"
+
+
+PLAYLIST_LENGTH = 15  # jumlah lagu yang diminta oleh prompt (playlist_length_exact)
+
+_FOLLOWUP_FORMAT = {
+    "playlist": [{"title": "<song title>", "artist": "<artist name>"}],
+    "playlist_title": "<3-6 word playlist title>",
+    "description": "<1-2 sentences describing the playlist>",
+    "genres": ["<genre>"],
+}
+
+
+def track_key(track: Dict) -> Tuple[str, str]:
+    return (str(track.get("title") or "").strip().casefold(), str(track.get("artist") or "").strip().casefold())
+
+
+def parse_playlist_response(text: str) -> Tuple[AIPlaylist, bool]:
+    """
+    Parse and validate a playlist reply, returning (playlist, repaired). Fences and
+    broken or truncated JSON are repaired; invalid and duplicate tracks are dropped.
+    Raises ValueError when the reply holds no JSON object at all.
+    """
+    data, repaired = parse_llm_json(text)
+    if not isinstance(data, dict):
+        raise ValueError("AI response is not a JSON object")
+
+    tracks: List[AITrack] = []
+    seen = set()
+    items = data.get("playlist") if isinstance(data.get("playlist"), list) else []
+    for item in items:
+        try:
+            track = AITrack.model_validate(item)
+        except ValidationError:
+            continue
+        key = track_key(track.model_dump())
+        if key not in seen:
+            seen.add(key)
+            tracks.append(track)
+
+    def text_field(name: str) -> Optional[str]:
+        value = data.get(name)
+        return (value.strip() or None) if isinstance(value, str) else None
+
+    genres = data.get("genres") if isinstance(data.get("genres"), list) else []
+    return AIPlaylist(
+        playlist_title=text_field("playlist_title"),
+        description=text_field("description"),
+        playlist=tracks[:PLAYLIST_LENGTH],
+        genres=[genre.strip() for genre in genres if isinstance(genre, str) and genre.strip()],
+    ), repaired
+
+
+def build_prompt_missing_items(playlist: AIPlaylist, pre_mood: int, phq9: int, location: str) -> str:
+    """Short follow-up prompt asking only for what the first reply is missing"""
+    missing_tracks = PLAYLIST_LENGTH - len(playlist.playlist)
+    keys = [key for key, missing in (
+        ("playlist", missing_tracks > 0),
+        ("playlist_title", not playlist.playlist_title),
+        ("description", not playlist.description),
+        ("genres", not playlist.genres),
+    ) if missing]
+
+    instructions = {
+        "return_only_keys": keys,
+        "output_format": {key: _FOLLOWUP_FORMAT[key] for key in keys},
+    }
+    if missing_tracks > 0:
+        instructions.update({
+            "tracks_needed": missing_tracks,
+            "positions": f"tracks {len(playlist.playlist) + 1}-{PLAYLIST_LENGTH} of {PLAYLIST_LENGTH}",
+            "iso_principle": "Tracks 1-5 mirror the current mood, 6-11 gradually lift valence, energy and tempo, 12-15 reach a confident, upbeat resolution.",
+            "rules": "Only real songs that exist on Spotify. At most one track per artist, none of the existing tracks or their artists. Prefer popular tracks and at least some local artists for the user's location.",
+        })
+
     prompt = {
         "system": (
-            "You are a clinical-aware music recommender for a healing-mode web app. "
-            "Your output MUST be exactly a JSON object with four keys: "
-            "'playlist_title' (string), 'description' (string), "
-            "'playlist' (array of objects with 'title' and 'artist'), and 'genres' (array of strings)."
+            "You are completing a therapeutic healing playlist whose first draft came back incomplete. "
+            "Return ONLY a valid JSON object with the keys listed in instructions.return_only_keys."
         ),
-        "instructions": {
-            "goal": (
-                "Generate a therapeutic Spotify playlist to help regulate mood using the ISO principle: "
-                "start by reflecting the user's current affect (based on pre_mood) and then gently uplift toward calm, relief, or hope. "
-                "Create a playlist title and description that feel compassionate, soothing, and emotionally validating. "
-                "Songs must align with the mood journey and safety criteria. "
-                "Only include real, existing songs and artists that can be found on Spotify; prioritize popular and culturally relevant tracks for the user's location."
-            ),
-            "title_guidelines": {
-                "creativity_required": True,
-                "avoid_cliches": ["Gentle", "Gentle Dawn", "Calm", "Serenity", "Quiet", "Stillness"],
-                "length_words_range": [3, 6],
-                "no_colon_or_em_dash": True,
-                "prefer_location_language": True,
-                "thematic_requirements": "Evocative, hopeful, and culturally resonant; reflect ISO journey without generic adjectives."
-            },
-            "audio_feature_guidelines": {
-                "map_pre_mood_to_valence": True,
-                "target_uplift_valence": 0.20,
-                "start_energy_range": [0.20, 0.45],
-                "final_energy_range": [0.55, 0.80],
-                "require_tempo_variation_percent": 50,  # require at least ~50% tempo spread across playlist
-                "start_tempo_bpm_range": [60, 90],
-                "middle_tempo_bpm_range": [75, 110],
-                "final_tempo_bpm_range": [95, 130],
-                "tempo_crescendo_required": True,
-                "encourage_instrumentation_mix": True
-            },
-            "sequencing_guidelines": {
-                "early_tracks": "Tracks 1–5 mirror current affect: lower energy/tempo, valence near current mood.",
-                "middle_tracks": "Tracks 6–11 gradually increase valence, energy, and tempo; introduce more rhythmic drive.",
-                "final_tracks": "Tracks 12–15 reach a confident, upbeat resolution: higher energy and tempo within safe lyrical themes.",
-                "end_section_min_high_energy_tracks": 3
-            },
-            "diversity_guidelines": {
-                "max_tracks_per_artist": 1,
-                "min_unique_genres": 3,
-                "min_unique_decades": 2,
-                "avoid_too_many_similar_sounding": True,
-                "prefer_varied_vocal_styles": True,
-                "prefer_mix_of_international_and_local_artists": True,
-                "avoid_specific_titles": ["Holocene", "Heartbeats", "Fast Car"],
-                "avoid_covers_or_near_duplications": True
-            },
-            "curation_rules": {
-                "do_not_repeat_artist_names": True,
-                "do_not_repeat_track_titles": True,
-                "include_at_least_one_instrumental_or_ambient_track": True,
-                "prefer_popular_tracks": True,
-                "include_at_least_one_track_from_user_top_ids_if_fit": True,
-                "playlist_length_exact": 15
-            },
-            "safety": {
-                "avoid_explicit_unless_allowed": True,
-                "avoid_triggering_lyrics": True
-            },
-            "location_guidelines": {
-                "user_location_applied": True,
-                "prefer_local_language_and_artists": True,
-                "include_at_least_five_local_tracks": True,
-                "examples_of_locations": ["Indonesia", "United States", "Japan", "Brazil"]
-            },
-            "output_format": (
-                "Return ONLY a valid JSON object with this structure format:\n\n"
-                "{\n"
-                "  \"playlist_title\": \"<playlist title>\",\n"
-                "  \"description\": \"<1–2 sentences describing the playlist>\",\n"
-                "  \"playlist\": [\n"
-                "    {\"title\": \"<song title 1>\", \"artist\": \"<artist name 1>\"},\n"
-                "    {\"title\": \"<song title 2>\", \"artist\": \"<artist name 2>\"}\n"
-                "  ],\n"
-                "  \"genres\": [\"<genre 1>\", \"<genre 2>\", \"<genre 3>\"]\n"
-                "}\n\n"
-                "DO NOT copy or reuse the example titles, artists, or genres. "
-                "Generate completely new and context-appropriate content for the current user data. "
-                "Ensure playlist tracks follow the diversity and curation rules above. "
-                "The \"playlist\" array MUST contain exactly 15 items. "
-                "Choose only real and verifiable songs/artists; prioritize well-known/popular tracks relevant to the user's location. "
-                "If a user's phq9_score >= phq_threshold_referral (20), include a compassionate referral suggestion as part of the description (one short sentence) but still return the JSON structure exactly as specified."
-            )
+        "instructions": instructions,
+        "existing_playlist": {
+            "playlist_title": playlist.playlist_title,
+            "tracks": [f"{track.title} - {track.artist}" for track in playlist.playlist],
         },
         "user": {
             "pre_mood_slider": pre_mood,
             "phq9_score": phq9,
             "user_location": location or "Indonesia",
-            "top_spotify_ids": top_ids or []
-        }
+        },
     }
-    return json.dumps(prompt, indent=2)
\ No newline at end of file
+    return json.dumps(prompt, ensure_ascii=False, separators=(",", ":"))
+
+
+def _merge(playlist: AIPlaylist, followup: AIPlaylist) -> AIPlaylist:
+    tracks = list(playlist.playlist)
+    seen = {track_key(track.model_dump()) for track in tracks}
+    artists = {key[1] for key in seen}
+    for track in followup.playlist:
+        key = track_key(track.model_dump())
+        if len(tracks) < PLAYLIST_LENGTH and key not in seen and key[1] not in artists:
+            seen.add(key)
+            artists.add(key[1])
+            tracks.append(track)
+    return AIPlaylist(
+        playlist_title=playlist.playlist_title or followup.playlist_title,
+        description=playlist.description or followup.description,
+        playlist=tracks,
+        genres=playlist.genres or followup.genres,
+    )
+
+
+def complete_playlist_response(text: str, pre_mood: int, phq9: int, location: str) -> Dict:
+    """
+    Turn a playlist reply into the dict used by create_playlist. When the reply is only
+    partly usable (no title, fewer than PLAYLIST_LENGTH valid tracks) a follow-up
+    prompt asks for just the missing items instead of regenerating the whole playlist.
+    Raises ValueError when no title or no track could be obtained.
+    """
+    try:
+        playlist, repaired = parse_playlist_response(text)
+    except ValueError:
+        _count("responses_unusable")
+        raise
+    _count("responses_repaired" if repaired else "responses_valid")
+
+    for _ in range(AI_FOLLOWUP_ATTEMPTS):
+        if playlist.playlist_title and len(playlist.playlist) >= PLAYLIST_LENGTH:
+            break
+        print(f"AI response incomplete ({len(playlist.playlist)} tracks, title: {bool(playlist.playlist_title)}), asking for the missing items")
+        _count("followups")
+        try:
+            followup, _ = parse_playlist_response(call_hf_api(build_prompt_missing_items(playlist, pre_mood, phq9, location)))
+        except Exception as e:
+            print(f"AI follow-up failed: {str(e)}")
+            break
+        playlist = _merge(playlist, followup)
+
+    if not playlist.playlist_title or not playlist.playlist:
+        _count("responses_unusable")
+        raise ValueError("AI response has no usable playlist title or tracks")
+    return playlist.model_dump()
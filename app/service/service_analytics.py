@@ -0,0 +1,160 @@
+"""
+Population-level mood outcome analytics (analytics_summary).
+
+refresh_analytics is the only code that scans the playlist tables for these numbers.
+It runs as a batch (app.command.refresh_analytics) and replaces the whole summary in
+one transaction; the admin endpoint only reads the small summary table.
+"""
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from sqlalchemy import case, delete, distinct, func, insert, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.model.analytics_summary import AnalyticsSummaryModel
+from app.model.playlist import PlaylistModel
+from app.model.playlist_genre import PlaylistGenreModel
+
+DIMENSIONS = ("overall", "depression_level", "phq9_band", "week", "genre")
+PHQ9_BANDS = ("0-4", "5-9", "10-14", "15-19", "20-27")
+UNKNOWN = "unknown"
+
+_summary = AnalyticsSummaryModel.__table__
+
+# Kolom GROUPING(...) dan grouping set yang dihitung dalam satu query
+_GROUPED_COLUMNS = ("depression_level", "phq9_band", "week")
+_GROUPING_SETS = ((), ("depression_level",), ("phq9_band",), ("week",))
+
+# Bit GROUPING(depression_level, phq9_band, week) bernilai 1 untuk kolom yang tidak ikut di-group
+_GROUPING_DIMENSIONS = {
+    0b111: "overall",
+    0b011: "depression_level",
+    0b101: "phq9_band",
+    0b110: "week",
+}
+
+
+def _sessions_subquery():
+    """One row per playlist with the bucket of every dimension already computed"""
+    playlist = PlaylistModel.__table__
+    score = playlist.c.phq9_score
+    return select(
+        playlist.c.spotify_id,
+        (playlist.c.post_mood - playlist.c.pre_mood).label("delta"),
+        func.coalesce(func.nullif(playlist.c.depression_level, ""), UNKNOWN).label("depression_level"),
+        case(
+            (score.is_(None), UNKNOWN),
+            (score <= 4, "0-4"),
+            (score <= 9, "5-9"),
+            (score <= 14, "10-14"),
+            (score <= 19, "15-19"),
+            else_="20-27",
+        ).label("phq9_band"),
+        func.to_char(func.date_trunc("week", playlist.c.created_at), "YYYY-MM-DD").label("week"),
+    ).subquery("sessions")
+
+
+def _metrics(sessions) -> List:
+    return [
+        func.count().label("session_count"),
+        func.count(distinct(sessions.c.spotify_id)).label("user_count"),
+        func.coalesce(func.sum(sessions.c.delta), 0).label("mood_delta_sum"),
+        func.count(sessions.c.delta).label("mood_delta_count"),
+        func.count().filter(sessions.c.delta > 0).label("improved_count"),
+    ]
+
+
+def _row(dimension: str, bucket: str, row) -> Dict:
+    return {
+        "dimension": dimension,
+        "bucket": bucket,
+        "session_count": row.session_count,
+        "user_count": row.user_count,
+        "mood_delta_sum": row.mood_delta_sum,
+        "mood_delta_count": row.mood_delta_count,
+        "improved_count": row.improved_count,
+    }
+
+
+def compute_analytics(db: Session) -> List[Dict]:
+    """
+    Aggregate every session in two queries: one GROUPING SETS pass for the overall,
+    depression level, PHQ-9 band and week summaries, and one pass over playlist_genre.
+    """
+    sessions = _sessions_subquery()
+    columns = [sessions.c[name] for name in _GROUPED_COLUMNS]
+
+    grouped = db.execute(
+        select(func.grouping(*columns).label("grouping"), *columns, *_metrics(sessions))
+        .group_by(func.grouping_sets(*[tuple_(*[sessions.c[name] for name in grouping_set]) for grouping_set in _GROUPING_SETS]))
+    ).all()
+
+    return [_grouped_row(row) for row in grouped] + compute_genre_analytics(db)
+
+
+def _grouped_row(row) -> Dict:
+    dimension = _GROUPING_DIMENSIONS[row.grouping]
+    bucket = "all" if dimension == "overall" else getattr(row, dimension)
+    return _row(dimension, bucket, row)
+
+
+def compute_genre_analytics(db: Session) -> List[Dict]:
+    """The genre summary: one row per (playlist, genre), so a session counts once for each of its genres"""
+    playlist = PlaylistModel.__table__
+    playlist_genre = PlaylistGenreModel.__table__
+    genre_sessions = (
+        select(playlist.c.spotify_id, (playlist.c.post_mood - playlist.c.pre_mood).label("delta"), playlist_genre.c.name)
+        .select_from(playlist_genre.join(playlist, playlist_genre.c.playlist_id == playlist.c.id))
+        .subquery("genre_sessions")
+    )
+    return [
+        _row("genre", row.name, row)
+        for row in db.execute(
+            select(genre_sessions.c.name, *_metrics(genre_sessions)).group_by(genre_sessions.c.name)
+        ).all()
+    ]
+
+
+def refresh_analytics(db: Session) -> int:
+    """
+    Recompute analytics_summary in the caller's transaction; readers keep seeing the
+    previous summary until it commits. Returns the number of summary rows written.
+    """
+    rows = compute_analytics(db)
+    db.execute(delete(_summary))
+    if rows:
+        computed_at = func.now()
+        db.execute(insert(_summary).values(computed_at=computed_at), rows)
+    return len(rows)
+
+
+def _sort_key(dimension: str, bucket: str):
+    if dimension == "phq9_band" and bucket in PHQ9_BANDS:
+        return PHQ9_BANDS.index(bucket), bucket
+    return len(PHQ9_BANDS), bucket
+
+
+async def get_analytics(db: AsyncSession, dimension: Optional[str] = None) -> Dict:
+    query = select(_summary)
+    if dimension is not None:
+        query = query.where(_summary.c.dimension == dimension)
+    result = await db.execute(query)
+
+    summary: Dict[str, List[Dict]] = OrderedDict((name, []) for name in DIMENSIONS if dimension in (None, name))
+    computed_at = None
+    for row in sorted(result.mappings().all(), key=lambda r: _sort_key(r["dimension"], r["bucket"])):
+        computed_at = max(computed_at, row["computed_at"]) if computed_at else row["computed_at"]
+        summary.setdefault(row["dimension"], []).append({
+            "bucket": row["bucket"],
+            "session_count": row["session_count"],
+            "user_count": row["user_count"],
+            "sessions_with_both_moods": row["mood_delta_count"],
+            "avg_mood_delta": round(row["mood_delta_sum"] / row["mood_delta_count"], 2) if row["mood_delta_count"] else None,
+            "improvement_rate": round(row["improved_count"] / row["mood_delta_count"], 3) if row["mood_delta_count"] else None,
+        })
+
+    return {
+        "computed_at": computed_at,
+        "summary": summary,
+    }
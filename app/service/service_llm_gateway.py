@@ -0,0 +1,373 @@
+"""
+Gateway over the OpenAI-compatible LLM providers listed in LLM_PROVIDERS.
+
+Calls go to the first healthy provider; when it has not answered within its
+LLM_HEDGE_PERCENTILE latency, the same request is also sent to the next healthy
+provider and the first successful answer wins. Streamed calls are hedged the same way
+on time to first token: the stream that yields first is kept and the other is closed.
+A failed call fails over to the next provider straight away. At most
+LLM_HEDGE_MAX_CONCURRENCY hedges are in flight; a hedge holds its slot until every
+request of its call has finished (for streams: received its first chunk or failed), so
+abandoned requests can never take more than that many threads. Each provider has a
+circuit breaker (skipped for LLM_BREAKER_COOLDOWN seconds after LLM_BREAKER_FAILURES
+consecutive failures), a latency histogram with error counts and separate recent
+latencies for completions and first tokens, reported by get_stats().
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from app.config.config import (
+    HF_BASE_URL,
+    HF_MODEL,
+    HF_TIMEOUT,
+    LLM_BREAKER_COOLDOWN,
+    LLM_BREAKER_FAILURES,
+    LLM_HEDGE_DEFAULT_DELAY,
+    LLM_HEDGE_MAX_CONCURRENCY,
+    LLM_HEDGE_MIN_DELAY,
+    LLM_HEDGE_MIN_SAMPLES,
+    LLM_HEDGE_PERCENTILE,
+    LLM_MAX_CONCURRENCY,
+    LLM_PROVIDERS,
+)
+from app.config.http_client import get_client_registry
+
+# Batas atas bucket histogram latency dalam detik
+LATENCY_BUCKETS = (0.5, 1, 2, 5, 10, 20, 30, 60, 120)
+_RECENT_LATENCIES = 200
+
+# Pool utama menyisakan tempat untuk request yang kalah dari hedge dan masih berjalan.
+# Stream hanya memakai thread pool sampai chunk pertama, sisanya dibaca di thread pemanggil
+_executor = ThreadPoolExecutor(max_workers=LLM_MAX_CONCURRENCY + LLM_HEDGE_MAX_CONCURRENCY, thread_name_prefix="llm")
+_hedge_executor = ThreadPoolExecutor(max_workers=max(1, LLM_HEDGE_MAX_CONCURRENCY), thread_name_prefix="llm-hedge")
+_hedge_slots = threading.BoundedSemaphore(LLM_HEDGE_MAX_CONCURRENCY)
+
+
+def _percentile(values: List[float], percentile: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(percentile / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+class Provider:
+    def __init__(self, name: str, base_url: str, model: str, api_key: Optional[str], timeout: float, max_retries: int):
+        self.name = name
+        self.base_url = base_url
+        self.model = model
+        self.api_key = api_key
+        self.timeout = timeout
+        self.max_retries = max_retries
+
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=_RECENT_LATENCIES)
+        # Stream dicatat terpisah: time to first token, bukan durasi seluruh generasi
+        self._first_token_latencies = deque(maxlen=_RECENT_LATENCIES)
+        self._histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+        self._consecutive_failures = 0
+        self._open_until = 0.0
+        self._stats = {
+            "requests": 0,
+            "errors": 0,
+            "hedges": 0,
+            "hedges_skipped": 0,
+            "wins": 0,
+            "breaker_opened": 0,
+        }
+
+    @property
+    def client(self):
+        return get_client_registry().llm_client(self.base_url, self.api_key, self.timeout, self.max_retries)
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def available(self) -> bool:
+        """
+        Closed breaker, or an open one whose cooldown is over (half-open): the next
+        request is a trial, one more failure opens it again for a full cooldown.
+        """
+        with self._lock:
+            return self._consecutive_failures < LLM_BREAKER_FAILURES or time.monotonic() >= self._open_until
+
+    def record(self, latency: float, ok: bool, first_token: bool = False) -> None:
+        """
+        Record one request: `latency` is the full call for completions, or the time
+        to the first chunk for streams (`first_token`). The histogram only holds
+        completions, so the two are never mixed.
+        """
+        with self._lock:
+            self._stats["requests"] += 1
+            if not first_token:
+                self._histogram[next((i for i, bound in enumerate(LATENCY_BUCKETS) if latency <= bound), len(LATENCY_BUCKETS))] += 1
+            if ok:
+                (self._first_token_latencies if first_token else self._latencies).append(latency)
+                self._consecutive_failures = 0
+                return
+            self._failed()
+
+    def record_stream_error(self) -> None:
+        """A stream that broke after its first chunk; the request itself was already recorded"""
+        with self._lock:
+            self._failed()
+
+    def _failed(self) -> None:
+        self._stats["errors"] += 1
+        self._consecutive_failures += 1
+        if self._consecutive_failures >= LLM_BREAKER_FAILURES:
+            if time.monotonic() >= self._open_until:
+                self._stats["breaker_opened"] += 1
+            self._open_until = time.monotonic() + LLM_BREAKER_COOLDOWN
+
+    @staticmethod
+    def _delay(latencies: List[float]) -> float:
+        if len(latencies) < LLM_HEDGE_MIN_SAMPLES:
+            return LLM_HEDGE_DEFAULT_DELAY
+        return max(LLM_HEDGE_MIN_DELAY, _percentile(latencies, LLM_HEDGE_PERCENTILE))
+
+    def hedge_delay(self) -> float:
+        with self._lock:
+            latencies = list(self._latencies)
+        return self._delay(latencies)
+
+    def first_token_delay(self) -> float:
+        with self._lock:
+            latencies = list(self._first_token_latencies)
+        return self._delay(latencies)
+
+    def complete(self, messages: List[Dict]):
+        started = time.monotonic()
+        try:
+            completion = self.client.chat.completions.create(model=self.model, messages=messages)
+        except Exception:
+            self.record(time.monotonic() - started, ok=False)
+            raise
+        self.record(time.monotonic() - started, ok=True)
+        return completion
+
+    def open_stream(self, messages: List[Dict]) -> Tuple[object, Iterator, Optional[object]]:
+        """
+        Start a streamed completion and wait for its first chunk. Returns (stream,
+        chunk iterator, first chunk or None for an empty stream); the caller reads the
+        rest of the iterator and closes the stream.
+        """
+        started = time.monotonic()
+        try:
+            response = self.client.chat.completions.create(model=self.model, messages=messages, stream=True)
+            chunks = iter(response)
+            first = next(chunks, None)
+        except Exception:
+            self.record(time.monotonic() - started, ok=False, first_token=True)
+            raise
+        self.record(time.monotonic() - started, ok=True, first_token=True)
+        return response, chunks, first
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            latencies = list(self._latencies)
+            first_token_latencies = list(self._first_token_latencies)
+            histogram = list(self._histogram)
+            breaker_open = self._consecutive_failures >= LLM_BREAKER_FAILURES
+            open_for = max(0.0, self._open_until - time.monotonic()) if breaker_open else 0.0
+
+        stats.update({
+            "model": self.model,
+            "breaker": "open" if open_for > 0 else "half-open" if breaker_open else "closed",
+            "error_rate": round(stats["errors"] / stats["requests"], 3) if stats["requests"] else None,
+            "p50_seconds": _percentile(latencies, 50),
+            "p95_seconds": _percentile(latencies, 95),
+            "p99_seconds": _percentile(latencies, 99),
+            "first_token_p50_seconds": _percentile(first_token_latencies, 50),
+            "first_token_p95_seconds": _percentile(first_token_latencies, 95),
+            "histogram": {
+                **{f"le_{bound}": count for bound, count in zip(LATENCY_BUCKETS, histogram)},
+                "le_inf": histogram[-1],
+            },
+        })
+        return stats
+
+
+def _load_providers() -> List[Provider]:
+    configured = json.loads(LLM_PROVIDERS) if LLM_PROVIDERS else [
+        {"name": "huggingface", "base_url": HF_BASE_URL, "model": HF_MODEL, "api_key_env": "HF_TOKEN", "timeout": HF_TIMEOUT}
+    ]
+    if not isinstance(configured, list) or not configured:
+        raise ValueError("LLM_PROVIDERS must be a non-empty JSON list of providers")
+    for item in configured:
+        if not isinstance(item, dict) or not item.get("model"):
+            raise ValueError(f"LLM_PROVIDERS entry without a model: {item!r}")
+    # Dengan satu provider retry bawaan client dipertahankan, dengan beberapa provider gateway yang melakukan failover
+    default_retries = 2 if len(configured) == 1 else 0
+    return [
+        Provider(
+            name=item.get("name") or item["model"],
+            base_url=item.get("base_url", HF_BASE_URL),
+            model=item["model"],
+            api_key=os.getenv(item.get("api_key_env", "HF_TOKEN")),
+            timeout=float(item.get("timeout", HF_TIMEOUT)),
+            max_retries=int(item.get("max_retries", default_retries)),
+        )
+        for item in configured
+    ]
+
+
+_providers: Optional[List[Provider]] = None
+_providers_lock = threading.Lock()
+
+
+def get_providers() -> List[Provider]:
+    global _providers
+    if _providers is None:
+        with _providers_lock:
+            if _providers is None:
+                _providers = _load_providers()
+    return _providers
+
+
+def _healthy_providers() -> List[Provider]:
+    providers = get_providers()
+    healthy = [provider for provider in providers if provider.available()]
+    # Semua breaker terbuka: tetap coba provider pertama daripada langsung gagal
+    return healthy or providers[:1]
+
+
+def _release_when_done(futures: List[Future], slots: int) -> None:
+    """Give the hedge slots of a call back once all of its requests have finished"""
+    if not slots:
+        return
+    lock = threading.Lock()
+    left = [len(futures)]
+
+    def finished(_):
+        with lock:
+            left[0] -= 1
+            if left[0]:
+                return
+        for _ in range(slots):
+            _hedge_slots.release()
+
+    for future in futures:
+        future.add_done_callback(finished)
+
+
+def _race(
+    call: Callable[[Provider], object],
+    delay: Callable[[Provider], float],
+    abandoned: Optional[Callable[[Future], None]] = None,
+) -> Tuple[object, Provider]:
+    """
+    Run `call` on the first healthy provider, hedge to the next one once `delay` of
+    the latest provider has passed, and fail over on errors. Returns the first
+    successful (result, provider); requests that lose are cancelled if they have not
+    started, otherwise handed to `abandoned` when they finish. Raises the last
+    provider error when every provider failed.
+    """
+    remaining = _healthy_providers()
+    pending: Dict[Future, Provider] = {}
+    launched: List[Future] = []
+    hedges = 0
+    last_error: Optional[Exception] = None
+
+    def launch(hedge: bool) -> Provider:
+        provider = remaining.pop(0)
+        if hedge:
+            provider.count("hedges")
+            print(f"LLM provider slow, hedging request to {provider.name}")
+        future = (_hedge_executor if hedge else _executor).submit(call, provider)
+        pending[future] = provider
+        launched.append(future)
+        return provider
+
+    try:
+        latest = launch(hedge=False)
+        can_hedge = True
+        while pending:
+            timeout = delay(latest) if remaining and can_hedge else None
+            done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                if _hedge_slots.acquire(blocking=False):
+                    hedges += 1
+                    latest = launch(hedge=True)
+                else:
+                    # Semua slot hedge terpakai: tunggu provider yang sedang berjalan saja
+                    latest.count("hedges_skipped")
+                    can_hedge = False
+                continue
+
+            for future in done:
+                provider = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"LLM provider {provider.name} failed: {str(e)}")
+                    last_error = e
+                    continue
+                provider.count("wins")
+                # Request yang kalah dan belum mulai dibatalkan; yang sudah berjalan
+                # dibiarkan selesai, hasilnya tetap masuk statistik
+                for loser in pending:
+                    if not loser.cancel() and abandoned is not None:
+                        loser.add_done_callback(abandoned)
+                return result, provider
+
+            if remaining:
+                latest = launch(hedge=False)
+                can_hedge = True
+
+        raise last_error
+    finally:
+        _release_when_done(launched, hedges)
+
+
+def complete(messages: List[Dict]) -> Tuple[object, str]:
+    """
+    Chat completion through the gateway, returns (completion, provider name).
+    Raises the last provider error when every provider failed.
+    """
+    completion, provider = _race(lambda provider: provider.complete(messages), Provider.hedge_delay)
+    return completion, provider.name
+
+
+def _close_abandoned_stream(future: Future) -> None:
+    """Close a losing stream once it has opened, so its connection goes back to the pool"""
+    if future.cancelled() or future.exception() is not None:
+        return
+    response, _, _ = future.result()
+    try:
+        response.close()
+    except Exception as e:
+        print(f"Failed to close abandoned LLM stream: {str(e)}")
+
+
+def stream(messages: List[Dict]) -> Iterator[Tuple[object, str]]:
+    """
+    Streamed chat completion through the gateway, yielding (raw chunk, provider
+    name). Hedged and failed over like complete() until the first chunk arrives;
+    after that the winning stream is read to the end and errors are raised.
+    """
+    (response, chunks, first), provider = _race(
+        lambda provider: provider.open_stream(messages), Provider.first_token_delay, _close_abandoned_stream
+    )
+    try:
+        if first is None:
+            return
+        yield first, provider.name
+        for chunk in chunks:
+            yield chunk, provider.name
+    except Exception:
+        provider.record_stream_error()
+        raise
+    finally:
+        response.close()
+
+
+def get_stats() -> Dict:
+    return {provider.name: provider.get_stats() for provider in get_providers()}
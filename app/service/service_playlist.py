@@ -1,22 +1,36 @@
 import os
-import json
 import uuid
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict
-from sqlalchemy.orm import Session
+from typing import List, Optional, Dict, Sequence, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 from fastapi import HTTPException
-import spotipy
-from sqlalchemy import func
-from collections import Counter
+from sqlalchemy import delete, func, insert, select, update
 
+from app.config.config import AI_STREAMING, CHART_MAX_POINTS, DRAFT_POOL_ENABLED, PLAYLIST_LOCATION, PLAYLIST_PAGE_SIZE, SPOTIFY_MARKET
+from app.config.http_client import get_client_registry
 from app.model.playlist import PlaylistModel
 from app.model.playlist_track import PlaylistTrackModel
 from app.model.playlist_genre import PlaylistGenreModel
 from app.model.user import UserModel
-from app.schemas.schemas_playlist import PlaylistCreate, DashboardResponse, ChartMoodItem
-from app.service.service_ai import build_prompt_playlist_healing, call_hf_api
+from app.model.user_stats import UserStatsModel
+from app.schemas.schemas_playlist import PlaylistCreate, PlaylistResponse, PlaylistSummaryResponse, DashboardResponse
+from app.schemas.schemas_playlist_genre import PlaylistGenreResponse
+from app.schemas.schemas_playlist_track import PlaylistTrackResponse
+from app.service.service_ai import (
+    build_prompt_playlist_healing,
+    call_hf_api,
+    call_hf_api_stream,
+    complete_playlist_response,
+    track_key,
+)
+from app.service import service_playlist_draft, service_response_cache, service_user_stats
+from app.service.service_track import TrackResolver
 from dotenv import load_dotenv, find_dotenv
+from app.util import util_serializer
 from app.util.util_convert_time import calculate_time_ago
+from app.util.util_json_stream import PlaylistItemStreamParser
+from app.util.util_phq9 import get_depression_level
 
 
 load_dotenv(find_dotenv())
@@ -25,174 +39,338 @@ def create_playlist(db: Session, spotify_id: str, pre_mood: int, phq9: int):
     if not user:
         raise HTTPException(status_code=404, detail=f"User with Spotify ID {spotify_id} not found")
     
-    sp = spotipy.Spotify(auth=user.access_token)
+    sp = get_client_registry().spotify(user.access_token)
     
     # 1. Get user's top tracks
     try:
-        top_tracks = sp.current_user_saved_tracks(limit=10, market="ID")
-        top_ids = [item["track"]["uri"] for item in top_tracks["items"]]
+        top_tracks = sp.current_user_saved_tracks(limit=10, market=SPOTIFY_MARKET)
+        saved_tracks = [item["track"] for item in top_tracks["items"]]
+        top_ids = [track["uri"] for track in saved_tracks]
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching top tracks: {str(e)}")
     
-    # 2. Build prompt for AI
-    prompt = build_prompt_playlist_healing(
-        pre_mood=pre_mood,
-        phq9=phq9,
-        location="Indonesia",
-        top_ids=top_ids
-    )
-    
-    # 3. Call AI API
-    try:
-        ai_response = call_hf_api(prompt)
-        ai_data = json.loads(ai_response)
-    except Exception as e:
-        raise HTTPException(
-            status_code=500, 
-            detail=f"Error calling AI API: {str(e)}" + f" HF_TOKEN: {os.getenv('HF_TOKEN')}"
-        )
-    
-    # 4. Extract data from AI response
-    title_ai = ai_data.get("playlist_title")
-    description_ai = ai_data.get("description")
-    playlist_ai = ai_data.get("playlist", [])
-    genres_ai = ai_data.get("genres", [])
-    
-    print(ai_data)
-    
-    # 5. Create playlist in Spotify
-    try:
-        spotify_playlist = sp.user_playlist_create(
-            user=user.spotify_id,
-            name=title_ai,
-            public=False,
-            description=description_ai
+    depression_level = get_depression_level(phq9)
+    
+    # 2. Take a pre-generated draft for this mood bucket; the AI is only called when the pool is empty
+    draft = service_playlist_draft.claim_draft(db, pre_mood, depression_level, PLAYLIST_LOCATION) if DRAFT_POOL_ENABLED else None
+    
+    if draft is not None:
+        title_ai = draft["title"]
+        description_ai = draft["description"]
+        genres_ai = draft["genres"]
+        valid_tracks = service_playlist_draft.personalise(draft["tracks"], saved_tracks)
+        spotify_playlist = _create_spotify_playlist(sp, user.spotify_id, title_ai, description_ai)
+    else:
+        # 3. Build prompt for AI
+        prompt = build_prompt_playlist_healing(
+            pre_mood=pre_mood,
+            phq9=phq9,
+            location=PLAYLIST_LOCATION,
+            top_ids=top_ids
         )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error creating Spotify playlist: {str(e)}")
-    
-    # 6. Search for tracks and add to playlist
-    list_spotify_uri = []
-    valid_tracks = []
-    total_duration_ms = 0
-    
-    for track in playlist_ai:
-        try:
-            query = f"track:{track['title']} artist:{track['artist']}"
-            search_result = sp.search(q=query, type="track", limit=1)
+        
+        with TrackResolver(sp, db=db) as resolver:
+            # 4. Call AI API (streamed tracks are searched speculatively as soon as they are complete)
+            streamed = set()
+            try:
+                if AI_STREAMING:
+                    stream_parser = PlaylistItemStreamParser()
+                    for chunk in call_hf_api_stream(prompt):
+                        for track in stream_parser.feed(chunk):
+                            key = track_key(track)
+                            if key not in streamed:
+                                streamed.add(key)
+                                resolver.submit(track)
+                    ai_response = stream_parser.text
+                else:
+                    ai_response = call_hf_api(prompt)
+                # Jawaban yang rusak diperbaiki, lagu yang kurang diminta lewat prompt lanjutan
+                ai_data = complete_playlist_response(ai_response, pre_mood, phq9, PLAYLIST_LOCATION)
+            except Exception as e:
+                raise HTTPException(
+                    status_code=500, 
+                    detail=f"Error calling AI API: {str(e)}"
+                )
             
-            if search_result["tracks"]["items"]:
-                track_item = search_result["tracks"]["items"][0]
-                track_uri = track_item["uri"]
-                track_duration_ms = track_item["duration_ms"]
-                total_duration_ms += track_duration_ms
-                track["duration"] = track_duration_ms
-                
-                list_spotify_uri.append(track_uri)
-                valid_tracks.append(track)
-        except Exception as e:
-            continue
-    
-    # 7. Add tracks to playlist
+            # 5. Extract data from AI response
+            title_ai = ai_data.get("playlist_title")
+            description_ai = ai_data.get("description")
+            playlist_ai = ai_data.get("playlist", [])
+            genres_ai = ai_data.get("genres", [])
+            
+            print(ai_data)
+            
+            # Lagu yang sudah dikirim saat streaming tidak dicari ulang
+            resolver.submit_many([track for track in playlist_ai if track_key(track) not in streamed])
+            
+            # 6. Create playlist in Spotify while the track searches finish
+            spotify_playlist = _create_spotify_playlist(sp, user.spotify_id, title_ai, description_ai)
+            
+            # 7. Collect resolved tracks: only the validated playlist, in its order.
+            # Item streaming yang dibuang validasi (duplikat, tidak valid, lebih dari 15) diabaikan
+            resolved = {}
+            for track, track_item in resolver.results():
+                resolved.setdefault(track_key(track), track_item)
+            valid_tracks = []
+            for track in playlist_ai:
+                track_item = resolved.get(track_key(track))
+                if track_item is not None:
+                    valid_tracks.append({**track, "duration": track_item["duration_ms"], "uri": track_item["uri"]})
+    
+    list_spotify_uri = [track["uri"] for track in valid_tracks]
+    total_duration_ms = sum(track["duration"] or 0 for track in valid_tracks)
+    
+    # 8. Add tracks to playlist
     if list_spotify_uri:
         try:
             sp.playlist_add_items(playlist_id=spotify_playlist["id"], items=list_spotify_uri)
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error adding tracks to playlist: {str(e)}")
     
-    # 8. Save to database
+    # 9. Save to database
     playlist_id = str(uuid.uuid4())
-    # Determine next sequence number per user
-    last_seq = db.query(func.max(PlaylistModel.sequence_number)).filter(PlaylistModel.spotify_id == user.spotify_id).scalar()
-    next_seq = (last_seq or 0) + 1
-    
-    # Determine depression level based on PHQ-9 score
-    depression_level = ""
-    if phq9 == 0:
-        depression_level = "Tidak Ada Gejala"
-    elif 1 <= phq9 <= 4:
-        depression_level = "Minimal"
-    elif 5 <= phq9 <= 9:
-        depression_level = "Ringan"
-    elif 10 <= phq9 <= 14:
-        depression_level = "Sedang"
-    elif 15 <= phq9 <= 19:
-        depression_level = "Cukup Parah"
-    elif phq9 >= 20:
-        depression_level = "Parah"
     
     playlist_data = PlaylistCreate(
         id=playlist_id,
         spotify_id=user.spotify_id,
         name=title_ai,
-        sequence_number=next_seq,
         phq9_score=phq9,
         depression_level=depression_level,
-        pre_mood=str(pre_mood),
+        pre_mood=pre_mood,
         total_tracks=len(valid_tracks),
         duration=total_duration_ms,
         link_playlist=spotify_playlist["external_urls"]["spotify"],
         mode="healing"
     )
     
-    db_playlist = PlaylistModel(
-        id=playlist_data.id,
-        spotify_id=playlist_data.spotify_id,
-        name=playlist_data.name,
-        sequence_number=playlist_data.sequence_number,
-        phq9_score=playlist_data.phq9_score,
-        depression_level=playlist_data.depression_level,
-        pre_mood=playlist_data.pre_mood,
-        total_tracks=playlist_data.total_tracks,
-        duration=playlist_data.duration,
-        link_playlist=playlist_data.link_playlist,
-        mode=playlist_data.mode
+    return save_playlist(db, playlist_data, valid_tracks, genres_ai)
+
+
+def _create_spotify_playlist(sp, spotify_id: str, name: str, description: str) -> Dict:
+    try:
+        return sp.user_playlist_create(
+            user=spotify_id,
+            name=name,
+            public=False,
+            description=description
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error creating Spotify playlist: {str(e)}")
+
+
+def save_playlist(db: Session, playlist_data: PlaylistCreate, tracks: List[Dict], genres: List[str]) -> PlaylistResponse:
+    """
+    Persist a playlist with its tracks and genres in one transaction using one
+    multi-row INSERT per table, and build the response from the inserted values
+    instead of reloading the rows.
+
+    The per-user sequence number is allocated here with a single
+    UPDATE ... RETURNING on the user's counter, so concurrent creates for the
+    same user are serialized on that row instead of colliding on uq_playlist_user_seq.
+    """
+    playlist_row = playlist_data.model_dump()
+    playlist_row["sequence_number"] = db.execute(
+        update(UserModel.__table__)
+        .where(UserModel.__table__.c.spotify_id == playlist_data.spotify_id)
+        .values(playlist_seq=UserModel.__table__.c.playlist_seq + 1)
+        .returning(UserModel.__table__.c.playlist_seq)
+    ).scalar_one()
+
+    created_at = db.execute(
+        insert(PlaylistModel.__table__).values(**playlist_row).returning(PlaylistModel.__table__.c.created_at)
+    ).scalar_one()
+
+    track_rows = [
+        {
+            "id": str(uuid.uuid4()),
+            "name": track["title"],
+            "artist": track["artist"],
+            "duration": track.get("duration"),
+            "playlist_id": playlist_data.id,
+        }
+        for track in tracks
+    ]
+    if track_rows:
+        db.execute(insert(PlaylistTrackModel.__table__).values(track_rows))
+
+    genre_rows = [
+        {
+            "id": str(uuid.uuid4()),
+            "name": genre,
+            "playlist_id": playlist_data.id,
+        }
+        for genre in genres
+    ]
+    if genre_rows:
+        db.execute(insert(PlaylistGenreModel.__table__).values(genre_rows))
+
+    service_user_stats.apply(db, service_user_stats.playlist_created(
+        playlist_data.spotify_id,
+        genres,
+        service_user_stats.mood_delta(playlist_data.pre_mood, playlist_data.post_mood),
+    ))
+
+    db.commit()
+    service_response_cache.invalidate(playlist_data.spotify_id)
+
+    return PlaylistResponse(
+        **playlist_row,
+        created_at=created_at,
+        time_ago=calculate_time_ago(created_at),
+        tracks=[PlaylistTrackResponse(name=row["name"], artist=row["artist"], duration=row["duration"]) for row in track_rows],
+        genres=[PlaylistGenreResponse(name=row["name"]) for row in genre_rows],
     )
-    
-    db.add(db_playlist)
-    db.flush()
-    
-    # Add tracks
-    for track in valid_tracks:
-        track_id = str(uuid.uuid4())
-        db_track = PlaylistTrackModel(
-            id=track_id,
-            name=track["title"],
-            artist=track["artist"],
-            duration=track.get("duration"),
-            playlist_id=db_playlist.id
+
+
+# Kolom yang dipakai PlaylistSummaryResponse (time_ago dihitung di Python)
+_SUMMARY_COLUMNS = [name for name in PlaylistSummaryResponse.model_fields if name != "time_ago"]
+
+
+def _load_tracks_and_genres():
+    # Muat track dan genre untuk semua playlist sekaligus (satu query per relasi, bukan per playlist)
+    return (selectinload(PlaylistModel.tracks), selectinload(PlaylistModel.genres))
+
+
+PLAYLIST_INCLUDES = ("tracks", "genres")
+
+
+def _page_query(columns, spotify_id: str, limit: int, cursor: Optional[int]):
+    # Satu baris ekstra untuk mengetahui apakah masih ada halaman berikutnya
+    query = (
+        select(*columns)
+        .where(PlaylistModel.spotify_id == spotify_id)
+        .order_by(PlaylistModel.sequence_number.desc())
+        .limit(limit + 1)
+    )
+    if cursor is not None:
+        query = query.where(PlaylistModel.sequence_number < cursor)
+    return query
+
+
+async def get_all_playlists(
+    db: AsyncSession,
+    spotify_id: str,
+    limit: int = PLAYLIST_PAGE_SIZE,
+    cursor: Optional[int] = None,
+    include: Sequence[str] = (),
+) -> Tuple[List[Dict], Optional[int]]:
+    """
+    One page of a user's playlists, newest first, using keyset pagination on
+    (spotify_id, sequence_number). `cursor` is the sequence_number of the last item of
+    the previous page. Only summary columns are selected; tracks and/or genres are
+    loaded in one batched query each when listed in `include`.
+
+    Returns the page as PlaylistListItem-shaped dicts (see util_serializer) and the
+    cursor for the next page (None on the last page).
+    """
+    query = _page_query([PlaylistModel.__table__.c[name] for name in _SUMMARY_COLUMNS], spotify_id, limit, cursor)
+    rows = (await db.execute(query)).mappings().all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    playlist_ids = [row["id"] for row in rows]
+    tracks_by_playlist = {}
+    genres_by_playlist = {}
+    if playlist_ids and "tracks" in include:
+        tracks_by_playlist = await _group_by_playlist(
+            db,
+            select(PlaylistTrackModel.playlist_id, PlaylistTrackModel.name, PlaylistTrackModel.artist, PlaylistTrackModel.duration)
+            .where(PlaylistTrackModel.playlist_id.in_(playlist_ids)),
         )
-        db.add(db_track)
-    
-    # Add genres
-    for genre in genres_ai:
-        genre_id = str(uuid.uuid4())
-        db_genre = PlaylistGenreModel(
-            id=genre_id,
-            name=genre,
-            playlist_id=db_playlist.id
+    if playlist_ids and "genres" in include:
+        genres_by_playlist = await _group_by_playlist(
+            db,
+            select(PlaylistGenreModel.playlist_id, PlaylistGenreModel.name)
+            .where(PlaylistGenreModel.playlist_id.in_(playlist_ids)),
         )
-        db.add(db_genre)
-    
-    db.commit()
-    db.refresh(db_playlist)
-    
-    db_playlist.time_ago = calculate_time_ago(db_playlist.created_at)
-    
-    return db_playlist
 
+    now = datetime.now()
+    playlists = []
+    for row in rows:
+        item = util_serializer.playlist_summary(row, now)
+        if "tracks" in include:
+            item["tracks"] = tracks_by_playlist.get(row["id"], [])
+        if "genres" in include:
+            item["genres"] = genres_by_playlist.get(row["id"], [])
+        playlists.append(item)
 
-def get_all_playlists(db: Session, spotify_id: str):
-    playlists = db.query(PlaylistModel).filter(PlaylistModel.spotify_id == spotify_id).order_by(PlaylistModel.sequence_number.desc()).all()
-    
-    for playlist in playlists:
-        playlist.time_ago = calculate_time_ago(playlist.created_at)
-    
-    return playlists
+    next_cursor = rows[-1]["sequence_number"] if has_more else None
+    return playlists, next_cursor
+
+
+async def _group_by_playlist(db: AsyncSession, query) -> Dict[str, List[Dict]]:
+    grouped: Dict[str, List[Dict]] = {}
+    for row in (await db.execute(query)).mappings():
+        item = dict(row)
+        grouped.setdefault(item.pop("playlist_id"), []).append(item)
+    return grouped
+
+
+async def get_playlist_detail(db: AsyncSession, playlist_id: str) -> Dict:
+    """Read-only variant of get_playlist_by_id returning a PlaylistResponse-shaped dict"""
+    result = await db.execute(
+        select(*[PlaylistModel.__table__.c[name] for name in _SUMMARY_COLUMNS]).where(PlaylistModel.id == playlist_id)
+    )
+    row = result.mappings().first()
+    if not row:
+        raise HTTPException(status_code=404, detail=f"Playlist with ID {playlist_id} not found")
+
+    tracks = await db.execute(
+        select(PlaylistTrackModel.name, PlaylistTrackModel.artist, PlaylistTrackModel.duration)
+        .where(PlaylistTrackModel.playlist_id == playlist_id)
+    )
+    genres = await db.execute(select(PlaylistGenreModel.name).where(PlaylistGenreModel.playlist_id == playlist_id))
+
+    return util_serializer.playlist_detail(row, tracks.mappings().all(), genres.mappings().all())
+
+
+async def get_playlists_page_version(
+    db: AsyncSession,
+    spotify_id: str,
+    limit: int = PLAYLIST_PAGE_SIZE,
+    cursor: Optional[int] = None,
+) -> Tuple:
+    """
+    Cheap version of one page of get_all_playlists, for ETags: the (id, updated_at)
+    of the rows the page would return plus their time_ago labels, read from the
+    (spotify_id, sequence_number) index without loading the summary columns.
+    """
+    rows = (await db.execute(_page_query(
+        [PlaylistModel.id, PlaylistModel.created_at, PlaylistModel.updated_at], spotify_id, limit, cursor
+    ))).all()
+    return (
+        len(rows),
+        tuple((row.id, row.updated_at) for row in rows),
+        tuple(calculate_time_ago(row.created_at) for row in rows[:limit]),
+    )
+
+
+async def get_playlist_version(db: AsyncSession, playlist_id: str):
+    """spotify_id, updated_at and time_ago of a playlist, or None when it does not exist"""
+    result = await db.execute(
+        select(PlaylistModel.spotify_id, PlaylistModel.created_at, PlaylistModel.updated_at)
+        .where(PlaylistModel.id == playlist_id)
+    )
+    row = result.first()
+    if row is None:
+        return None
+    return row.spotify_id, row.updated_at, calculate_time_ago(row.created_at)
+
+
+async def get_user_playlists_version(db: AsyncSession, spotify_id: str) -> Tuple:
+    """(max(updated_at), count) of a user's playlists; changes on every create, feedback and delete"""
+    result = await db.execute(
+        select(func.max(PlaylistModel.updated_at), func.count(PlaylistModel.id))
+        .where(PlaylistModel.spotify_id == spotify_id)
+    )
+    return tuple(result.one())
 
 
-def get_playlist_by_id(db: Session, playlist_id: str):
-    playlist = db.query(PlaylistModel).filter(PlaylistModel.id == playlist_id).first()
+async def get_playlist_by_id(db: AsyncSession, playlist_id: str):
+    result = await db.execute(
+        select(PlaylistModel).where(PlaylistModel.id == playlist_id).options(*_load_tracks_and_genres())
+    )
+    playlist = result.scalars().first()
     if not playlist:
         raise HTTPException(status_code=404, detail=f"Playlist with ID {playlist_id} not found")
     
@@ -201,87 +379,135 @@ def get_playlist_by_id(db: Session, playlist_id: str):
     return playlist
 
 
-def update_playlist(db: Session, playlist_id: str, post_mood: Optional[str] = None, feedback: Optional[str] = None):
-    playlist = db.query(PlaylistModel).filter(PlaylistModel.id == playlist_id).first()
+async def update_playlist(db: AsyncSession, playlist_id: str, post_mood: Optional[int] = None, feedback: Optional[str] = None):
+    # Row lock sampai commit: feedback bersamaan untuk playlist yang sama membaca post_mood lama
+    # secara berurutan, sehingga delta di user_stats tidak dihitung dua kali.
+    # populate_existing karena objek biasanya sudah dimuat (tanpa lock) oleh router di session ini.
+    result = await db.execute(
+        select(PlaylistModel)
+        .where(PlaylistModel.id == playlist_id)
+        .options(*_load_tracks_and_genres())
+        .with_for_update(of=PlaylistModel)
+        .execution_options(populate_existing=True)
+    )
+    playlist = result.scalars().first()
     if not playlist:
         raise HTTPException(status_code=404, detail=f"Playlist with ID {playlist_id} not found")
     
+    old_delta = service_user_stats.mood_delta(playlist.pre_mood, playlist.post_mood)
+
     if post_mood is not None:
         playlist.post_mood = post_mood
     
     if feedback is not None:
         playlist.feedback = feedback
     
-    db.commit()
-    db.refresh(playlist)
+    await service_user_stats.apply_async(db, service_user_stats.mood_changed(
+        playlist.spotify_id,
+        old_delta,
+        service_user_stats.mood_delta(playlist.pre_mood, playlist.post_mood),
+    ))
+    await db.commit()
+    await service_response_cache.invalidate_async(playlist.spotify_id)
+    playlist.time_ago = calculate_time_ago(playlist.created_at)
     
     return playlist
 
-def delete_playlist(db: Session, playlist_id: str) -> None:
-    playlist = db.query(PlaylistModel).filter(PlaylistModel.id == playlist_id).first()
-    if not playlist:
+async def delete_playlist(db: AsyncSession, playlist_id: str) -> None:
+    result = await db.execute(select(PlaylistGenreModel.name).where(PlaylistGenreModel.playlist_id == playlist_id))
+    genres = result.scalars().all()
+
+    # Hapus langsung di database; track dan genre ikut terhapus lewat ON DELETE CASCADE
+    result = await db.execute(
+        delete(PlaylistModel)
+        .where(PlaylistModel.id == playlist_id)
+        .returning(PlaylistModel.spotify_id, PlaylistModel.pre_mood, PlaylistModel.post_mood)
+    )
+    deleted = result.first()
+    if deleted is None:
         raise HTTPException(status_code=404, detail=f"Playlist with ID {playlist_id} not found")
     
-    db.delete(playlist)
-    db.commit()
+    await service_user_stats.apply_async(db, service_user_stats.playlist_deleted(
+        deleted.spotify_id,
+        genres,
+        service_user_stats.mood_delta(deleted.pre_mood, deleted.post_mood),
+    ))
+    await db.commit()
+    await service_response_cache.invalidate_async(deleted.spotify_id)
 
-def get_dashboard_data(db: Session, spotify_id: str) -> DashboardResponse:
-    playlists = db.query(PlaylistModel).filter(PlaylistModel.spotify_id == spotify_id).all()
-    
-    total_sessions = len(playlists)
-    
-    if total_sessions == 0:
+async def get_dashboard_data(db: AsyncSession, spotify_id: str) -> DashboardResponse:
+    # Statistik dijaga oleh service_user_stats setiap kali playlist dibuat, diubah atau dihapus
+    stats = await db.get(UserStatsModel, spotify_id)
+
+    if stats is None or stats.session_count == 0:
         return DashboardResponse(
             total_sessions=0,
             avg_mood_improvement=0.0,
             most_frequent_genre=None,
         )
 
-    mood_improvements = []
-    for playlist in playlists:
-        if playlist.pre_mood is not None and playlist.post_mood is not None:
-            try:
-                pre_mood = int(playlist.pre_mood)
-                post_mood = int(playlist.post_mood)
-                mood_improvement = post_mood - pre_mood
-                mood_improvements.append(mood_improvement)
-            except (ValueError, TypeError):
-                continue
-    
-    avg_mood_improvement = sum(mood_improvements) / len(mood_improvements) if mood_improvements else 0.0
-    
-    genres = db.query(PlaylistGenreModel).join(
-        PlaylistModel, PlaylistGenreModel.playlist_id == PlaylistModel.id
-    ).filter(
-        PlaylistModel.spotify_id == spotify_id
-    ).all()
-    
-    genre_counts = Counter([genre.name for genre in genres])
-    
-    most_frequent_genre = genre_counts.most_common(1)[0][0] if genre_counts else None
-    
+    avg_mood_improvement = stats.mood_delta_sum / stats.mood_delta_count if stats.mood_delta_count else 0.0
+
     return DashboardResponse(
-        total_sessions=total_sessions,
+        total_sessions=stats.session_count,
         avg_mood_improvement=round(avg_mood_improvement, 2),
-        most_frequent_genre=most_frequent_genre,
+        most_frequent_genre=stats.most_frequent_genre,
     )
 
 
-def get_chart_mood(db: Session, spotify_id: str) -> List[ChartMoodItem]:
-    playlists = (
-        db.query(PlaylistModel)
-        .filter(PlaylistModel.spotify_id == spotify_id)
-        .order_by(PlaylistModel.sequence_number.asc())
-        .all()
-    )
+def _format_mood(value):
+    # Rata-rata bucket dibulatkan 2 desimal; nilai bulat tetap tampil seperti "4", bukan "4.0"
+    if value is None:
+        return None
+    value = round(float(value), 2)
+    return int(value) if value.is_integer() else value
+
 
-    timeline: List[ChartMoodItem] = [
-        ChartMoodItem(
-            sequence_number=p.sequence_number,
-            pre_mood=p.pre_mood,
-            post_mood=p.post_mood,
+def chart_window_start(days: int) -> datetime:
+    # Jendela dihitung dari tengah malam agar hasilnya (dan ETag-nya) stabil sepanjang hari
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    return today - timedelta(days=days)
+
+
+async def get_chart_mood(
+    db: AsyncSession,
+    spotify_id: str,
+    max_points: int = CHART_MAX_POINTS,
+    days: Optional[int] = None,
+) -> List[Dict]:
+    """
+    Mood timeline of a user as ChartMoodItem-shaped dicts, at most `max_points`
+    items, optionally limited to the last `days` days (counted from midnight, see
+    chart_window_start).
+
+    Sessions are split in SQL into `max_points` consecutive buckets with ntile() and
+    each bucket is averaged; a bucket is labelled with its first sequence_number.
+    Users with no more than `max_points` sessions get one bucket per session, i.e.
+    the raw series.
+    """
+    sessions = select(
+        PlaylistModel.sequence_number,
+        PlaylistModel.pre_mood,
+        PlaylistModel.post_mood,
+        func.ntile(max_points).over(order_by=PlaylistModel.sequence_number).label("bucket"),
+    ).where(PlaylistModel.spotify_id == spotify_id)
+    if days is not None:
+        sessions = sessions.where(PlaylistModel.created_at >= chart_window_start(days))
+    sessions = sessions.subquery()
+
+    result = await db.execute(
+        select(
+            func.min(sessions.c.sequence_number),
+            func.avg(sessions.c.pre_mood),
+            func.avg(sessions.c.post_mood),
         )
-        for p in playlists
+        .group_by(sessions.c.bucket)
+        .order_by(sessions.c.bucket)
+    )
+
+    timeline: List[Dict] = [
+        util_serializer.chart_point(sequence_number, _format_mood(pre_mood), _format_mood(post_mood))
+        for sequence_number, pre_mood, post_mood in result.all()
     ]
 
-    return timeline
\ No newline at end of file
+    return timeline
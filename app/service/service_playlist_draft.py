@@ -0,0 +1,191 @@
+"""
+Pool of pre-generated playlist drafts (playlist_draft).
+
+The AI prompt only depends on a few discrete inputs besides the user's saved tracks,
+so drafts are generated ahead of time for every (mood bucket, depression level,
+location) by app.command.refill_playlist_drafts, with their tracks already resolved
+on Spotify. create_playlist claims a draft, mixes in the user's own tracks and only
+calls the AI itself when the pool for that bucket is empty.
+"""
+import random
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import spotipy
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.config.config import (
+    DRAFT_MAX_AGE,
+    DRAFT_MIN_TRACKS,
+    DRAFT_MOOD_BUCKET_SIZE,
+    DRAFT_PERSONAL_TRACKS,
+    DRAFT_POOL_TARGET,
+)
+from app.model.playlist_draft import PlaylistDraftModel
+from app.service.service_ai import build_prompt_playlist_healing, call_hf_api, complete_playlist_response
+from app.service.service_track import resolve_tracks
+from app.util.util_phq9 import DEPRESSION_LEVELS, representative_phq9
+
+MOOD_MIN = 0
+MOOD_MAX = 10
+
+_draft = PlaylistDraftModel.__table__
+
+
+def mood_bucket(pre_mood: int) -> int:
+    return (min(max(pre_mood, MOOD_MIN), MOOD_MAX) - MOOD_MIN) // DRAFT_MOOD_BUCKET_SIZE
+
+
+def representative_mood(bucket: int) -> int:
+    """Middle pre_mood of a bucket, used when generating drafts for that bucket"""
+    low = MOOD_MIN + bucket * DRAFT_MOOD_BUCKET_SIZE
+    high = min(low + DRAFT_MOOD_BUCKET_SIZE - 1, MOOD_MAX)
+    return (low + high) // 2
+
+
+def all_buckets(locations: List[str]) -> List[tuple]:
+    moods = range(mood_bucket(MOOD_MAX) + 1)
+    return [(bucket, level, location) for location in locations for level, _, _ in DEPRESSION_LEVELS for bucket in moods]
+
+
+def _fresh_after() -> datetime:
+    return datetime.now() - timedelta(seconds=DRAFT_MAX_AGE)
+
+
+def claim_draft(db: Session, pre_mood: int, depression_level: str, location: str) -> Optional[Dict]:
+    """
+    Take the oldest fresh draft of the bucket out of the pool, or None when it is empty.
+
+    The delete is committed before returning, so the row lock is not held across the
+    Spotify calls that follow; a draft whose playlist then fails to be created is lost
+    and simply refilled later. SKIP LOCKED lets concurrent creates for the same bucket
+    take different drafts instead of waiting on each other.
+    """
+    candidate = (
+        select(_draft.c.id)
+        .where(
+            _draft.c.mood_bucket == mood_bucket(pre_mood),
+            _draft.c.depression_level == depression_level,
+            _draft.c.location == location,
+            _draft.c.created_at > _fresh_after(),
+        )
+        .order_by(_draft.c.created_at)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    row = db.execute(
+        delete(_draft)
+        .where(_draft.c.id == candidate)
+        .returning(_draft.c.title, _draft.c.description, _draft.c.tracks, _draft.c.genres)
+    ).mappings().first()
+    db.commit()
+    return dict(row) if row else None
+
+
+def personalise(tracks: List[Dict], saved_tracks: List[Dict], count: int = DRAFT_PERSONAL_TRACKS) -> List[Dict]:
+    """
+    Swap up to `count` tracks in the middle of the draft (the uplift part of the ISO
+    journey) for tracks from the user's library. Saved tracks whose artist is already
+    in the draft are skipped, so the one-track-per-artist rule still holds.
+    """
+    tracks = [dict(track) for track in tracks]
+    used_artists = {track["artist"].casefold() for track in tracks}
+    used_uris = {track["uri"] for track in tracks}
+
+    candidates = []
+    for item in saved_tracks:
+        if not item or not item.get("artists"):
+            continue
+        artist = item["artists"][0]["name"]
+        if item["uri"] in used_uris or artist.casefold() in used_artists:
+            continue
+        used_artists.add(artist.casefold())
+        candidates.append({
+            "title": item["name"],
+            "artist": artist,
+            "uri": item["uri"],
+            "duration": item.get("duration_ms") or 0,
+        })
+
+    chosen = random.sample(candidates, min(count, len(candidates), len(tracks)))
+    middle = len(tracks) // 2
+    for offset, track in enumerate(chosen):
+        tracks[middle - len(chosen) // 2 + offset] = track
+    return tracks
+
+
+def generate_draft(db: Session, sp: spotipy.Spotify, bucket: int, depression_level: str, location: str) -> bool:
+    """Ask the AI for one playlist for the bucket, resolve it and keep it if enough tracks exist"""
+    pre_mood = representative_mood(bucket)
+    phq9 = representative_phq9(depression_level)
+    prompt = build_prompt_playlist_healing(pre_mood=pre_mood, phq9=phq9, location=location)
+    ai_data = complete_playlist_response(call_hf_api(prompt), pre_mood, phq9, location)
+
+    tracks = []
+    seen_uris = set()
+    for track, item in resolve_tracks(sp, ai_data["playlist"], db=db):
+        if item["uri"] in seen_uris:
+            continue
+        seen_uris.add(item["uri"])
+        tracks.append({
+            "title": track["title"],
+            "artist": track["artist"],
+            "uri": item["uri"],
+            "duration": item["duration_ms"],
+        })
+
+    title = ai_data["playlist_title"]
+    if not title or len(tracks) < DRAFT_MIN_TRACKS:
+        print(f"Discarding draft for {(bucket, depression_level, location)}: title={title!r}, {len(tracks)} resolved tracks")
+        return False
+
+    db.execute(insert(_draft).values(
+        id=str(uuid.uuid4()),
+        mood_bucket=bucket,
+        depression_level=depression_level,
+        location=location,
+        title=title,
+        description=ai_data["description"],
+        tracks=tracks,
+        genres=ai_data["genres"],
+    ))
+    db.commit()
+    return True
+
+
+def refill_drafts(db: Session, sp: spotipy.Spotify, locations: List[str], target: int = DRAFT_POOL_TARGET) -> int:
+    """
+    Drop expired drafts and top every bucket up to `target` fresh drafts, one draft
+    per bucket per round. Returns the number of drafts generated.
+    """
+    db.execute(delete(_draft).where(_draft.c.created_at <= _fresh_after()))
+    db.commit()
+
+    counts = {
+        (bucket, level, location): count
+        for bucket, level, location, count in db.execute(
+            select(_draft.c.mood_bucket, _draft.c.depression_level, _draft.c.location, func.count())
+            .group_by(_draft.c.mood_bucket, _draft.c.depression_level, _draft.c.location)
+        ).all()
+    }
+
+    # Bergiliran per bucket supaya bucket yang kosong terisi lebih dulu
+    generated = 0
+    for round_number in range(target):
+        for key in all_buckets(locations):
+            if counts.get(key, 0) + round_number >= target:
+                continue
+            try:
+                if generate_draft(db, sp, *key):
+                    generated += 1
+            except Exception as e:
+                db.rollback()
+                print(f"Error generating draft for {key}: {str(e)}")
+    return generated
+
+
+def get_pool_size(db: Session) -> int:
+    return db.execute(select(func.count()).select_from(_draft).where(_draft.c.created_at > _fresh_after())).scalar_one()
@@ -0,0 +1,133 @@
+import csv
+import io
+import zlib
+from contextlib import nullcontext
+from typing import AsyncIterator, Dict, List, Mapping, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.config import EXPORT_BATCH_SIZE
+from app.config.database import AsyncSessionLocal
+from app.model.playlist import PlaylistModel
+from app.model.playlist_genre import PlaylistGenreModel
+from app.model.playlist_track import PlaylistTrackModel
+from app.util import util_serializer
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+_EXPORT_COLUMNS = [
+    "id",
+    "sequence_number",
+    "name",
+    "created_at",
+    "phq9_score",
+    "depression_level",
+    "pre_mood",
+    "post_mood",
+    "duration",
+    "total_tracks",
+    "link_playlist",
+    "mode",
+    "feedback",
+]
+_CSV_HEADER = _EXPORT_COLUMNS + ["genres", "tracks"]
+
+
+def _export_item(row: Mapping, tracks: List[Dict], genres: List[str]) -> Dict:
+    item = {column: row[column] for column in _EXPORT_COLUMNS}
+    # Export untuk data portability memakai ISO 8601 dan mood sebagai angka
+    item["created_at"] = row["created_at"].isoformat()
+    item["genres"] = genres
+    item["tracks"] = tracks
+    return item
+
+
+def _encode_ndjson(items: List[Dict]) -> bytes:
+    return b"".join(util_serializer.dumps(item) + b"\n" for item in items)
+
+
+def _encode_csv(items: List[Dict], header: bool = False) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(_CSV_HEADER)
+    for item in items:
+        writer.writerow(
+            [item[column] for column in _EXPORT_COLUMNS]
+            + [
+                "; ".join(item["genres"]),
+                "; ".join(f"{track['name']} - {track['artist']}" for track in item["tracks"]),
+            ]
+        )
+    return buffer.getvalue().encode("utf-8")
+
+
+async def _load_batch(db, playlist_ids: List[str]):
+    tracks: Dict[str, List[Dict]] = {playlist_id: [] for playlist_id in playlist_ids}
+    genres: Dict[str, List[str]] = {playlist_id: [] for playlist_id in playlist_ids}
+
+    result = await db.execute(
+        select(PlaylistTrackModel.playlist_id, PlaylistTrackModel.name, PlaylistTrackModel.artist, PlaylistTrackModel.duration)
+        .where(PlaylistTrackModel.playlist_id.in_(playlist_ids))
+    )
+    for playlist_id, name, artist, duration in result.all():
+        tracks[playlist_id].append({"name": name, "artist": artist, "duration": duration})
+
+    result = await db.execute(
+        select(PlaylistGenreModel.playlist_id, PlaylistGenreModel.name)
+        .where(PlaylistGenreModel.playlist_id.in_(playlist_ids))
+    )
+    for playlist_id, name in result.all():
+        genres[playlist_id].append(name)
+
+    return tracks, genres
+
+
+async def export_playlists(
+    spotify_id: str,
+    export_format: str = "ndjson",
+    gzip: bool = False,
+    db: Optional[AsyncSession] = None,
+) -> AsyncIterator[bytes]:
+    """
+    Stream a user's full history, oldest session first, as NDJSON (one playlist per
+    line) or CSV (one playlist per row, tracks and genres joined with "; ").
+
+    Playlists are read through a server-side cursor in batches of EXPORT_BATCH_SIZE;
+    tracks and genres are loaded per batch, so memory use does not grow with the
+    number of sessions. Without db the generator opens its own session, because it
+    keeps running after the endpoint has returned.
+    """
+    compressor = zlib.compressobj(wbits=31) if gzip else None  # wbits=31: gzip container
+
+    def emit(chunk: bytes) -> bytes:
+        return compressor.compress(chunk) if compressor else chunk
+
+    query = (
+        select(*[PlaylistModel.__table__.c[column] for column in _EXPORT_COLUMNS])
+        .where(PlaylistModel.spotify_id == spotify_id)
+        .order_by(PlaylistModel.sequence_number.asc())
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+
+    async with nullcontext(db) if db is not None else AsyncSessionLocal() as db:
+        if export_format == "csv":
+            header = emit(_encode_csv([], header=True))
+            if header:
+                yield header
+
+        result = await db.stream(query)
+        async for rows in result.mappings().partitions():
+            tracks, genres = await _load_batch(db, [row["id"] for row in rows])
+            items = [_export_item(row, tracks[row["id"]], genres[row["id"]]) for row in rows]
+            chunk = _encode_csv(items) if export_format == "csv" else _encode_ndjson(items)
+            chunk = emit(chunk)
+            if chunk:
+                yield chunk
+
+    if compressor:
+        yield compressor.flush()
@@ -0,0 +1,131 @@
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config.config import JOB_MAX_ATTEMPTS, JOB_TIMEOUT
+from app.model.playlist_job import PlaylistJobModel
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+
+async def submit_job(db: AsyncSession, spotify_id: str, pre_mood: int, phq9: int) -> PlaylistJobModel:
+    job = PlaylistJobModel(
+        id=str(uuid.uuid4()),
+        spotify_id=spotify_id,
+        pre_mood=pre_mood,
+        phq9_score=phq9,
+        status=JOB_QUEUED,
+        attempts=0,
+    )
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
+    return job
+
+
+async def get_job(db: AsyncSession, job_id: str) -> PlaylistJobModel:
+    result = await db.execute(
+        select(PlaylistJobModel).where(PlaylistJobModel.id == job_id).execution_options(populate_existing=True)
+    )
+    job = result.scalars().first()
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job with ID {job_id} not found")
+    return job
+
+
+# Fungsi di bawah ini dipakai oleh worker (app/worker.py) dengan Session sync
+
+
+def claim_next_job(db: Session) -> Optional[PlaylistJobModel]:
+    """
+    Claim the oldest queued job, or a running job whose worker died, using
+    SELECT ... FOR UPDATE SKIP LOCKED so several workers never take the same job.
+
+    A running job only counts as abandoned when its heartbeat is older than
+    JOB_TIMEOUT, so a slow but live job is never started a second time.
+    """
+    stale_before = datetime.now() - timedelta(seconds=JOB_TIMEOUT)
+
+    # Job yang ditinggal worker dan sudah mencapai batas percobaan dianggap gagal
+    db.query(PlaylistJobModel).filter(
+        PlaylistJobModel.status == JOB_RUNNING,
+        PlaylistJobModel.heartbeat_at < stale_before,
+        PlaylistJobModel.attempts >= JOB_MAX_ATTEMPTS,
+    ).update(
+        {
+            PlaylistJobModel.status: JOB_FAILED,
+            PlaylistJobModel.error: "Job timed out",
+            PlaylistJobModel.finished_at: datetime.now(),
+        },
+        synchronize_session=False,
+    )
+
+    job = (
+        db.query(PlaylistJobModel)
+        .filter(
+            or_(
+                PlaylistJobModel.status == JOB_QUEUED,
+                and_(
+                    PlaylistJobModel.status == JOB_RUNNING,
+                    PlaylistJobModel.heartbeat_at < stale_before,
+                ),
+            ),
+            PlaylistJobModel.attempts < JOB_MAX_ATTEMPTS,
+        )
+        .order_by(PlaylistJobModel.created_at.asc())
+        .with_for_update(skip_locked=True)
+        .first()
+    )
+    if not job:
+        db.commit()
+        return None
+
+    job.status = JOB_RUNNING
+    job.attempts += 1
+    job.started_at = datetime.now()
+    job.heartbeat_at = job.started_at
+    db.commit()
+    return job
+
+
+def _update_own_job(db: Session, job_id: str, attempt: int, values: dict) -> bool:
+    """
+    Update a running job only if it is still the given attempt, i.e. no other worker
+    re-claimed it in the meantime. Returns False when the job was taken over.
+    """
+    updated = db.query(PlaylistJobModel).filter(
+        PlaylistJobModel.id == job_id,
+        PlaylistJobModel.status == JOB_RUNNING,
+        PlaylistJobModel.attempts == attempt,
+    ).update(values, synchronize_session=False)
+    db.commit()
+    return updated == 1
+
+
+def heartbeat(db: Session, job_id: str, attempt: int) -> bool:
+    return _update_own_job(db, job_id, attempt, {PlaylistJobModel.heartbeat_at: datetime.now()})
+
+
+def complete_job(db: Session, job_id: str, attempt: int, playlist_id: str) -> bool:
+    return _update_own_job(db, job_id, attempt, {
+        PlaylistJobModel.status: JOB_DONE,
+        PlaylistJobModel.playlist_id: playlist_id,
+        PlaylistJobModel.error: None,
+        PlaylistJobModel.finished_at: datetime.now(),
+    })
+
+
+def fail_job(db: Session, job_id: str, attempt: int, error: str) -> bool:
+    return _update_own_job(db, job_id, attempt, {
+        PlaylistJobModel.status: JOB_FAILED,
+        PlaylistJobModel.error: error,
+        PlaylistJobModel.finished_at: datetime.now(),
+    })
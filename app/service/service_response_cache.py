@@ -0,0 +1,250 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional, Set
+
+from fastapi import Response
+
+from app.config.config import RESPONSE_CACHE_LOCAL_TTL, RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL
+from app.config.config import REDIS_URL
+from app.config.redis import get_async_redis, get_redis, mark_redis_down
+from app.util.util_etag import CACHE_CONTROL, etag_matches, not_modified
+
+_REDIS_PREFIX = "resp:"
+
+
+class CachedResponse(NamedTuple):
+    etag: str
+    body: bytes
+    headers: Dict[str, str]
+
+    def to_response(self, if_none_match: Optional[str] = None) -> Response:
+        if etag_matches(if_none_match, self.etag):
+            return not_modified(self.etag)
+        return Response(
+            content=self.body,
+            media_type="application/json",
+            headers={**self.headers, "ETag": self.etag, "Cache-Control": CACHE_CONTROL},
+        )
+
+
+# Fallback per proses, hanya dipakai saat Redis tidak tersedia. Invalidasi dari proses lain
+# (worker, replica lain) tidak sampai ke sini, karena itu umurnya dibatasi RESPONSE_CACHE_LOCAL_TTL.
+_entries: "OrderedDict[str, tuple]" = OrderedDict()
+_local_versions: Dict[str, int] = {}
+# User yang versinya belum sempat di-INCR di Redis karena Redis sedang down
+_pending_invalidations: Set[str] = set()
+_lock = threading.Lock()
+_stats = {
+    "redis_hits": 0,
+    "memory_hits": 0,
+    "misses": 0,
+    "stores": 0,
+    "invalidations": 0,
+    "replayed_invalidations": 0,
+}
+
+
+def _count(name: str) -> None:
+    with _lock:
+        _stats[name] += 1
+
+
+def _version_key(spotify_id: str) -> str:
+    return f"{_REDIS_PREFIX}ver:{spotify_id}"
+
+
+def _entry_key(spotify_id: str, version, endpoint: str, params) -> str:
+    params_hash = hashlib.sha1(repr(params).encode("utf-8")).hexdigest()
+    return f"{_REDIS_PREFIX}{spotify_id}:{version}:{endpoint}:{params_hash}"
+
+
+def _dump(entry: CachedResponse) -> bytes:
+    meta = json.dumps({"etag": entry.etag, "headers": entry.headers}).encode("utf-8")
+    return meta + b"\n" + entry.body
+
+
+def _load(raw: bytes) -> CachedResponse:
+    meta, body = raw.split(b"\n", 1)
+    meta = json.loads(meta)
+    return CachedResponse(etag=meta["etag"], body=body, headers=meta["headers"])
+
+
+class CacheLookup:
+    """
+    Result of a cache lookup for one (user, endpoint, params). On a miss the cache
+    version seen before reading the database is kept, so a response rendered from
+    data older than a concurrent invalidation is stored under the old version and
+    never served.
+    """
+
+    def __init__(self, spotify_id: str, endpoint: str, params):
+        self.spotify_id = spotify_id
+        self.endpoint = endpoint
+        self.params = params
+        self.entry: Optional[CachedResponse] = None
+        self._redis_version: Optional[int] = None
+        self._local_key: Optional[str] = None
+
+    async def fetch(self) -> Optional[CachedResponse]:
+        client = get_async_redis()
+        if client is not None:
+            try:
+                await _replay_pending_async(client)
+                self._redis_version = int(await client.get(_version_key(self.spotify_id)) or 0)
+                raw = await client.get(_entry_key(self.spotify_id, self._redis_version, self.endpoint, self.params))
+                if raw:
+                    self.entry = _load(raw)
+                    _count("redis_hits")
+                else:
+                    _count("misses")
+                return self.entry
+            except Exception as e:
+                mark_redis_down(e)
+                self._redis_version = None
+
+        if RESPONSE_CACHE_LOCAL_TTL <= 0:
+            _count("misses")
+            return None
+
+        now = time.monotonic()
+        with _lock:
+            self._local_key = _entry_key(self.spotify_id, _local_versions.get(self.spotify_id, 0), self.endpoint, self.params)
+            cached = _entries.get(self._local_key)
+            if cached is not None and cached[0] > now:
+                _entries.move_to_end(self._local_key)
+                self.entry = cached[1]
+            elif cached is not None:
+                del _entries[self._local_key]
+        _count("memory_hits" if self.entry is not None else "misses")
+        return self.entry
+
+    async def store(
+        self,
+        etag: str,
+        body: bytes,
+        headers: Optional[Dict[str, str]] = None,
+        ttl: Optional[int] = None,
+    ) -> Response:
+        """
+        Cache a freshly rendered response and return it. `ttl` shortens the lifetime
+        of responses that go stale on their own, e.g. the time_ago labels.
+        """
+        entry = CachedResponse(etag=etag, body=body, headers=headers or {})
+
+        if self._redis_version is not None:
+            client = get_async_redis()
+            if client is not None:
+                try:
+                    key = _entry_key(self.spotify_id, self._redis_version, self.endpoint, self.params)
+                    await client.set(key, _dump(entry), ex=min(ttl or RESPONSE_CACHE_TTL, RESPONSE_CACHE_TTL))
+                    _count("stores")
+                except Exception as e:
+                    mark_redis_down(e)
+        elif self._local_key is not None:
+            expires_at = time.monotonic() + min(ttl or RESPONSE_CACHE_LOCAL_TTL, RESPONSE_CACHE_LOCAL_TTL)
+            with _lock:
+                _entries[self._local_key] = (expires_at, entry)
+                _entries.move_to_end(self._local_key)
+                while len(_entries) > RESPONSE_CACHE_SIZE:
+                    _entries.popitem(last=False)
+            _count("stores")
+
+        return entry.to_response()
+
+
+async def lookup(spotify_id: str, endpoint: str, params=()) -> CacheLookup:
+    cache_lookup = CacheLookup(spotify_id, endpoint, params)
+    await cache_lookup.fetch()
+    return cache_lookup
+
+
+def _bump_local_version(spotify_id: str) -> None:
+    with _lock:
+        _local_versions[spotify_id] = _local_versions.get(spotify_id, 0) + 1
+    _count("invalidations")
+
+
+def _defer(spotify_id: str) -> None:
+    # Tanpa REDIS_URL tidak ada entry Redis yang perlu di-invalidate
+    if REDIS_URL:
+        with _lock:
+            _pending_invalidations.add(spotify_id)
+
+
+def _take_pending() -> Set[str]:
+    global _pending_invalidations
+    with _lock:
+        pending, _pending_invalidations = _pending_invalidations, set()
+    return pending
+
+
+def _replay_pending(client) -> None:
+    pending = _take_pending()
+    try:
+        for spotify_id in list(pending):
+            client.incr(_version_key(spotify_id))
+            pending.discard(spotify_id)
+            _count("replayed_invalidations")
+    finally:
+        for spotify_id in pending:
+            _defer(spotify_id)
+
+
+async def _replay_pending_async(client) -> None:
+    pending = _take_pending()
+    try:
+        for spotify_id in list(pending):
+            await client.incr(_version_key(spotify_id))
+            pending.discard(spotify_id)
+            _count("replayed_invalidations")
+    finally:
+        for spotify_id in pending:
+            _defer(spotify_id)
+
+
+def invalidate(spotify_id: str) -> None:
+    """
+    Drop every cached response of a user by bumping their version; call after the
+    write has been committed. Used from sync code (create_playlist, worker).
+    The version key never expires, so a version number is never reused.
+
+    When Redis cannot be reached the bump is remembered and replayed by the next
+    Redis access of this process, before anything is read from Redis again.
+    """
+    _bump_local_version(spotify_id)
+    client = get_redis()
+    if client is None:
+        _defer(spotify_id)
+        return
+    try:
+        _replay_pending(client)
+        client.incr(_version_key(spotify_id))
+    except Exception as e:
+        _defer(spotify_id)
+        mark_redis_down(e)
+
+
+async def invalidate_async(spotify_id: str) -> None:
+    _bump_local_version(spotify_id)
+    client = get_async_redis()
+    if client is None:
+        _defer(spotify_id)
+        return
+    try:
+        await _replay_pending_async(client)
+        await client.incr(_version_key(spotify_id))
+    except Exception as e:
+        _defer(spotify_id)
+        mark_redis_down(e)
+
+
+def get_stats() -> Dict:
+    with _lock:
+        stats = dict(_stats)
+        stats["memory_entries"] = len(_entries)
+        stats["pending_invalidations"] = len(_pending_invalidations)
+    stats["redis_enabled"] = get_redis() is not None
+    return stats
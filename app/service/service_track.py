@@ -0,0 +1,127 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import spotipy
+from sqlalchemy.orm import Session
+
+from app.config.config import SPOTIFY_MARKET, SPOTIFY_SEARCH_CONCURRENCY
+from app.service import service_track_cache
+
+# Penanda pencarian yang gagal (error), berbeda dengan "tidak ditemukan" yang boleh di-cache
+_SEARCH_FAILED = object()
+
+
+def search_track(sp: spotipy.Spotify, title: str, artist: str, market: Optional[str] = None) -> Optional[Dict]:
+    """Search a single track on Spotify, returning the first matching item or None"""
+    query = f"track:{title} artist:{artist}"
+    search_result = sp.search(q=query, type="track", limit=1, market=market)
+    items = search_result["tracks"]["items"]
+    return items[0] if items else None
+
+
+def _search_track_safe(sp: spotipy.Spotify, track: Dict, market: str):
+    try:
+        return search_track(sp, track["title"], track["artist"], market=market)
+    except Exception as e:
+        print(f"Error searching track {track.get('title')} - {track.get('artist')}: {str(e)}")
+        return _SEARCH_FAILED
+
+
+class TrackResolver:
+    """
+    Resolve AI-suggested tracks to Spotify items on a bounded thread pool.
+
+    Tracks can be submitted one by one while the AI response is still streaming;
+    `results()` waits for the outstanding searches and returns (track, spotify_item)
+    pairs in submission order, skipping tracks that fail or have no match. When a
+    session is given, the title/artist resolution cache is consulted first and only
+    cache misses are searched on Spotify; new results are stored in a separate session.
+    """
+
+    def __init__(
+        self,
+        sp: spotipy.Spotify,
+        db: Optional[Session] = None,
+        market: str = SPOTIFY_MARKET,
+        max_workers: int = SPOTIFY_SEARCH_CONCURRENCY,
+    ):
+        self.sp = sp
+        self.db = db
+        self.market = market
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="spotify-search")
+        self._slots: List[Tuple[Dict, str, object]] = []
+        self._searches = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, et, ev, traceback):
+        self.close()
+
+    def submit(self, track: Dict) -> None:
+        self.submit_many([track])
+
+    def submit_many(self, tracks: List[Dict]) -> None:
+        valid = [track for track in tracks if isinstance(track, dict) and track.get("title") and track.get("artist")]
+        if not valid:
+            return
+
+        keys = [service_track_cache.make_cache_key(track["title"], track["artist"], self.market) for track in valid]
+        cached = service_track_cache.lookup_many(self.db, keys) if self.db is not None else {}
+
+        for track, key in zip(valid, keys):
+            entry = cached.get(key)
+            if entry is None:
+                self._searches += 1
+                result = self._executor.submit(_search_track_safe, self.sp, track, self.market)
+            elif entry.uri is not None:
+                result = {"uri": entry.uri, "duration_ms": entry.duration_ms or 0}
+            else:
+                result = None
+            self._slots.append((track, key, result))
+
+    def results(self) -> List[Tuple[Dict, Dict]]:
+        resolved = []
+        to_store = []
+
+        for track, key, result in self._slots:
+            if isinstance(result, Future):
+                item = result.result()
+                if item is _SEARCH_FAILED:
+                    continue
+                to_store.append({
+                    "cache_key": key,
+                    "title": track["title"],
+                    "artist": track["artist"],
+                    "market": self.market,
+                    "uri": item["uri"] if item else None,
+                    "duration_ms": item["duration_ms"] if item else None,
+                })
+            else:
+                item = result
+
+            if item is not None:
+                resolved.append((track, item))
+
+        if self.db is not None:
+            # Ditulis lewat session terpisah, transaksi pemanggil tidak ikut di-commit
+            service_track_cache.store_many(to_store)
+            print(f"Track resolution: {len(self._slots) - self._searches} cache hits, {self._searches} Spotify searches")
+
+        return resolved
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def resolve_tracks(
+    sp: spotipy.Spotify,
+    tracks: List[Dict],
+    db: Optional[Session] = None,
+    market: str = SPOTIFY_MARKET,
+    max_workers: int = SPOTIFY_SEARCH_CONCURRENCY,
+) -> List[Tuple[Dict, Dict]]:
+    """Resolve a complete list of AI-suggested tracks, see TrackResolver"""
+    with TrackResolver(sp, db=db, market=market, max_workers=max_workers) as resolver:
+        resolver.submit_many(tracks)
+        return resolver.results()
@@ -0,0 +1,175 @@
+import hashlib
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.config.config import TRACK_CACHE_NEGATIVE_TTL, TRACK_CACHE_SIZE, TRACK_CACHE_TTL
+from app.config.database import DBContext
+from app.model.track_cache import TrackCacheModel
+
+
+class TrackCacheEntry(NamedTuple):
+    uri: Optional[str]  # None for a cached miss
+    duration_ms: Optional[int]
+    expires_at: datetime
+
+
+_memory: "OrderedDict[str, TrackCacheEntry]" = OrderedDict()
+_lock = threading.Lock()
+_stats = {
+    "memory_hits": 0,
+    "db_hits": 0,
+    "negative_hits": 0,
+    "misses": 0,
+    "stores": 0,
+}
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _normalize(value: str) -> str:
+    value = unicodedata.normalize("NFKC", value or "")
+    return _WHITESPACE.sub(" ", value).strip().casefold()
+
+
+def make_cache_key(title: str, artist: str, market: str) -> str:
+    raw = "\x1f".join([_normalize(title), _normalize(artist), _normalize(market)])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _count(name: str, amount: int = 1) -> None:
+    with _lock:
+        _stats[name] += amount
+
+
+def _remember(key: str, entry: TrackCacheEntry) -> None:
+    with _lock:
+        _memory[key] = entry
+        _memory.move_to_end(key)
+        while len(_memory) > TRACK_CACHE_SIZE:
+            _memory.popitem(last=False)
+
+
+def _count_hit(entry: TrackCacheEntry, tier: str) -> None:
+    _count(tier)
+    if entry.uri is None:
+        _count("negative_hits")
+
+
+def lookup_many(db: Session, keys: Iterable[str]) -> Dict[str, TrackCacheEntry]:
+    """
+    Look up cache keys in the in-process LRU first, then in the track_cache table.
+    Expired entries are treated as misses.
+    """
+    now = datetime.now()
+    found: Dict[str, TrackCacheEntry] = {}
+    pending: List[str] = []
+
+    for key in dict.fromkeys(keys):
+        with _lock:
+            entry = _memory.get(key)
+            if entry is not None:
+                if entry.expires_at > now:
+                    _memory.move_to_end(key)
+                else:
+                    del _memory[key]
+                    entry = None
+        if entry is not None:
+            found[key] = entry
+            _count_hit(entry, "memory_hits")
+        else:
+            pending.append(key)
+
+    if pending:
+        try:
+            rows = (
+                db.query(TrackCacheModel)
+                .filter(TrackCacheModel.cache_key.in_(pending), TrackCacheModel.expires_at > now)
+                .all()
+            )
+        except Exception as e:
+            print(f"Error reading track cache: {str(e)}")
+            db.rollback()
+            rows = []
+
+        for row in rows:
+            entry = TrackCacheEntry(uri=row.uri, duration_ms=row.duration_ms, expires_at=row.expires_at)
+            _remember(row.cache_key, entry)
+            found[row.cache_key] = entry
+            _count_hit(entry, "db_hits")
+
+        _count("misses", len(pending) - len(rows))
+
+    return found
+
+
+def store_many(results: List[Dict], db: Optional[Session] = None) -> None:
+    """
+    Store resolution results in both tiers. Each result holds cache_key, title, artist,
+    market, uri and duration_ms; a result without uri is stored as a negative entry.
+
+    Without `db` the rows are written in a short session of their own, so the caller's
+    transaction (e.g. a playlist create that is still in progress) is neither committed
+    nor left holding locks on track_cache rows.
+    """
+    if not results:
+        return
+
+    now = datetime.now()
+    rows = {}
+    for result in results:
+        ttl = TRACK_CACHE_TTL if result.get("uri") else TRACK_CACHE_NEGATIVE_TTL
+        expires_at = now + timedelta(seconds=ttl)
+        rows[result["cache_key"]] = {
+            "cache_key": result["cache_key"],
+            "title": result["title"][:255],
+            "artist": result["artist"][:255],
+            "market": result["market"],
+            "uri": result.get("uri"),
+            "duration_ms": result.get("duration_ms"),
+            "expires_at": expires_at,
+            "created_at": now,
+            "updated_at": now,
+        }
+        _remember(result["cache_key"], TrackCacheEntry(result.get("uri"), result.get("duration_ms"), expires_at))
+
+    stmt = insert(TrackCacheModel.__table__).values(list(rows.values()))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[TrackCacheModel.cache_key],
+        set_={
+            "uri": stmt.excluded.uri,
+            "duration_ms": stmt.excluded.duration_ms,
+            "expires_at": stmt.excluded.expires_at,
+            "updated_at": stmt.excluded.updated_at,
+        },
+    )
+    if db is None:
+        with DBContext() as cache_db:
+            _write(cache_db, stmt, len(rows))
+    else:
+        _write(db, stmt, len(rows))
+
+
+def _write(db: Session, stmt, count: int) -> None:
+    try:
+        db.execute(stmt)
+        db.commit()
+        _count("stores", count)
+    except Exception as e:
+        print(f"Error writing track cache: {str(e)}")
+        db.rollback()
+
+
+def get_stats() -> Dict:
+    with _lock:
+        stats = dict(_stats)
+        stats["memory_entries"] = len(_memory)
+    lookups = stats["memory_hits"] + stats["db_hits"] + stats["misses"]
+    stats["hit_ratio"] = round((stats["memory_hits"] + stats["db_hits"]) / lookups, 4) if lookups else 0.0
+    return stats
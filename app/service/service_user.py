@@ -1,9 +1,10 @@
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
-from spotipy import Spotify
 
+from app.auth import auth_cache
 from app.model.user import UserModel
 from app.schemas.schemas_user import UserCreate
+from app.config.http_client import get_client_registry
 from app.config.spotify import sp_oauth
 
 
@@ -16,7 +17,7 @@ def get_access_token(code: str):
     return token_info
 
 def get_user_profile(access_token: str):
-    sp = Spotify(auth=access_token)
+    sp = get_client_registry().spotify(access_token)
     return sp.current_user()
 
 def create_or_update_user(db: Session, token_info: dict, user_profile: dict):
@@ -46,7 +47,9 @@ def create_or_update_user(db: Session, token_info: dict, user_profile: dict):
         db.commit()
         db.refresh(user)
     else:
-        # Update existing user
+        # Update existing user; data user yang di-cache untuk token lama maupun baru dibuang
+        auth_cache.invalidate(user.access_token)
+        auth_cache.invalidate(access_token)
         user.name = user_profile.get("display_name", user.name)
         user.email = user_profile.get("email", user.email)
         user.access_token = access_token
@@ -64,4 +67,8 @@ def get_user_by_spotify_id(db: Session, spotify_id: str):
     user = db.query(UserModel).filter(UserModel.spotify_id == spotify_id).first()
     if not user:
         raise HTTPException(status_code=404, detail=f"User with Spotify ID {spotify_id} not found")
-    return user
\ No newline at end of file
+    return user
+
+def get_user_by_refresh_token(db: Session, refresh_token: str):
+    # Memakai hash index ix_user_refresh_token_hash
+    return db.query(UserModel).filter(UserModel.refresh_token == refresh_token).first()
@@ -0,0 +1,173 @@
+"""
+Incrementally maintained per-user statistics (user_stats / user_genre_stats).
+
+The functions here only build Core statements; callers execute them on their own
+session, sync or async, before committing, so the counters change in the same
+transaction as the playlist write they describe.
+"""
+from collections import Counter
+from typing import Iterable, List, Optional
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Executable
+
+from app.model.playlist import PlaylistModel
+from app.model.playlist_genre import PlaylistGenreModel
+from app.model.user_stats import UserGenreStatsModel, UserStatsModel
+
+_stats = UserStatsModel.__table__
+_genre_stats = UserGenreStatsModel.__table__
+
+
+def mood_delta(pre_mood: Optional[int], post_mood: Optional[int]) -> Optional[int]:
+    """Mood improvement of one playlist, None until both moods are known"""
+    if pre_mood is None or post_mood is None:
+        return None
+    return post_mood - pre_mood
+
+
+def _bump_stats(spotify_id: str, sessions: int, delta_sum: int, delta_count: int) -> Executable:
+    stmt = insert(_stats).values(
+        spotify_id=spotify_id,
+        session_count=sessions,
+        mood_delta_sum=delta_sum,
+        mood_delta_count=delta_count,
+        updated_at=func.now(),
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[_stats.c.spotify_id],
+        set_={
+            "session_count": _stats.c.session_count + stmt.excluded.session_count,
+            "mood_delta_sum": _stats.c.mood_delta_sum + stmt.excluded.mood_delta_sum,
+            "mood_delta_count": _stats.c.mood_delta_count + stmt.excluded.mood_delta_count,
+            "updated_at": stmt.excluded.updated_at,
+        },
+    )
+
+
+def _bump_genres(spotify_id: str, genres: Iterable[str], sign: int) -> List[Executable]:
+    # Nama genre yang sama digabung dulu, ON CONFLICT tidak boleh menyentuh baris yang sama dua kali
+    counts = Counter(genres)
+    if not counts:
+        return []
+
+    stmt = insert(_genre_stats).values([
+        {"spotify_id": spotify_id, "name": name, "count": sign * count}
+        for name, count in counts.items()
+    ])
+    statements = [
+        stmt.on_conflict_do_update(
+            index_elements=[_genre_stats.c.spotify_id, _genre_stats.c.name],
+            set_={"count": _genre_stats.c.count + stmt.excluded.count},
+        )
+    ]
+    if sign < 0:
+        statements.append(
+            delete(_genre_stats).where(_genre_stats.c.spotify_id == spotify_id, _genre_stats.c.count <= 0)
+        )
+    return statements
+
+
+def _refresh_most_frequent_genre(spotify_id: str) -> Executable:
+    top_genre = (
+        select(_genre_stats.c.name)
+        .where(_genre_stats.c.spotify_id == spotify_id, _genre_stats.c.count > 0)
+        .order_by(_genre_stats.c.count.desc(), _genre_stats.c.name)
+        .limit(1)
+        .scalar_subquery()
+    )
+    return update(_stats).where(_stats.c.spotify_id == spotify_id).values(most_frequent_genre=top_genre)
+
+
+def playlist_created(spotify_id: str, genres: Iterable[str], delta: Optional[int] = None) -> List[Executable]:
+    statements = [_bump_stats(spotify_id, 1, delta or 0, int(delta is not None))]
+    genre_statements = _bump_genres(spotify_id, genres, 1)
+    if genre_statements:
+        statements += genre_statements
+        statements.append(_refresh_most_frequent_genre(spotify_id))
+    return statements
+
+
+def mood_changed(spotify_id: str, old_delta: Optional[int], new_delta: Optional[int]) -> List[Executable]:
+    if old_delta == new_delta:
+        return []
+    delta_sum = (new_delta or 0) - (old_delta or 0)
+    delta_count = int(new_delta is not None) - int(old_delta is not None)
+    return [_bump_stats(spotify_id, 0, delta_sum, delta_count)]
+
+
+def playlist_deleted(spotify_id: str, genres: Iterable[str], delta: Optional[int] = None) -> List[Executable]:
+    statements = [_bump_stats(spotify_id, -1, -(delta or 0), -int(delta is not None))]
+    genre_statements = _bump_genres(spotify_id, genres, -1)
+    if genre_statements:
+        statements += genre_statements
+        statements.append(_refresh_most_frequent_genre(spotify_id))
+    return statements
+
+
+def apply(db: Session, statements: List[Executable]) -> None:
+    for stmt in statements:
+        db.execute(stmt)
+
+
+async def apply_async(db: AsyncSession, statements: List[Executable]) -> None:
+    for stmt in statements:
+        await db.execute(stmt)
+
+
+def rebuild_user_stats(db: Session, spotify_id: Optional[str] = None) -> int:
+    """
+    Recompute user_stats and user_genre_stats from the playlist tables, for one user
+    or for everyone. Runs in the caller's transaction; returns the number of users rebuilt.
+    """
+    playlist = PlaylistModel.__table__
+    playlist_genre = PlaylistGenreModel.__table__
+
+    if spotify_id is not None:
+        db.execute(delete(_genre_stats).where(_genre_stats.c.spotify_id == spotify_id))
+        db.execute(delete(_stats).where(_stats.c.spotify_id == spotify_id))
+    else:
+        db.execute(delete(_genre_stats))
+        db.execute(delete(_stats))
+
+    delta = playlist.c.post_mood - playlist.c.pre_mood
+    sessions = select(
+        playlist.c.spotify_id,
+        func.count(),
+        func.coalesce(func.sum(delta), 0),
+        func.count(delta),
+        func.now(),
+    ).group_by(playlist.c.spotify_id)
+    genres = (
+        select(playlist.c.spotify_id, playlist_genre.c.name, func.count())
+        .select_from(playlist_genre.join(playlist, playlist_genre.c.playlist_id == playlist.c.id))
+        .group_by(playlist.c.spotify_id, playlist_genre.c.name)
+    )
+    if spotify_id is not None:
+        sessions = sessions.where(playlist.c.spotify_id == spotify_id)
+        genres = genres.where(playlist.c.spotify_id == spotify_id)
+
+    rebuilt = db.execute(
+        insert(_stats).from_select(
+            ["spotify_id", "session_count", "mood_delta_sum", "mood_delta_count", "updated_at"],
+            sessions,
+        )
+    ).rowcount
+    db.execute(insert(_genre_stats).from_select(["spotify_id", "name", "count"], genres))
+
+    top_genre = (
+        select(_genre_stats.c.name)
+        .where(_genre_stats.c.spotify_id == _stats.c.spotify_id)
+        .order_by(_genre_stats.c.count.desc(), _genre_stats.c.name)
+        .limit(1)
+        .scalar_subquery()
+    )
+    refresh = update(_stats).values(most_frequent_genre=top_genre)
+    if spotify_id is not None:
+        refresh = refresh.where(_stats.c.spotify_id == spotify_id)
+    db.execute(refresh)
+
+    return rebuilt
@@ -1,10 +1,10 @@
 from datetime import datetime, timedelta
 
 
-def calculate_time_ago(created_at):
+def calculate_time_ago(created_at, now=None):
     """Convert created_at to a human-readable time ago format"""
     try:
-        now = datetime.now()
+        now = now or datetime.now()
         diff = now - created_at
 
         if diff < timedelta(minutes=1):
@@ -35,4 +35,25 @@ def calculate_time_ago(created_at):
             return f"{years} years ago"
 
     except Exception:
-        return "unknown time"
\ No newline at end of file
+        return "unknown time"
+
+# (batas rentang, satuan) yang dipakai calculate_time_ago, dalam detik
+_TIME_AGO_UNITS = [
+    (60, 60),
+    (3600, 60),
+    (86400, 3600),
+    (7 * 86400, 86400),
+    (30 * 86400, 7 * 86400),
+    (365 * 86400, 30 * 86400),
+]
+
+
+def time_ago_valid_for(created_at, now=None) -> int:
+    """Seconds until calculate_time_ago(created_at) returns a different label"""
+    now = now or datetime.now()
+    elapsed = max((now - created_at).total_seconds(), 0)
+    for limit, unit in _TIME_AGO_UNITS:
+        if elapsed < limit:
+            return max(int(min(unit - elapsed % unit, limit - elapsed)), 1)
+    unit = 365 * 86400
+    return max(int(unit - elapsed % unit), 1)
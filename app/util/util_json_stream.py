@@ -0,0 +1,88 @@
+import json
+from typing import Dict, List, Optional
+
+
+class PlaylistItemStreamParser:
+    """
+    Incrementally scan a streamed JSON completion and emit every object of the
+    top-level "playlist" array as soon as its closing brace arrives.
+
+    The full text stays available in `text` so the complete document can still be
+    parsed once the stream ends.
+    """
+
+    def __init__(self, array_key: str = "playlist"):
+        self.array_key = array_key
+        self._buffer = ""
+        self._pos = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_key: Optional[str] = None
+        self._array_depth: Optional[int] = None
+        self._item_start: Optional[int] = None
+
+    @property
+    def text(self) -> str:
+        return self._buffer
+
+    def feed(self, chunk: str) -> List[Dict]:
+        if not chunk:
+            return []
+
+        self._buffer += chunk
+        items: List[Dict] = []
+        buffer = self._buffer
+
+        for i in range(self._pos, len(buffer)):
+            char = buffer[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if len(self._stack) == 1:
+                        try:
+                            self._last_key = json.loads(buffer[self._string_start:i + 1])
+                        except ValueError:
+                            self._last_key = None
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = i
+            elif char in "{[":
+                if (
+                    char == "{"
+                    and self._array_depth is not None
+                    and len(self._stack) == self._array_depth
+                ):
+                    self._item_start = i
+                if char == "[" and len(self._stack) == 1 and self._last_key == self.array_key:
+                    self._array_depth = len(self._stack) + 1
+                self._stack.append(char)
+            elif char in "}]":
+                if self._stack:
+                    self._stack.pop()
+                if (
+                    char == "}"
+                    and self._item_start is not None
+                    and self._array_depth is not None
+                    and len(self._stack) == self._array_depth
+                ):
+                    try:
+                        item = json.loads(buffer[self._item_start:i + 1])
+                        if isinstance(item, dict):
+                            items.append(item)
+                    except ValueError:
+                        pass
+                    self._item_start = None
+                elif char == "]" and self._array_depth is not None and len(self._stack) < self._array_depth:
+                    self._array_depth = None
+
+        self._pos = len(buffer)
+        return items
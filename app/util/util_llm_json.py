@@ -0,0 +1,171 @@
+"""
+Parse JSON written by an LLM: markdown fences and surrounding prose are stripped, and
+slightly invalid or truncated documents are repaired instead of rejected.
+"""
+import json
+import re
+from typing import Any, List, Optional, Tuple
+
+_FENCE = re.compile(r"```[a-zA-Z0-9_-]*[ \t]*\n?(.*?)(?:\n?```|$)", re.DOTALL)
+_LITERAL = re.compile(r"true|false|null|-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?")
+
+
+def strip_fences(text: str) -> str:
+    """
+    Return the JSON part of a reply: the fenced block if any, from the first { or [
+    up to the bracket that closes it. Prose after that value is dropped.
+    """
+    text = text or ""
+    match = _FENCE.search(text)
+    if match:
+        text = match.group(1)
+    starts = [index for index in (text.find("{"), text.find("[")) if index >= 0]
+    if not starts:
+        return text.strip()
+    text = text[min(starts):]
+    end = _value_end(text)
+    # Dokumen terpotong (kurung pertama tidak pernah tertutup) dibiarkan utuh untuk repair_json
+    if end is not None:
+        text = text[:end]
+    return text.strip()
+
+
+def _value_end(text: str) -> Optional[int]:
+    """Index just past the bracket closing the value that opens `text`, or None if it never closes"""
+    depth = 0
+    in_string = False
+    escape = False
+    for index, char in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            depth += 1
+        elif char in "}]":
+            depth -= 1
+            if depth == 0:
+                return index + 1
+    return None
+
+
+class _Frame:
+    __slots__ = ("kind", "state", "member_start")
+
+    def __init__(self, kind: str, state: str, member_start: int):
+        self.kind = kind  # "{" or "["
+        self.state = state  # key, colon, value, done
+        self.member_start = member_start  # output index where the current member begins
+
+
+def _drop_trailing_comma(out: List[str]) -> None:
+    while out and out[-1].isspace():
+        out.pop()
+    if out and out[-1] == ",":
+        out.pop()
+
+
+def repair_json(text: str) -> str:
+    """
+    Fix the mistakes LLMs make most often: trailing commas, raw newlines inside
+    strings and output cut off mid-document. An unfinished member (a truncated
+    string or literal, a key without value) is dropped and every open bracket is
+    closed. Anything after the first complete top-level value is ignored.
+    """
+    out: List[str] = []
+    stack: List[_Frame] = []
+    in_string = False
+    escape = False
+    literal_start = None  # output index where the current bare true/false/null/number begins
+
+    def value_done() -> None:
+        if stack:
+            stack[-1].state = "done"
+
+    for char in text:
+        if in_string:
+            out.append("\\n" if char == "\n" else char)
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+                frame = stack[-1] if stack else None
+                if frame is not None and frame.kind == "{" and frame.state == "key":
+                    frame.state = "colon"
+                else:
+                    value_done()
+            continue
+
+        if literal_start is not None and (char.isspace() or char in '"{}[]:,'):
+            literal_start = None
+        if char.isspace():
+            out.append(char)
+        elif char == '"':
+            in_string = True
+            out.append(char)
+        elif char in "{[":
+            out.append(char)
+            stack.append(_Frame(char, "key" if char == "{" else "value", len(out)))
+        elif char in "}]":
+            if not stack:
+                continue
+            frame = stack.pop()
+            if frame.state in ("colon", "value") and frame.kind == "{":
+                del out[frame.member_start:]
+            _drop_trailing_comma(out)
+            out.append("}" if frame.kind == "{" else "]")
+            value_done()
+            if not stack:
+                break
+        elif char == ":":
+            if stack and stack[-1].state == "colon":
+                stack[-1].state = "value"
+            out.append(char)
+        elif char == ",":
+            frame = stack[-1] if stack else None
+            if frame is not None and frame.state == "done":
+                out.append(char)
+                frame.state = "key" if frame.kind == "{" else "value"
+                frame.member_start = len(out)
+            # Koma ganda atau koma sebelum value dibuang
+        else:
+            if literal_start is None:
+                literal_start = len(out)
+            out.append(char)
+            value_done()
+
+    # Dokumen terpotong: buang member yang belum selesai (termasuk literal seperti "tr" atau "1.")
+    # lalu tutup semua kurung
+    partial_literal = literal_start is not None and not _LITERAL.fullmatch("".join(out[literal_start:]))
+    if in_string or partial_literal or (stack and stack[-1].state != "done"):
+        if stack:
+            del out[stack[-1].member_start:]
+    while stack:
+        frame = stack.pop()
+        if frame.kind == "{" and frame.state in ("colon", "value"):
+            del out[frame.member_start:]
+        _drop_trailing_comma(out)
+        out.append("}" if frame.kind == "{" else "]")
+        if stack:
+            stack[-1].state = "done"
+    return "".join(out)
+
+
+def parse_llm_json(text: str) -> Tuple[Any, bool]:
+    """
+    Parse an LLM reply, returning (document, repaired). Raises ValueError when even
+    the repaired text is not valid JSON.
+    """
+    cleaned = strip_fences(text)
+    try:
+        return json.loads(cleaned), False
+    except ValueError:
+        pass
+    return json.loads(repair_json(cleaned)), True
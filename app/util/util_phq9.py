@@ -0,0 +1,27 @@
+from typing import Tuple
+
+# (depression_level, skor PHQ-9 minimum, skor maksimum), urut dari yang paling ringan
+DEPRESSION_LEVELS: Tuple[Tuple[str, int, int], ...] = (
+    ("Tidak Ada Gejala", 0, 0),
+    ("Minimal", 1, 4),
+    ("Ringan", 5, 9),
+    ("Sedang", 10, 14),
+    ("Cukup Parah", 15, 19),
+    ("Parah", 20, 27),
+)
+
+
+def get_depression_level(phq9: int) -> str:
+    """Map a PHQ-9 score to its depression level; empty string for a negative score"""
+    for level, low, high in DEPRESSION_LEVELS:
+        if phq9 <= high:
+            return level if phq9 >= low else ""
+    return DEPRESSION_LEVELS[-1][0]
+
+
+def representative_phq9(depression_level: str) -> int:
+    """Middle PHQ-9 score of a level, used when generating drafts for that level"""
+    for level, low, high in DEPRESSION_LEVELS:
+        if level == depression_level:
+            return (low + high) // 2
+    raise ValueError(f"Unknown depression level: {depression_level}")
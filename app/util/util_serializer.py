@@ -0,0 +1,88 @@
+"""
+Serializer cepat untuk endpoint baca playlist.
+
+Response dibangun langsung dari baris hasil query (tanpa validasi Pydantic per objek) dan
+di-encode dengan orjson bila terpasang. Hasilnya byte-identik dengan JSONResponse FastAPI
+untuk response_model yang sama: urutan field mengikuti schema, mood sebagai string dan
+created_at dengan format "%d/%m/%Y %H:%M".
+"""
+import json
+from datetime import datetime
+from typing import Dict, List, Mapping, Optional
+
+from app.schemas.schemas_playlist import PlaylistSummaryResponse
+from app.schemas.schemas_playlist_genre import PlaylistGenreResponse
+from app.schemas.schemas_playlist_track import PlaylistTrackResponse
+from app.util.util_convert_time import calculate_time_ago
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, the stdlib encoder gives the same bytes
+    orjson = None
+
+DATETIME_FORMAT = "%d/%m/%Y %H:%M"
+
+# Urutan field diambil dari schema supaya output tetap sama bila schema berubah
+SUMMARY_FIELDS = tuple(PlaylistSummaryResponse.model_fields)
+TRACK_FIELDS = tuple(PlaylistTrackResponse.model_fields)
+GENRE_FIELDS = tuple(PlaylistGenreResponse.model_fields)
+_MOOD_FIELDS = ("pre_mood", "post_mood")
+
+
+def _default(value):
+    if isinstance(value, datetime):
+        return value.strftime(DATETIME_FORMAT)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content) -> bytes:
+    """Encode like FastAPI's JSONResponse; datetimes use DATETIME_FORMAT"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+    return json.dumps(
+        content,
+        default=_default,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def mood(value) -> Optional[str]:
+    # Schema memakai coerce_numbers_to_str untuk pre_mood/post_mood
+    return None if value is None else str(value)
+
+
+def playlist_summary(row: Mapping, now: Optional[datetime] = None) -> Dict:
+    """PlaylistSummaryResponse fields from a row holding the summary columns"""
+    item = {}
+    for field in SUMMARY_FIELDS:
+        if field == "time_ago":
+            item[field] = calculate_time_ago(row["created_at"], now)
+        elif field in _MOOD_FIELDS:
+            item[field] = mood(row[field])
+        else:
+            item[field] = row[field]
+    return item
+
+
+def track(row: Mapping) -> Dict:
+    return {field: row[field] for field in TRACK_FIELDS}
+
+
+def genre(row: Mapping) -> Dict:
+    return {field: row[field] for field in GENRE_FIELDS}
+
+
+def playlist_detail(row: Mapping, tracks: List[Mapping], genres: List[Mapping], now: Optional[datetime] = None) -> Dict:
+    """Same shape as PlaylistResponse"""
+    item = playlist_summary(row, now)
+    item["tracks"] = [track(t) for t in tracks]
+    item["genres"] = [genre(g) for g in genres]
+    return item
+
+
+def chart_point(sequence_number: int, pre_mood, post_mood) -> Dict:
+    """Same shape as ChartMoodItem"""
+    return {"sequence_number": sequence_number, "pre_mood": mood(pre_mood), "post_mood": mood(post_mood)}
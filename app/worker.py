@@ -0,0 +1,89 @@
+"""
+Worker untuk menjalankan job pembuatan playlist dari antrian playlist_job.
+
+Jalankan dengan: python -m app.worker
+Throughput pembuatan playlist bisa ditambah dengan menjalankan lebih banyak worker.
+"""
+import signal
+import threading
+import time
+
+from dotenv import find_dotenv, load_dotenv
+from fastapi import HTTPException
+
+load_dotenv(find_dotenv())
+
+from app.config.config import JOB_HEARTBEAT_INTERVAL, JOB_POLL_INTERVAL
+from app.config.database import DBContext
+from app.service import service_playlist_job
+from app.service.service_playlist import create_playlist
+
+_running = True
+
+
+def _stop(signum, frame):
+    global _running
+    print(f"Received signal {signum}, stopping worker after the current job")
+    _running = False
+
+
+def _heartbeat(job_id: str, attempt: int, stop: threading.Event) -> None:
+    # Session sendiri: session job sedang dipakai pipeline pembuatan playlist
+    while not stop.wait(JOB_HEARTBEAT_INTERVAL):
+        try:
+            with DBContext() as db:
+                if not service_playlist_job.heartbeat(db, job_id, attempt):
+                    print(f"Playlist job {job_id} was taken over by another worker")
+                    return
+        except Exception as e:
+            print(f"Error sending heartbeat for playlist job {job_id}: {str(e)}")
+
+
+def run_job(db, job) -> None:
+    job_id, attempt = job.id, job.attempts
+    print(f"Running playlist job {job_id} for user {job.spotify_id} (attempt {attempt})")
+    stop = threading.Event()
+    threading.Thread(target=_heartbeat, args=(job_id, attempt, stop), daemon=True).start()
+    try:
+        try:
+            playlist = create_playlist(db, job.spotify_id, job.pre_mood, job.phq9_score)
+        except HTTPException as e:
+            db.rollback()
+            print(f"Playlist job {job_id} failed: {e.detail}")
+            service_playlist_job.fail_job(db, job_id, attempt, str(e.detail))
+            return
+        except Exception as e:
+            db.rollback()
+            print(f"Playlist job {job_id} failed: {str(e)}")
+            service_playlist_job.fail_job(db, job_id, attempt, f"Unexpected error: {str(e)}")
+            return
+    finally:
+        stop.set()
+
+    if service_playlist_job.complete_job(db, job_id, attempt, playlist.id):
+        print(f"Playlist job {job_id} done, playlist {playlist.id}")
+    else:
+        print(f"Playlist job {job_id} was re-claimed while running, playlist {playlist.id} not linked to it")
+
+
+def run_worker() -> None:
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+    print("Playlist worker started")
+
+    while _running:
+        try:
+            with DBContext() as db:
+                job = service_playlist_job.claim_next_job(db)
+                if job:
+                    run_job(db, job)
+                    continue
+        except Exception as e:
+            print(f"Error in playlist worker loop: {str(e)}")
+        time.sleep(JOB_POLL_INTERVAL)
+
+    print("Playlist worker stopped")
+
+
+if __name__ == "__main__":
+    run_worker()
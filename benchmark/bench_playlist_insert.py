@@ -0,0 +1,130 @@
+"""
+Micro-benchmark: DB time per playlist create, ORM path vs bulk path.
+
+Membutuhkan database yang sudah di-migrate (alembic upgrade head).
+Semua data benchmark dihapus lagi di akhir.
+
+    python -m benchmark.bench_playlist_insert --iterations 50
+"""
+import argparse
+import statistics
+import time
+import uuid
+
+from dotenv import find_dotenv, load_dotenv
+from sqlalchemy import event, func
+
+load_dotenv(find_dotenv())
+
+from app.config.database import DBContext, engine
+from app.model.playlist import PlaylistModel
+from app.model.playlist_genre import PlaylistGenreModel
+from app.model.playlist_track import PlaylistTrackModel
+from app.model.user import UserModel
+from app.schemas.schemas_playlist import PlaylistCreate, PlaylistResponse
+from app.service import service_user_stats
+from app.service.service_playlist import save_playlist
+from app.util.util_convert_time import calculate_time_ago
+
+TRACKS = [{"title": f"Track {i}", "artist": f"Artist {i}", "duration": 200000 + i} for i in range(15)]
+GENRES = ["indie pop", "acoustic", "lo-fi"]
+
+
+def _playlist_data(spotify_id: str) -> PlaylistCreate:
+    return PlaylistCreate(
+        id=str(uuid.uuid4()),
+        spotify_id=spotify_id,
+        name="Benchmark Playlist",
+        phq9_score=7,
+        depression_level="Ringan",
+        pre_mood=4,
+        total_tracks=len(TRACKS),
+        duration=sum(track["duration"] for track in TRACKS),
+        link_playlist="https://open.spotify.com/playlist/benchmark",
+        mode="healing",
+    )
+
+
+def save_playlist_orm(db, playlist_data: PlaylistCreate, tracks, genres):
+    """The previous persistence path: one ORM object per row, flush, commit and refresh"""
+    # Sequence number dari SELECT max(...) seperti sebelumnya
+    last_seq = db.query(func.max(PlaylistModel.sequence_number)).filter(PlaylistModel.spotify_id == playlist_data.spotify_id).scalar()
+    playlist_data.sequence_number = (last_seq or 0) + 1
+    db_playlist = PlaylistModel(**playlist_data.model_dump())
+    db.add(db_playlist)
+    db.flush()
+
+    for track in tracks:
+        db.add(PlaylistTrackModel(
+            id=str(uuid.uuid4()),
+            name=track["title"],
+            artist=track["artist"],
+            duration=track.get("duration"),
+            playlist_id=db_playlist.id,
+        ))
+    for genre in genres:
+        db.add(PlaylistGenreModel(id=str(uuid.uuid4()), name=genre, playlist_id=db_playlist.id))
+
+    # Statistik per user juga dijaga di path lama, supaya yang dibandingkan hanya cara insert-nya
+    service_user_stats.apply(db, service_user_stats.playlist_created(
+        playlist_data.spotify_id,
+        genres,
+        service_user_stats.mood_delta(playlist_data.pre_mood, playlist_data.post_mood),
+    ))
+
+    db.commit()
+    db.refresh(db_playlist)
+    db_playlist.time_ago = calculate_time_ago(db_playlist.created_at)
+    # Serialization loads tracks and genres lazily
+    return PlaylistResponse.model_validate(db_playlist)
+
+
+def run(label: str, save, spotify_id: str, iterations: int):
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    timings = []
+    event.listen(engine, "before_cursor_execute", count_statement)
+    try:
+        for _ in range(iterations):
+            with DBContext() as db:
+                start = time.perf_counter()
+                save(db, _playlist_data(spotify_id), TRACKS, GENRES)
+                timings.append((time.perf_counter() - start) * 1000)
+    finally:
+        event.remove(engine, "before_cursor_execute", count_statement)
+
+    print(
+        f"{label:<6} mean {statistics.mean(timings):7.2f} ms  "
+        f"p50 {statistics.median(timings):7.2f} ms  "
+        f"max {max(timings):7.2f} ms  "
+        f"statements/create {len(statements) / iterations:.1f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    spotify_id = f"benchmark-{uuid.uuid4()}"
+    with DBContext() as db:
+        db.add(UserModel(spotify_id=spotify_id, email=f"{spotify_id}@example.com", name="Benchmark"))
+        db.commit()
+
+    try:
+        run("orm", save_playlist_orm, spotify_id, args.iterations)
+        with DBContext() as db:
+            db.query(UserModel).filter(UserModel.spotify_id == spotify_id).update({UserModel.playlist_seq: args.iterations})
+            db.commit()
+        run("bulk", save_playlist, spotify_id, args.iterations)
+    finally:
+        with DBContext() as db:
+            db.query(UserModel).filter(UserModel.spotify_id == spotify_id).delete()
+            db.commit()
+
+
+if __name__ == "__main__":
+    main()
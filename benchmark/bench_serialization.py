@@ -0,0 +1,124 @@
+"""
+Micro-benchmark: serialization cost of playlist responses, Pydantic path vs util_serializer.
+
+Tidak membutuhkan database; playlist dibuat sebagai objek ORM di memori (untuk jalur
+Pydantic, seperti response_model FastAPI) dan sebagai baris dict (untuk jalur cepat).
+Output kedua jalur dicek byte-identik sebelum diukur.
+
+    python -m benchmark.bench_serialization --repeat 20
+"""
+import argparse
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import List
+
+from dotenv import find_dotenv, load_dotenv
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+load_dotenv(find_dotenv())
+
+from app.model.playlist import PlaylistModel
+from app.model.playlist_genre import PlaylistGenreModel
+from app.model.playlist_track import PlaylistTrackModel
+from app.schemas.schemas_playlist import PlaylistResponse
+from app.util import util_serializer
+from app.util.util_convert_time import calculate_time_ago
+
+SIZES = (1, 100, 1000)
+TRACKS_PER_PLAYLIST = 15
+GENRES = ["indie pop", "acoustic", "lo-fi"]
+
+_adapter = TypeAdapter(List[PlaylistResponse])
+
+
+def make_rows(count: int):
+    now = datetime.now()
+    rows = []
+    for i in range(count):
+        playlist_id = str(uuid.uuid4())
+        rows.append({
+            "id": playlist_id,
+            "spotify_id": "benchmark-user",
+            "name": f"Playlist Healing {i}",
+            "sequence_number": count - i,
+            "phq9_score": i % 27,
+            "depression_level": "Ringan",
+            "pre_mood": i % 10,
+            "post_mood": (i + 3) % 10 if i % 2 else None,
+            "duration": 3000000,
+            "total_tracks": TRACKS_PER_PLAYLIST,
+            "link_playlist": "https://open.spotify.com/playlist/benchmark",
+            "feedback": None,
+            "mode": "healing",
+            "created_at": now - timedelta(hours=i * 7),
+            "tracks": [{"name": f"Track {j}", "artist": f"Artist {j}", "duration": 200000 + j} for j in range(TRACKS_PER_PLAYLIST)],
+            "genres": [{"name": genre} for genre in GENRES],
+        })
+    return rows
+
+
+def make_orm_objects(rows):
+    playlists = []
+    for row in rows:
+        columns = {key: value for key, value in row.items() if key not in ("tracks", "genres")}
+        playlist = PlaylistModel(**columns)
+        playlist.tracks = [PlaylistTrackModel(id=str(uuid.uuid4()), playlist_id=row["id"], **track) for track in row["tracks"]]
+        playlist.genres = [PlaylistGenreModel(id=str(uuid.uuid4()), playlist_id=row["id"], **genre) for genre in row["genres"]]
+        playlists.append(playlist)
+    return playlists
+
+
+def pydantic_path(playlists) -> bytes:
+    # Sama seperti endpoint dengan response_model: time_ago per objek, validasi, lalu JSONResponse
+    for playlist in playlists:
+        playlist.time_ago = calculate_time_ago(playlist.created_at)
+    validated = _adapter.validate_python(playlists, from_attributes=True)
+    return JSONResponse(content=_adapter.dump_python(validated, mode="json")).body
+
+
+def fast_path(rows) -> bytes:
+    now = datetime.now()
+    return util_serializer.dumps([
+        util_serializer.playlist_detail(row, row["tracks"], row["genres"], now)
+        for row in rows
+    ])
+
+
+def measure(fn, arg, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(arg)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.mean(timings), statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    encoder = "orjson" if util_serializer.orjson is not None else "json"
+    print(f"encoder: {encoder}, {TRACKS_PER_PLAYLIST} tracks and {len(GENRES)} genres per playlist")
+
+    for size in SIZES:
+        rows = make_rows(size)
+        playlists = make_orm_objects(rows)
+        if pydantic_path(playlists) != fast_path(rows):
+            raise SystemExit(f"Output differs for {size} playlists")
+
+        slow_mean, slow_p50 = measure(pydantic_path, playlists, args.repeat)
+        fast_mean, fast_p50 = measure(fast_path, rows, args.repeat)
+        print(
+            f"{size:>5} playlists  "
+            f"pydantic mean {slow_mean:8.3f} ms p50 {slow_p50:8.3f} ms  "
+            f"fast mean {fast_mean:8.3f} ms p50 {fast_p50:8.3f} ms  "
+            f"speedup {slow_mean / fast_mean:5.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
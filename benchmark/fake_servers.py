@@ -0,0 +1,228 @@
+"""
+Local stand-ins for the Spotify Web API and an OpenAI-compatible chat endpoint, for
+load tests that must not spend LLM quota or hit Spotify rate limits.
+
+Only the endpoints the API uses are served: GET /v1/me, GET /v1/me/tracks,
+GET /v1/search, POST /v1/users/{id}/playlists, POST /v1/playlists/{id}/tracks and
+POST /llm/v1/chat/completions (streamed and non-streamed). Every response is delayed by
+a log-normal latency (median in ms, sigma) and fails with HTTP 503 at the given rate.
+The access token is used as the Spotify user id, so any "Bearer <spotify_id>" works.
+
+    python -m benchmark.fake_servers --port 9100 --spotify-latency 80:0.4 --llm-latency 6000:0.5
+
+Point the API at it (values for the default port):
+
+    SPOTIFY_API_PREFIX=http://127.0.0.1:9100/v1/
+    HF_BASE_URL=http://127.0.0.1:9100/llm/v1 HF_TOKEN=bench
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+@dataclass
+class Behaviour:
+    median_ms: float
+    sigma: float
+    error_rate: float
+
+    def delay(self) -> float:
+        if self.median_ms <= 0:
+            return 0.0
+        return random.lognormvariate(math.log(self.median_ms / 1000), self.sigma)
+
+    def fails(self) -> bool:
+        return random.random() < self.error_rate
+
+
+def parse_latency(value: str):
+    median, _, sigma = value.partition(":")
+    return float(median), float(sigma or 0.5)
+
+
+def _catalog(size: int) -> List[Dict]:
+    # Katalog tetap sehingga judul yang sama dari LLM kena cache lagu di run berikutnya
+    return [
+        {"title": f"Bench Song {i}", "artist": f"Bench Artist {i}", "uri": f"spotify:track:bench{i:06d}", "duration_ms": 150000 + (i * 7919) % 120000}
+        for i in range(size)
+    ]
+
+
+def create_app(
+    spotify: Behaviour,
+    llm: Behaviour,
+    catalog_size: int = 2000,
+    miss_rate: float = 0.05,
+    truncate_rate: float = 0.0,
+    stream_chunks: int = 40,
+) -> FastAPI:
+    app = FastAPI(title="MindTune fake Spotify/LLM")
+    catalog = _catalog(catalog_size)
+    by_title = {song["title"]: song for song in catalog}
+    stats = {"spotify_requests": 0, "spotify_errors": 0, "llm_requests": 0, "llm_errors": 0}
+
+    async def spotify_call(request: Request):
+        stats["spotify_requests"] += 1
+        await asyncio.sleep(spotify.delay())
+        if spotify.fails():
+            stats["spotify_errors"] += 1
+            return JSONResponse({"error": {"status": 503, "message": "fake outage"}}, status_code=503)
+        return None
+
+    def user_id(request: Request) -> str:
+        return request.headers.get("authorization", "Bearer bench-user").split(" ", 1)[-1]
+
+    @app.get("/v1/me")
+    async def me(request: Request):
+        error = await spotify_call(request)
+        if error:
+            return error
+        spotify_id = user_id(request)
+        return {"id": spotify_id, "display_name": spotify_id, "email": f"{spotify_id}@example.com", "country": "ID"}
+
+    @app.get("/v1/me/tracks")
+    async def saved_tracks(request: Request, limit: int = 20):
+        error = await spotify_call(request)
+        if error:
+            return error
+        rng = random.Random(user_id(request))
+        songs = rng.sample(catalog, min(limit, len(catalog)))
+        return {"items": [
+            {"track": {"name": song["title"], "artists": [{"name": song["artist"]}], "uri": song["uri"], "duration_ms": song["duration_ms"]}}
+            for song in songs
+        ]}
+
+    @app.get("/v1/search")
+    async def search(request: Request, q: str = ""):
+        error = await spotify_call(request)
+        if error:
+            return error
+        title = q.split("track:", 1)[-1].split(" artist:", 1)[0]
+        song = by_title.get(title)
+        if song is None or random.random() < miss_rate:
+            return {"tracks": {"items": []}}
+        return {"tracks": {"items": [{"name": song["title"], "uri": song["uri"], "duration_ms": song["duration_ms"]}]}}
+
+    @app.post("/v1/users/{spotify_id}/playlists")
+    async def create_playlist(spotify_id: str, request: Request):
+        error = await spotify_call(request)
+        if error:
+            return error
+        playlist_id = uuid.uuid4().hex[:22]
+        return JSONResponse({"id": playlist_id, "external_urls": {"spotify": f"https://open.spotify.com/playlist/{playlist_id}"}}, status_code=201)
+
+    @app.post("/v1/playlists/{playlist_id}/tracks")
+    async def add_items(playlist_id: str, request: Request):
+        error = await spotify_call(request)
+        if error:
+            return error
+        return JSONResponse({"snapshot_id": uuid.uuid4().hex}, status_code=201)
+
+    def playlist_reply(prompt: str) -> str:
+        try:
+            needed = json.loads(prompt).get("instructions", {}).get("tracks_needed")
+        except ValueError:
+            needed = None
+        songs = random.sample(catalog, needed or 15)
+        reply = {"playlist": [{"title": song["title"], "artist": song["artist"]} for song in songs]}
+        if needed is None:
+            reply = {
+                "playlist_title": f"Bench Playlist {random.randint(1, 9999)}",
+                "description": "A generated playlist for load testing.",
+                "playlist": reply["playlist"],
+                "genres": ["indie pop", "acoustic", "lo-fi"],
+            }
+        text = json.dumps(reply, indent=2)
+        if random.random() < truncate_rate:
+            text = text[: int(len(text) * random.uniform(0.6, 0.95))]
+        return text
+
+    @app.post("/llm/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        stats["llm_requests"] += 1
+        total_delay = llm.delay()
+        if llm.fails():
+            await asyncio.sleep(total_delay / 4)
+            stats["llm_errors"] += 1
+            return JSONResponse({"error": {"message": "fake overload", "type": "server_error"}}, status_code=503)
+
+        prompt = body["messages"][-1]["content"]
+        content = playlist_reply(prompt)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+        usage = {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4, "total_tokens": (len(prompt) + len(content)) // 4}
+
+        if not body.get("stream"):
+            await asyncio.sleep(total_delay)
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": body.get("model"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": usage,
+            }
+
+        async def events():
+            size = max(1, math.ceil(len(content) / stream_chunks))
+            pieces = [content[i:i + size] for i in range(0, len(content), size)]
+            for piece in pieces:
+                await asyncio.sleep(total_delay / len(pieces))
+                chunk = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": body.get("model"),
+                    "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}],
+                }
+                yield f"data: {json.dumps(chunk)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    return app
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Fake Spotify Web API and OpenAI-compatible LLM for load tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--spotify-latency", default="80:0.4", help="median_ms:sigma of the log-normal latency")
+    parser.add_argument("--spotify-error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-latency", default="6000:0.5", help="median_ms:sigma of the total completion time")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-truncate-rate", type=float, default=0.0, help="fraction of replies cut off mid-JSON")
+    parser.add_argument("--search-miss-rate", type=float, default=0.05)
+    parser.add_argument("--catalog-size", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    app = create_app(
+        spotify=Behaviour(*parse_latency(args.spotify_latency), args.spotify_error_rate),
+        llm=Behaviour(*parse_latency(args.llm_latency), args.llm_error_rate),
+        catalog_size=args.catalog_size,
+        miss_rate=args.search_miss_rate,
+        truncate_rate=args.llm_truncate_rate,
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""
+Load test: throughput and p50/p95/p99 latency per endpoint of every mounted router
+(users, playlists, health, admin) against a running API.
+
+Membutuhkan database yang sudah di-migrate dan API yang diarahkan ke benchmark.fake_servers,
+sehingga tidak ada panggilan ke Spotify atau LLM sungguhan. User benchmark (access token =
+spotify_id) beserta playlist awalnya dibuat di database dan dihapus lagi di akhir.
+
+    python -m benchmark.fake_servers --port 9100 &
+    SPOTIFY_API_PREFIX=http://127.0.0.1:9100/v1/ HF_BASE_URL=http://127.0.0.1:9100/llm/v1 HF_TOKEN=bench \\
+        uvicorn app.main:app --port 8000 --workers 4 &
+    python -m benchmark.load_driver --base-url http://127.0.0.1:8000 --users 50 --duration 60
+
+/api/users/access-token and /api/users/refresh-token need the Spotify accounts service and
+are not exercised; the admin-only endpoints (analytics, health stats) only when
+ADMIN_API_KEY is set.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+import uuid
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import httpx
+from dotenv import find_dotenv, load_dotenv
+
+load_dotenv(find_dotenv())
+
+from app.config.database import DBContext
+from app.model.user import UserModel
+from app.schemas.schemas_playlist import PlaylistCreate
+from app.service.service_playlist import save_playlist
+
+TRACKS = [{"title": f"Bench Song {i}", "artist": f"Bench Artist {i}", "duration": 180000 + i} for i in range(15)]
+GENRES = ["indie pop", "acoustic", "lo-fi"]
+
+# (router, endpoint, bobot) — bobot relatif, pembuatan playlist jauh lebih jarang dari baca
+SCENARIOS = [
+    ("users", "GET /api/users/login", 2),
+    ("users", "GET /api/users/me", 5),
+    ("playlists", "GET /api/playlists/create", 1),
+    ("playlists", "GET /api/playlists/jobs/create", 1),
+    ("playlists", "GET /api/playlists/jobs/{job_id}", 2),
+    ("playlists", "GET /api/playlists/", 20),
+    ("playlists", "GET /api/playlists/{playlist_id}", 15),
+    ("playlists", "GET /api/playlists/{playlist_id}/feedback", 3),
+    ("playlists", "GET /api/playlists/export", 1),
+    ("playlists", "GET /api/playlists/dashboard/stats", 10),
+    ("playlists", "GET /api/playlists/chart/mood", 10),
+    ("playlists", "DELETE /api/playlists/{playlist_id}", 1),
+    ("health", "GET /api/health", 2),
+    ("admin", "GET /api/health/stats", 1),
+    ("admin", "GET /api/admin/analytics", 2),
+]
+
+
+def _percentile(values: List[float], percentile: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(percentile / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def seed_users(count: int, playlists_per_user: int) -> List[str]:
+    run_id = uuid.uuid4().hex[:8]
+    spotify_ids = [f"bench-{run_id}-{i}" for i in range(count)]
+    with DBContext() as db:
+        for spotify_id in spotify_ids:
+            db.add(UserModel(spotify_id=spotify_id, email=f"{spotify_id}@example.com", name=spotify_id, access_token=spotify_id))
+        db.commit()
+        for spotify_id in spotify_ids:
+            for _ in range(playlists_per_user):
+                pre_mood = random.randint(0, 10)
+                save_playlist(db, PlaylistCreate(
+                    id=str(uuid.uuid4()),
+                    spotify_id=spotify_id,
+                    name="Bench Playlist",
+                    phq9_score=random.randint(0, 27),
+                    depression_level="Ringan",
+                    pre_mood=pre_mood,
+                    post_mood=min(10, pre_mood + random.randint(-1, 3)),
+                    total_tracks=len(TRACKS),
+                    duration=sum(track["duration"] for track in TRACKS),
+                    link_playlist="https://open.spotify.com/playlist/bench",
+                    mode="healing",
+                ), TRACKS, GENRES)
+    return spotify_ids
+
+
+def delete_users(spotify_ids: List[str]) -> None:
+    # Playlist, track, genre dan job ikut terhapus lewat ON DELETE CASCADE
+    with DBContext() as db:
+        db.query(UserModel).filter(UserModel.spotify_id.in_(spotify_ids)).delete(synchronize_session=False)
+        db.commit()
+
+
+class VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, spotify_id: str, admin_key: Optional[str]):
+        self.client = client
+        self.headers = {"Authorization": f"Bearer {spotify_id}"}
+        self.admin_key = admin_key
+        self.playlist_ids: List[str] = []
+        self.created_ids: List[str] = []
+        self.job_ids: List[str] = []
+
+    async def request(self, endpoint: str) -> Optional[httpx.Response]:
+        """Send one request for the endpoint, or return None when it has nothing to act on yet"""
+        method, path = endpoint.split(" ", 1)
+        params: Dict = {}
+        headers = self.headers
+
+        if "{playlist_id}" in path:
+            pool = self.created_ids if method == "DELETE" else self.playlist_ids
+            if not pool:
+                return None
+            playlist_id = pool.pop() if method == "DELETE" else random.choice(pool)
+            if method == "DELETE" and playlist_id in self.playlist_ids:
+                self.playlist_ids.remove(playlist_id)
+            path = path.replace("{playlist_id}", playlist_id)
+            if path.endswith("/feedback"):
+                params = {"post_mood": random.randint(0, 10), "feedback": "bench"}
+        elif "{job_id}" in path:
+            if not self.job_ids:
+                return None
+            path = path.replace("{job_id}", random.choice(self.job_ids))
+        elif path.endswith("/create"):
+            params = {"pre_mood": random.randint(0, 10), "phq9": random.randint(0, 27)}
+        elif path == "/api/playlists/export":
+            params = {"format": random.choice(["ndjson", "csv"])}
+        elif path.startswith("/api/admin") or path == "/api/health/stats":
+            headers = {"X-Admin-Key": self.admin_key}
+
+        response = await self.client.request(method, path, params=params, headers=headers)
+
+        # Playlist baru dipakai skenario detail/feedback/delete berikutnya
+        if response.status_code == 200 and path == "/api/playlists/":
+            self.playlist_ids = list({*self.playlist_ids, *(item["id"] for item in response.json())})
+        elif response.status_code == 201 and path == "/api/playlists/create":
+            playlist_id = response.json()["id"]
+            self.playlist_ids.append(playlist_id)
+            self.created_ids.append(playlist_id)
+        elif response.status_code == 202:
+            self.job_ids.append(response.json()["id"])
+        return response
+
+
+async def run(args, spotify_ids: List[str]) -> Dict:
+    routers = set(args.routers.split(","))
+    admin_key = os.getenv("ADMIN_API_KEY")
+    if not admin_key:
+        routers.discard("admin")
+    scenarios = [(router, endpoint, weight) for router, endpoint, weight in SCENARIOS if router in routers]
+    endpoints = [endpoint for _, endpoint, _ in scenarios]
+    weights = [weight for _, _, weight in scenarios]
+    router_of = {endpoint: router for router, endpoint, _ in scenarios}
+
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    remaining = [args.requests]
+    deadline = time.monotonic() + args.duration if args.duration else None
+
+    limits = httpx.Limits(max_connections=args.users, max_keepalive_connections=args.users)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        async def worker(spotify_id: str):
+            user = VirtualUser(client, spotify_id, admin_key)
+            while (deadline is None or time.monotonic() < deadline) and (args.duration or remaining[0] > 0):
+                endpoint = random.choices(endpoints, weights)[0]
+                started = time.perf_counter()
+                try:
+                    response = await user.request(endpoint)
+                except httpx.HTTPError as e:
+                    print(f"{endpoint} failed: {type(e).__name__}: {str(e)}")
+                    response = False
+                if response is None:
+                    continue
+                remaining[0] -= 1
+                latencies[endpoint].append((time.perf_counter() - started) * 1000)
+                if response is False or response.status_code >= 400:
+                    errors[endpoint] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(spotify_id) for spotify_id in spotify_ids))
+        elapsed = time.perf_counter() - started
+
+    results = {"elapsed_seconds": round(elapsed, 2), "users": len(spotify_ids), "endpoints": {}}
+    for endpoint in endpoints:
+        values = latencies.get(endpoint, [])
+        results["endpoints"][endpoint] = {
+            "router": router_of[endpoint],
+            "requests": len(values),
+            "errors": errors.get(endpoint, 0),
+            "rps": round(len(values) / elapsed, 2),
+            "p50_ms": _percentile(values, 50),
+            "p95_ms": _percentile(values, 95),
+            "p99_ms": _percentile(values, 99),
+        }
+    return results
+
+
+def print_report(results: Dict) -> None:
+    def ms(value: Optional[float]) -> str:
+        return f"{value:9.1f}" if value is not None else f"{'-':>9}"
+
+    print(f"\n{results['users']} users, {results['elapsed_seconds']} s")
+    print(f"{'router':<10} {'endpoint':<44} {'requests':>8} {'errors':>6} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    total = 0
+    for endpoint, row in results["endpoints"].items():
+        total += row["requests"]
+        print(
+            f"{row['router']:<10} {endpoint:<44} {row['requests']:>8} {row['errors']:>6} {row['rps']:>8.2f} "
+            f"{ms(row['p50_ms'])} {ms(row['p95_ms'])} {ms(row['p99_ms'])}"
+        )
+    print(f"total {total} requests, {total / results['elapsed_seconds']:.2f} req/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--users", type=int, default=20, help="concurrent virtual users, each with its own account")
+    parser.add_argument("--duration", type=float, default=None, help="run for N seconds instead of a request count")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--playlists-per-user", type=int, default=20)
+    parser.add_argument("--routers", default="users,playlists,health,admin")
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    spotify_ids = seed_users(args.users, args.playlists_per_user)
+    try:
+        results = asyncio.run(run(args, spotify_ids))
+    finally:
+        delete_users(spotify_ids)
+
+    print_report(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Shared fixtures: every test gets a fresh SQLite database with the full schema, and the
+app's session factories are pointed at it so DBContext and background helpers use it too.
+"""
+import os
+import uuid
+from datetime import datetime, timedelta
+
+os.environ.setdefault("SP_CLIENT_ID", "test")
+os.environ.setdefault("SP_CLIENT_SECRET", "test")
+os.environ.setdefault("SP_REDIRECT_URI", "http://localhost/callback")
+os.environ.setdefault("DB_HOST", "localhost")
+# Tanpa Redis: cache memakai fallback in-process
+os.environ["REDIS_URL"] = ""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.model  # noqa: F401  (registers every table on Base.metadata)
+from app.auth.auth import get_current_user
+from app.config import database
+from app.main import app
+from app.model.playlist import PlaylistModel
+from app.model.user import UserModel
+from app.schemas.schemas_playlist import PlaylistCreate
+from app.service import service_playlist, service_playlist_export, service_track_cache
+
+TRACKS = [{"title": f"Lagu {i}", "artist": f"Penyanyi {i}", "duration": 180000 + i} for i in range(15)]
+GENRES = ["indie pop", "akustik", "lo-fi"]
+
+
+def _enable_foreign_keys(dbapi_connection, connection_record):
+    # ON DELETE CASCADE hanya berjalan di SQLite bila foreign key diaktifkan
+    dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    path = tmp_path / "test.db"
+    sync_engine = create_engine(f"sqlite:///{path}")
+    event.listen(sync_engine, "connect", _enable_foreign_keys)
+    database.Base.metadata.create_all(sync_engine)
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    event.listen(async_engine.sync_engine, "connect", _enable_foreign_keys)
+
+    monkeypatch.setattr(database, "engine", sync_engine)
+    monkeypatch.setattr(database, "async_engine", async_engine)
+    monkeypatch.setattr(database, "SessionLocal", sessionmaker(bind=sync_engine, autoflush=False))
+    async_session_local = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+    monkeypatch.setattr(database, "AsyncSessionLocal", async_session_local)
+    # Export mengimpor factory-nya langsung
+    monkeypatch.setattr(service_playlist_export, "AsyncSessionLocal", async_session_local)
+    yield sync_engine
+    sync_engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+def empty_track_cache():
+    # LRU lagu bersifat global per proses, jangan bocor antar test
+    service_track_cache._memory.clear()
+    yield
+    service_track_cache._memory.clear()
+
+
+@pytest.fixture
+def db(engine):
+    session = database.SessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def user(db):
+    spotify_id = f"test-{uuid.uuid4()}"
+    db.add(UserModel(spotify_id=spotify_id, email=f"{spotify_id}@example.com", name="Test", access_token=spotify_id))
+    db.commit()
+    return db.get(UserModel, spotify_id)
+
+
+def playlist_data(spotify_id: str, pre_mood: int = 4, post_mood=None, name: str = "Tenang") -> PlaylistCreate:
+    return PlaylistCreate(
+        id=str(uuid.uuid4()),
+        spotify_id=spotify_id,
+        name=name,
+        phq9_score=7,
+        depression_level="Ringan",
+        pre_mood=pre_mood,
+        post_mood=post_mood,
+        total_tracks=len(TRACKS),
+        duration=sum(track["duration"] for track in TRACKS),
+        link_playlist="https://open.spotify.com/playlist/test",
+        mode="healing",
+    )
+
+
+@pytest.fixture
+def make_playlists(db, user):
+    """
+    Save `count` playlists for the test user through save_playlist; with days_ago the
+    rows are moved back in time (created_at and updated_at) after the insert.
+    """
+    def make(count: int = 1, pre_mood: int = 4, post_mood=None, days_ago: float = 0, name: str = "Tenang"):
+        created = [
+            service_playlist.save_playlist(db, playlist_data(user.spotify_id, pre_mood, post_mood, name), TRACKS, GENRES)
+            for _ in range(count)
+        ]
+        if days_ago:
+            moment = datetime.now() - timedelta(days=days_ago)
+            db.execute(
+                update(PlaylistModel)
+                .where(PlaylistModel.id.in_([playlist.id for playlist in created]))
+                .values(created_at=moment, updated_at=moment)
+            )
+            db.commit()
+        return created
+    return make
+
+
+@pytest.fixture
+def client(user):
+    """TestClient authenticated as the test user (Spotify token validation skipped)"""
+    current = UserModel(spotify_id=user.spotify_id, email=user.email, name=user.name, access_token=user.access_token)
+    app.dependency_overrides[get_current_user] = lambda: current
+    yield TestClient(app)
+    app.dependency_overrides.pop(get_current_user, None)
+
+
+class FakeSpotify:
+    """
+    Spotify client stand-in: every search finds "spotify:track:<title>" unless the title
+    is in `missing`, and creating a playlist calls `on_create` first when it is set.
+    """
+
+    def __init__(self):
+        self.missing = set()
+        self.on_create = None
+        self.searched = []
+        self.added = []
+
+    def current_user_saved_tracks(self, limit, market):
+        return {"items": []}
+
+    def search(self, q, type, limit, market):
+        title = q.split("track:", 1)[1].split(" artist:", 1)[0]
+        self.searched.append(title)
+        if title in self.missing:
+            return {"tracks": {"items": []}}
+        return {"tracks": {"items": [{"uri": f"spotify:track:{title}", "duration_ms": 180000}]}}
+
+    def user_playlist_create(self, **kwargs):
+        if self.on_create is not None:
+            self.on_create()
+        return {"id": "playlist-1", "external_urls": {"spotify": "https://open.spotify.com/playlist/playlist-1"}}
+
+    def playlist_add_items(self, playlist_id, items):
+        self.added += items
+
+
+class FakeClientRegistry:
+    def __init__(self, sp):
+        self.sp = sp
+
+    def spotify(self, access_token):
+        return self.sp
+
+
+@pytest.fixture
+def spotify(monkeypatch):
+    """A FakeSpotify handed out by create_playlist's client registry"""
+    sp = FakeSpotify()
+    monkeypatch.setattr(service_playlist, "get_client_registry", lambda: FakeClientRegistry(sp))
+    return sp
@@ -0,0 +1,84 @@
+from types import SimpleNamespace
+
+from sqlalchemy import insert
+
+from app.auth import auth
+from app.model.analytics_summary import AnalyticsSummaryModel
+from app.model.user import UserModel
+from app.service import service_analytics
+from app.service.service_playlist import save_playlist
+from tests.conftest import TRACKS, playlist_data
+
+
+def test_grouping_bits_match_the_grouping_sets():
+    # PostgreSQL: argumen paling kanan = bit terendah, bit 1 = kolom tidak ikut di-group
+    columns = service_analytics._GROUPED_COLUMNS
+    masks = {}
+    for grouping_set in service_analytics._GROUPING_SETS:
+        mask = sum(1 << (len(columns) - 1 - i) for i, name in enumerate(columns) if name not in grouping_set)
+        masks[mask] = grouping_set[0] if grouping_set else "overall"
+
+    assert masks == service_analytics._GROUPING_DIMENSIONS
+
+
+def test_grouped_rows_are_labelled_with_their_dimension_and_bucket():
+    metrics = {"session_count": 4, "user_count": 2, "mood_delta_sum": 3, "mood_delta_count": 3, "improved_count": 2}
+    rows = [
+        SimpleNamespace(grouping=0b111, depression_level=None, phq9_band=None, week=None, **metrics),
+        SimpleNamespace(grouping=0b011, depression_level="Ringan", phq9_band=None, week=None, **metrics),
+        SimpleNamespace(grouping=0b101, depression_level=None, phq9_band="5-9", week=None, **metrics),
+        SimpleNamespace(grouping=0b110, depression_level=None, phq9_band=None, week="2026-03-02", **metrics),
+    ]
+
+    assert [(row["dimension"], row["bucket"]) for row in map(service_analytics._grouped_row, rows)] == [
+        ("overall", "all"), ("depression_level", "Ringan"), ("phq9_band", "5-9"), ("week", "2026-03-02"),
+    ]
+
+
+def _save(db, spotify_id, pre_mood, post_mood, genres):
+    save_playlist(db, playlist_data(spotify_id, pre_mood, post_mood), TRACKS[:1], genres)
+
+
+def test_genre_pass_counts_each_session_once_per_genre(db, user):
+    db.add(UserModel(spotify_id="other-user", email="other@example.com", name="Other", access_token="other"))
+    db.commit()
+    _save(db, user.spotify_id, 3, 6, ["pop", "jazz"])
+    _save(db, user.spotify_id, 5, 4, ["pop"])
+    _save(db, "other-user", 2, None, ["pop"])
+
+    rows = {row["bucket"]: row for row in service_analytics.compute_genre_analytics(db)}
+
+    assert set(rows) == {"pop", "jazz"} and all(row["dimension"] == "genre" for row in rows.values())
+    assert {key: rows["pop"][key] for key in ("session_count", "user_count", "mood_delta_sum", "mood_delta_count", "improved_count")} == {
+        "session_count": 3, "user_count": 2, "mood_delta_sum": 2, "mood_delta_count": 2, "improved_count": 1,
+    }
+    assert (rows["jazz"]["session_count"], rows["jazz"]["mood_delta_sum"], rows["jazz"]["improved_count"]) == (1, 3, 1)
+
+
+def test_admin_endpoint_reads_every_dimension_from_the_summary(db, client, monkeypatch):
+    monkeypatch.setattr(auth, "ADMIN_API_KEY", "secret")
+    summary = [("overall", "all", 10, 4, 6, 5), ("phq9_band", "unknown", 1, 1, 0, 0), ("phq9_band", "10-14", 3, 2, 3, 3),
+               ("phq9_band", "0-4", 6, 3, 3, 2), ("genre", "pop", 8, 4, -2, 4)]
+    db.execute(insert(AnalyticsSummaryModel.__table__), [
+        {"dimension": dimension, "bucket": bucket, "session_count": sessions, "user_count": users,
+         "mood_delta_sum": delta_sum, "mood_delta_count": delta_count, "improved_count": delta_count // 2}
+        for dimension, bucket, sessions, users, delta_sum, delta_count in summary
+    ])
+    db.commit()
+
+    def get(**params):
+        response = client.get("/api/admin/analytics", params=params, headers={"X-Admin-Key": "secret"})
+        assert response.status_code == 200
+        return response.json()["summary"]
+
+    everything = get()
+    assert list(everything) == list(service_analytics.DIMENSIONS)
+    assert everything["overall"] == [{"bucket": "all", "session_count": 10, "user_count": 4, "sessions_with_both_moods": 5,
+                                      "avg_mood_delta": 1.2, "improvement_rate": 0.4}]
+
+    # Band PHQ-9 diurutkan menurut skor, "unknown" di akhir
+    assert [item["bucket"] for item in get(dimension="phq9_band")["phq9_band"]] == ["0-4", "10-14", "unknown"]
+    assert get(dimension="phq9_band")["phq9_band"][-1]["avg_mood_delta"] is None
+    assert get(dimension="genre") == {"genre": [{"bucket": "pop", "session_count": 8, "user_count": 4, "sessions_with_both_moods": 4,
+                                                 "avg_mood_delta": -0.5, "improvement_rate": 0.5}]}
+    assert client.get("/api/admin/analytics", params={"dimension": "mood"}, headers={"X-Admin-Key": "secret"}).status_code == 400
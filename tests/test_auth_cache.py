@@ -0,0 +1,43 @@
+import asyncio
+import uuid
+
+from sqlalchemy import event
+
+from app.auth import auth, auth_cache
+from app.config import database
+from app.service import service_user
+
+
+def _authenticate(token: str):
+    async def run():
+        async with database.AsyncSessionLocal() as db:
+            return await auth.get_current_user(credentials=None, token=None, header_token=token, db=db)
+    return asyncio.run(run())
+
+
+def test_cached_token_skips_the_user_query(engine, user, monkeypatch):
+    token = f"token-{uuid.uuid4()}"
+    monkeypatch.setattr(service_user, "get_user_profile", lambda access_token: {"id": user.spotify_id})
+
+    statements = []
+    event.listen(database.async_engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    first = _authenticate(token)
+    queried = len(statements)
+    second = _authenticate(token)
+
+    assert queried > 0
+    assert len(statements) == queried
+    assert (second.spotify_id, second.email, second.name, second.access_token) == (first.spotify_id, first.email, first.name, token)
+
+
+def test_user_update_invalidates_cached_fields(engine, db, user, monkeypatch):
+    token = f"token-{uuid.uuid4()}"
+    monkeypatch.setattr(service_user, "get_user_profile", lambda access_token: {"id": user.spotify_id})
+    _authenticate(token)
+    assert auth_cache.get_user(token)["name"] == "Test"
+
+    service_user.create_or_update_user(db, {"access_token": token}, {"id": user.spotify_id, "display_name": "Renamed"})
+
+    assert auth_cache.get_user(token) is None
+    assert _authenticate(token).name == "Renamed"
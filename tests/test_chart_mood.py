@@ -0,0 +1,38 @@
+def _chart(client, **params):
+    response = client.get("/api/playlists/chart/mood", params=params)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_sessions_are_averaged_per_ntile_bucket(client, make_playlists):
+    # pre_mood 0..9; post_mood hanya untuk sesi genap, supaya avg mengabaikan NULL
+    for i in range(10):
+        make_playlists(pre_mood=i, post_mood=i + 1 if i % 2 == 0 else None)
+
+    points = _chart(client, max_points=4)
+
+    # ntile(4) atas 10 sesi: ukuran bucket 3, 3, 2, 2
+    assert points == [
+        {"sequence_number": 1, "pre_mood": "1", "post_mood": "2"},
+        {"sequence_number": 4, "pre_mood": "4", "post_mood": "5"},
+        {"sequence_number": 7, "pre_mood": "6.5", "post_mood": "7"},
+        {"sequence_number": 9, "pre_mood": "8.5", "post_mood": "9"},
+    ]
+
+
+def test_fewer_sessions_than_points_returns_the_raw_series(client, make_playlists):
+    for i in range(3):
+        make_playlists(pre_mood=i, post_mood=i + 2)
+
+    assert _chart(client, max_points=10) == [
+        {"sequence_number": i + 1, "pre_mood": str(i), "post_mood": str(i + 2)} for i in range(3)
+    ]
+
+
+def test_days_limits_the_window(client, make_playlists):
+    make_playlists(2, pre_mood=1, days_ago=10)
+    make_playlists(2, pre_mood=8)
+
+    assert [point["sequence_number"] for point in _chart(client, days=5)] == [3, 4]
+    assert len(_chart(client, days=30)) == 4
+    assert len(_chart(client, days=5, max_points=1)) == 1
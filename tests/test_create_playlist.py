@@ -0,0 +1,27 @@
+import json
+
+from app.service import service_playlist
+from app.service.service_ai import PLAYLIST_LENGTH
+
+
+def test_streamed_items_are_filtered_by_the_validated_playlist(db, user, spotify, monkeypatch):
+    items = [{"title": f"Song {i}", "artist": f"Artist {i}"} for i in range(17)]
+    # Duplikat (beda huruf besar/spasi) dan item tanpa artist ikut ter-stream
+    items.insert(2, {"title": " song 0 ", "artist": "ARTIST 0"})
+    items.insert(4, {"title": "No Artist"})
+    reply = json.dumps({"playlist_title": "Calm", "description": "A playlist", "playlist": items, "genres": ["pop"]})
+
+    def fake_stream(prompt):
+        for start in range(0, len(reply), 40):
+            yield reply[start:start + 40]
+
+    monkeypatch.setattr(service_playlist, "AI_STREAMING", True)
+    monkeypatch.setattr(service_playlist, "call_hf_api_stream", fake_stream)
+
+    created = service_playlist.create_playlist(db, user.spotify_id, 4, 7)
+
+    expected = [f"spotify:track:Song {i}" for i in range(PLAYLIST_LENGTH)]
+    assert spotify.added == expected
+    assert created.total_tracks == len(expected)
+    # Item streaming tetap dicari lebih awal, duplikat tidak dicari dua kali
+    assert sorted(spotify.searched) == sorted(f"Song {i}" for i in range(17))
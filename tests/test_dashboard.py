@@ -0,0 +1,25 @@
+from sqlalchemy import text
+
+
+def test_dashboard_aggregates_integer_moods(client, make_playlists):
+    make_playlists(1, pre_mood=3, post_mood=6)
+    make_playlists(1, pre_mood=5, post_mood=4)
+    make_playlists(1, pre_mood=2)
+
+    # Sesi tanpa post_mood ikut dihitung, tapi tidak ikut rata-rata perubahan mood
+    assert client.get("/api/playlists/dashboard/stats").json() == {
+        "total_sessions": 3,
+        "avg_mood_improvement": 1.0,
+        "most_frequent_genre": "akustik",
+    }
+
+
+def test_moods_are_stored_as_integers_and_returned_as_strings(db, client, make_playlists):
+    playlist = make_playlists(1, pre_mood=3, post_mood=6)[0]
+
+    stored = db.execute(text("SELECT typeof(pre_mood), typeof(post_mood) FROM playlist WHERE id = :id"), {"id": playlist.id}).one()
+    assert tuple(stored) == ("integer", "integer")
+
+    body = client.get(f"/api/playlists/{playlist.id}").json()
+    assert (body["pre_mood"], body["post_mood"]) == ("3", "6")
+    assert {(item["pre_mood"], item["post_mood"]) for item in client.get("/api/playlists/").json()} == {("3", "6")}
@@ -0,0 +1,59 @@
+import pytest
+
+
+def _endpoints(playlist_id):
+    return [
+        "/api/playlists/",
+        f"/api/playlists/{playlist_id}",
+        "/api/playlists/dashboard/stats",
+        "/api/playlists/chart/mood",
+    ]
+
+
+@pytest.mark.parametrize("index", range(4))
+def test_matching_etag_returns_304_and_mismatch_returns_200(client, make_playlists, index):
+    playlist = make_playlists(2)[0]
+    path = _endpoints(playlist.id)[index]
+
+    first = client.get(path)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+
+    cached = client.get(path, headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["ETag"] == etag
+
+    other = client.get(path, headers={"If-None-Match": '"stale"'})
+    assert other.status_code == 200
+    assert other.headers["ETag"] == etag
+    assert other.json() == first.json()
+
+
+def test_feedback_changes_the_version(client, make_playlists):
+    # Backdate supaya updated_at baru berbeda walau SQLite hanya menyimpan detik
+    playlist = make_playlists(2, days_ago=1)[0]
+    paths = _endpoints(playlist.id)
+    etags = {path: client.get(path).headers["ETag"] for path in paths}
+
+    response = client.get(f"/api/playlists/{playlist.id}/feedback", params={"post_mood": 8, "feedback": "lebih tenang"})
+    assert response.status_code == 200
+
+    for path in paths:
+        response = client.get(path, headers={"If-None-Match": etags[path]})
+        assert response.status_code == 200, path
+        assert response.headers["ETag"] != etags[path]
+
+
+def test_delete_changes_the_version(client, make_playlists):
+    deleted, kept = make_playlists(2, days_ago=1)
+    paths = [path for path in _endpoints(kept.id) if kept.id not in path]
+    etags = {path: client.get(path).headers["ETag"] for path in paths}
+
+    assert client.delete(f"/api/playlists/{deleted.id}").status_code == 200
+
+    for path in paths:
+        response = client.get(path, headers={"If-None-Match": etags[path]})
+        assert response.status_code == 200, path
+        assert response.headers["ETag"] != etags[path]
+    assert client.get(f"/api/playlists/{deleted.id}").status_code == 404
@@ -0,0 +1,21 @@
+from fastapi.testclient import TestClient
+
+from app.auth import auth
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_stats_require_the_admin_key(monkeypatch):
+    monkeypatch.setattr(auth, "ADMIN_API_KEY", "secret")
+
+    assert client.get("/api/health/stats").status_code == 403
+    assert client.get("/api/health/stats", headers={"X-Admin-Key": "wrong"}).status_code == 403
+    response = client.get("/api/health/stats", headers={"X-Admin-Key": "secret"})
+    assert response.status_code == 200
+    assert "track_cache" in response.json()
+
+
+def test_stats_hidden_without_admin_key_configured(monkeypatch):
+    monkeypatch.setattr(auth, "ADMIN_API_KEY", None)
+    assert client.get("/api/health/stats").status_code == 404
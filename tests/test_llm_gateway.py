@@ -0,0 +1,171 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.service import service_llm_gateway
+from app.service.service_llm_gateway import Provider
+
+
+class StubStream:
+    """Stand-in for openai's Stream: yields `chunks`, waiting `gap` seconds after the first"""
+
+    def __init__(self, chunks, gap: float = 0, break_after: int = None):
+        self.chunks = chunks
+        self.gap = gap
+        self.break_after = break_after
+        self.closed = False
+
+    def __iter__(self):
+        for index, chunk in enumerate(self.chunks):
+            if index == self.break_after:
+                raise RuntimeError("connection reset")
+            if index:
+                time.sleep(self.gap)
+            yield chunk
+
+    def close(self):
+        self.closed = True
+
+
+class StubProvider(Provider):
+    """Provider whose calls fail, or block until `release` is set, instead of hitting an API"""
+
+    def __init__(self, name: str, fail: bool = False, block: bool = False, **stream_options):
+        super().__init__(name, "http://stub", name, None, timeout=1, max_retries=0)
+        self.fail = fail
+        self.release = threading.Event()
+        if not block:
+            self.release.set()
+        self.calls = 0
+        self.stream_options = stream_options
+        self.streams = []
+
+    @property
+    def client(self):
+        return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=self.create)))
+
+    def create(self, model, messages, stream):
+        self.calls += 1
+        self.release.wait(5)
+        if self.fail:
+            raise RuntimeError(f"{self.name} down")
+        self.streams.append(StubStream([f"{self.name} {i}" for i in range(3)], **self.stream_options))
+        return self.streams[-1]
+
+    def complete(self, messages):
+        self.calls += 1
+        started = time.monotonic()
+        self.release.wait(5)
+        ok = not self.fail
+        self.record(time.monotonic() - started, ok=ok)
+        if not ok:
+            raise RuntimeError(f"{self.name} down")
+        return f"answer from {self.name}"
+
+
+@pytest.fixture
+def providers(monkeypatch):
+    def install(*stubs):
+        monkeypatch.setattr(service_llm_gateway, "_providers", list(stubs))
+        return stubs
+    monkeypatch.setattr(service_llm_gateway, "LLM_HEDGE_DEFAULT_DELAY", 0.05)
+    monkeypatch.setattr(service_llm_gateway, "_hedge_slots", threading.BoundedSemaphore(2))
+    return install
+
+
+def _wait_for(condition, timeout: float = 2) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+def test_breaker_skips_a_failing_provider_until_the_cooldown_is_over(providers, monkeypatch):
+    primary, backup = providers(StubProvider("primary", fail=True), StubProvider("backup"))
+
+    for _ in range(service_llm_gateway.LLM_BREAKER_FAILURES):
+        assert service_llm_gateway.complete([]) == ("answer from backup", "backup")
+    assert primary.get_stats()["breaker"] == "open"
+
+    service_llm_gateway.complete([])
+    assert primary.calls == service_llm_gateway.LLM_BREAKER_FAILURES
+
+    # Cooldown selesai: satu request percobaan ke provider pertama (half-open)
+    primary._open_until = time.monotonic() - 1
+    primary.fail = False
+    assert service_llm_gateway.complete([]) == ("answer from primary", "primary")
+    assert primary.get_stats()["breaker"] == "closed"
+
+
+def test_hedge_wins_and_holds_its_slot_until_the_slow_request_finishes(providers):
+    slow, fast = providers(StubProvider("slow", block=True), StubProvider("fast"))
+
+    assert service_llm_gateway.complete([]) == ("answer from fast", "fast")
+    assert fast.get_stats()["hedges"] == 1 and fast.get_stats()["wins"] == 1
+    assert service_llm_gateway._hedge_slots._value == 1
+
+    slow.release.set()
+    assert _wait_for(lambda: service_llm_gateway._hedge_slots._value == 2)
+
+
+def test_no_hedge_when_every_slot_is_taken(providers, monkeypatch):
+    slow, fast = providers(StubProvider("slow", block=True), StubProvider("fast"))
+    monkeypatch.setattr(service_llm_gateway, "_hedge_slots", threading.BoundedSemaphore(0))
+    threading.Timer(0.2, slow.release.set).start()
+
+    assert service_llm_gateway.complete([]) == ("answer from slow", "slow")
+    assert fast.calls == 0
+    assert slow.get_stats()["hedges_skipped"] == 1
+
+
+
+def test_slow_first_token_is_hedged_and_the_losing_stream_closed(providers):
+    slow, fast = providers(StubProvider("slow", block=True), StubProvider("fast"))
+
+    assert list(service_llm_gateway.stream([])) == [(f"fast {i}", "fast") for i in range(3)]
+    assert fast.get_stats()["hedges"] == 1 and fast.get_stats()["wins"] == 1
+    assert fast.streams[0].closed
+
+    # Stream yang kalah ditutup begitu terbuka, lalu slot hedge dikembalikan
+    slow.release.set()
+    assert _wait_for(lambda: slow.streams and slow.streams[0].closed)
+    assert _wait_for(lambda: service_llm_gateway._hedge_slots._value == 2)
+
+
+def test_streams_record_time_to_first_token_apart_from_completions(providers, monkeypatch):
+    monkeypatch.setattr(service_llm_gateway, "LLM_HEDGE_MIN_SAMPLES", 3)
+    monkeypatch.setattr(service_llm_gateway, "LLM_HEDGE_MIN_DELAY", 0)
+    (provider,) = providers(StubProvider("only", gap=0.05))
+
+    for _ in range(3):
+        assert len(list(service_llm_gateway.stream([]))) == 3
+
+    # Generasi penuh ~0.1 detik, chunk pertama langsung: hanya yang terakhir dipakai untuk hedge stream
+    assert provider.first_token_delay() < 0.05
+    assert provider.hedge_delay() == service_llm_gateway.LLM_HEDGE_DEFAULT_DELAY
+    stats = provider.get_stats()
+    assert stats["p50_seconds"] is None and stats["first_token_p50_seconds"] < 0.05
+    assert sum(stats["histogram"].values()) == 0 and stats["requests"] == 3
+
+
+def test_stream_error_after_the_first_chunk_is_raised_without_failover(providers):
+    broken, backup = providers(StubProvider("broken", break_after=1), StubProvider("backup"))
+
+    chunks = []
+    with pytest.raises(RuntimeError):
+        for chunk in service_llm_gateway.stream([]):
+            chunks.append(chunk)
+
+    assert chunks == [("broken 0", "broken")]
+    assert backup.calls == 0
+    assert broken.get_stats()["errors"] == 1 and broken.streams[0].closed
+
+@pytest.mark.parametrize("configured", ["[]", "{}", '[{"name": "no-model"}]'])
+def test_invalid_provider_list_is_rejected(configured, monkeypatch):
+    monkeypatch.setattr(service_llm_gateway, "LLM_PROVIDERS", configured)
+    with pytest.raises(ValueError):
+        service_llm_gateway._load_providers()
@@ -0,0 +1,47 @@
+import uuid
+
+import pytest
+from fastapi import HTTPException
+
+from app.config import database
+from app.model.playlist_draft import PlaylistDraftModel
+from app.service import service_playlist, service_playlist_draft
+from app.util.util_phq9 import get_depression_level
+
+PRE_MOOD, PHQ9 = 4, 7
+TRACKS = [{"title": f"Song {i}", "artist": f"Artist {i}", "uri": f"spotify:track:{i}", "duration": 180000} for i in range(12)]
+
+
+@pytest.fixture
+def draft(db):
+    db.add(PlaylistDraftModel(
+        id=str(uuid.uuid4()),
+        mood_bucket=service_playlist_draft.mood_bucket(PRE_MOOD),
+        depression_level=get_depression_level(PHQ9),
+        location=service_playlist.PLAYLIST_LOCATION,
+        title="Draft",
+        description="A draft",
+        tracks=TRACKS,
+        genres=["pop"],
+    ))
+    db.commit()
+
+
+def test_claim_is_committed_before_spotify_is_called(db, user, draft, spotify, monkeypatch):
+    pool_at_create = []
+
+    def fail_create():
+        with database.SessionLocal() as other:
+            pool_at_create.append(other.query(PlaylistDraftModel).count())
+        raise RuntimeError("spotify down")
+
+    spotify.on_create = fail_create
+    monkeypatch.setattr(service_playlist, "DRAFT_POOL_ENABLED", True)
+
+    with pytest.raises(HTTPException):
+        service_playlist.create_playlist(db, user.spotify_id, PRE_MOOD, PHQ9)
+
+    # Sesi lain sudah melihat draft terhapus saat Spotify dipanggil, jadi lock sudah dilepas
+    assert pool_at_create == [0]
+    db.rollback()
+    assert db.query(PlaylistDraftModel).count() == 0
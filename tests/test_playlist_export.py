@@ -0,0 +1,71 @@
+import csv
+import gzip
+import io
+import json
+
+import pytest
+
+from app.service import service_playlist_export
+from app.service.service_playlist import save_playlist
+from tests.conftest import playlist_data
+
+
+@pytest.fixture
+def history(db, user, monkeypatch):
+    # Batch kecil supaya track/genre di-join lintas beberapa batch
+    monkeypatch.setattr(service_playlist_export, "EXPORT_BATCH_SIZE", 2)
+    created = []
+    for n in range(5):
+        tracks = [{"title": f"Lagu {n}.{i}", "artist": f"Penyanyi {n}", "duration": 1000 * n + i} for i in range(n + 1)]
+        genres = [f"genre-{n}", "pop"]
+        created.append((save_playlist(db, playlist_data(user.spotify_id, pre_mood=n, name=f"Sesi, \"{n}\""), tracks, genres), tracks, genres))
+    return created
+
+
+def _export(client, export_format, gzip=False) -> bytes:
+    with client.stream("GET", "/api/playlists/export", params={"format": export_format, "gzip": gzip}) as response:
+        assert response.status_code == 200
+        assert response.headers.get("content-encoding") == ("gzip" if gzip else None)
+        return b"".join(response.iter_raw())
+
+
+def test_ndjson_holds_every_playlist_with_its_own_tracks_and_genres(client, history):
+    lines = _export(client, "ndjson").decode("utf-8").splitlines()
+
+    assert len(lines) == len(history)
+    for line, (playlist, tracks, genres) in zip(lines, history):
+        item = json.loads(line)
+        assert item["id"] == playlist.id
+        assert item["sequence_number"] == playlist.sequence_number
+        assert item["name"] == playlist.name and item["pre_mood"] == int(playlist.pre_mood)
+        assert item["created_at"] == playlist.created_at.isoformat()
+        assert sorted(item["genres"]) == sorted(genres)
+        assert sorted(item["tracks"], key=lambda track: track["name"]) == [
+            {"name": track["title"], "artist": track["artist"], "duration": track["duration"]} for track in tracks
+        ]
+
+
+def test_csv_has_a_header_and_one_row_per_playlist(client, history):
+    rows = list(csv.reader(io.StringIO(_export(client, "csv").decode("utf-8"))))
+
+    assert rows[0] == service_playlist_export._CSV_HEADER
+    assert len(rows) == len(history) + 1
+    for row, (playlist, tracks, genres) in zip(rows[1:], history):
+        record = dict(zip(rows[0], row))
+        assert record["id"] == playlist.id and record["name"] == playlist.name
+        assert sorted(record["tracks"].split("; ")) == sorted(f"{track['title']} - {track['artist']}" for track in tracks)
+        assert sorted(record["genres"].split("; ")) == sorted(genres)
+
+
+@pytest.mark.parametrize("export_format", ["ndjson", "csv"])
+def test_gzip_stream_decompresses_to_the_plain_export(client, history, export_format):
+    plain = _export(client, export_format)
+    compressed = _export(client, export_format, gzip=True)
+
+    assert compressed[:2] == b"\x1f\x8b"
+    assert gzip.decompress(compressed) == plain
+
+
+def test_user_without_playlists_exports_only_the_csv_header(client):
+    assert _export(client, "ndjson") == b""
+    assert _export(client, "csv").decode("utf-8").splitlines() == [",".join(service_playlist_export._CSV_HEADER)]
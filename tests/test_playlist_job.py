@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta
+
+from app.config.config import JOB_TIMEOUT
+from app.model.playlist_job import PlaylistJobModel
+from app.service import service_playlist_job
+
+
+def _queue_job(db, user) -> str:
+    job = PlaylistJobModel(id="job-1", spotify_id=user.spotify_id, pre_mood=4, phq9_score=7, status=service_playlist_job.JOB_QUEUED, attempts=0)
+    db.add(job)
+    db.commit()
+    return job.id
+
+
+def test_running_job_with_recent_heartbeat_is_not_reclaimed(db, user):
+    job_id = _queue_job(db, user)
+    job = service_playlist_job.claim_next_job(db)
+    assert job.id == job_id and job.attempts == 1
+
+    # Berjalan lebih lama dari JOB_TIMEOUT, tapi heartbeat masih baru
+    job.started_at = datetime.now() - timedelta(seconds=JOB_TIMEOUT * 2)
+    db.commit()
+    assert service_playlist_job.heartbeat(db, job_id, 1)
+
+    assert service_playlist_job.claim_next_job(db) is None
+
+
+def test_reclaimed_job_rejects_the_stale_attempt(db, user):
+    job_id = _queue_job(db, user)
+    first = service_playlist_job.claim_next_job(db)
+    first.heartbeat_at = datetime.now() - timedelta(seconds=JOB_TIMEOUT + 1)
+    db.commit()
+
+    second = service_playlist_job.claim_next_job(db)
+    assert second.id == job_id and second.attempts == 2
+
+    assert not service_playlist_job.heartbeat(db, job_id, 1)
+    assert not service_playlist_job.complete_job(db, job_id, 1, None)
+    assert service_playlist_job.complete_job(db, job_id, 2, None)
+
+    db.expire_all()
+    assert db.get(PlaylistJobModel, job_id).status == service_playlist_job.JOB_DONE
@@ -0,0 +1,48 @@
+def _page(client, **params):
+    response = client.get("/api/playlists/", params=params)
+    assert response.status_code == 200
+    return response
+
+
+def test_cursor_walks_every_page_and_the_last_page_has_no_cursor(client, make_playlists):
+    created = make_playlists(5)
+
+    seen, cursor = [], None
+    for expected in ([5, 4], [3, 2], [1]):
+        response = _page(client, limit=2, **({"cursor": cursor} if cursor is not None else {}))
+        assert [item["sequence_number"] for item in response.json()] == expected
+        seen += [item["id"] for item in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if expected != [1]:
+            assert cursor == str(expected[-1])
+
+    assert cursor is None
+    assert seen == [playlist.id for playlist in reversed(created)]
+
+
+def test_full_page_without_more_rows_has_no_cursor(client, make_playlists):
+    make_playlists(2)
+    assert "X-Next-Cursor" not in _page(client, limit=2).headers
+
+
+def test_include_adds_relations_to_the_same_items(client, make_playlists):
+    make_playlists(3)
+
+    summary = _page(client, limit=10).json()
+    detailed = _page(client, limit=10, include="tracks, genres").json()
+
+    assert all("tracks" not in item and "genres" not in item for item in summary)
+    assert [{key: value for key, value in item.items() if key not in ("tracks", "genres")} for item in detailed] == summary
+    for item in detailed:
+        assert len(item["tracks"]) == 15 and {"name", "artist", "duration"} <= set(item["tracks"][0])
+        assert sorted(genre["name"] for genre in item["genres"]) == ["akustik", "indie pop", "lo-fi"]
+
+    only_genres = _page(client, limit=10, include="genres").json()
+    assert all("tracks" not in item and len(item["genres"]) == 3 for item in only_genres)
+
+
+def test_unknown_include_is_rejected(client, make_playlists):
+    make_playlists(1)
+    response = client.get("/api/playlists/", params={"include": "tracks,owner"})
+    assert response.status_code == 400
+    assert "owner" in response.json()["detail"]
@@ -0,0 +1,72 @@
+"""
+Statement counts must not grow with the amount of data: a page of N playlists and a
+playlist with N tracks are read and written with the same number of queries for any N.
+"""
+import asyncio
+import uuid
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from app.config import database
+from app.model.user import UserModel
+from app.schemas.schemas_playlist import PlaylistCreate
+from app.service import service_playlist
+
+
+def _tracks(count):
+    return [{"title": f"Track {i}", "artist": f"Artist {i}", "duration": 180000} for i in range(count)]
+
+
+def _playlist(spotify_id):
+    return PlaylistCreate(id=str(uuid.uuid4()), spotify_id=spotify_id, name="Test", phq9_score=7,
+                          depression_level="Ringan", pre_mood=4, mode="healing")
+
+
+def _new_user(db):
+    spotify_id = f"test-{uuid.uuid4()}"
+    db.add(UserModel(spotify_id=spotify_id, email=f"{spotify_id}@example.com", name="Test"))
+    db.commit()
+    return spotify_id
+
+
+@contextmanager
+def count_statements(engine):
+    statements = []
+
+    def listener(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+
+def test_save_playlist_statements_do_not_depend_on_track_count(engine, db):
+    counts = {}
+    for track_count in (1, 15):
+        spotify_id = _new_user(db)
+        with count_statements(engine) as statements:
+            service_playlist.save_playlist(db, _playlist(spotify_id), _tracks(track_count), ["pop", "jazz"])
+        counts[track_count] = len(statements)
+    assert counts[1] == counts[15]
+
+
+def test_playlist_reads_do_not_depend_on_playlist_count(engine, db):
+    async def read(spotify_id, playlist_id):
+        async with database.AsyncSessionLocal() as session:
+            await service_playlist.get_all_playlists(session, spotify_id, limit=20, include=("tracks", "genres"))
+            await service_playlist.get_playlist_by_id(session, playlist_id)
+            await service_playlist.get_playlist_detail(session, playlist_id)
+
+    counts = {}
+    for playlist_count in (1, 15):
+        spotify_id = _new_user(db)
+        for _ in range(playlist_count):
+            created = service_playlist.save_playlist(db, _playlist(spotify_id), _tracks(playlist_count), ["pop"])
+        with count_statements(database.async_engine.sync_engine) as statements:
+            asyncio.run(read(spotify_id, created.id))
+        counts[playlist_count] = len(statements)
+    assert counts[1] == counts[15]
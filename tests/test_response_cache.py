@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+from app.service import service_response_cache
+
+
+class FakeRedis:
+    """Just enough of redis.asyncio.Redis for the response cache, with a kill switch"""
+
+    def __init__(self):
+        self.data = {}
+        self.down = False
+
+    def _check(self):
+        if self.down:
+            raise ConnectionError("redis down")
+
+    async def get(self, key):
+        self._check()
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self._check()
+        self.data[key] = value
+
+    async def incr(self, key):
+        self._check()
+        self.data[key] = int(self.data.get(key) or 0) + 1
+        return self.data[key]
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = FakeRedis()
+    monkeypatch.setattr(service_response_cache, "REDIS_URL", "redis://fake")
+    monkeypatch.setattr(service_response_cache, "get_async_redis", lambda: client)
+    monkeypatch.setattr(service_response_cache, "mark_redis_down", lambda error: None)
+    return client
+
+
+async def _cached_body(spotify_id):
+    lookup = await service_response_cache.lookup(spotify_id, "dashboard")
+    return lookup.entry.body if lookup.entry is not None else None
+
+
+def test_invalidation_during_redis_outage_is_replayed(redis):
+    async def scenario():
+        lookup = await service_response_cache.lookup("user-a", "dashboard")
+        await lookup.store('"v1"', b"old")
+        assert await _cached_body("user-a") == b"old"
+
+        redis.down = True
+        await service_response_cache.invalidate_async("user-a")
+        redis.down = False
+
+        # Versi di Redis di-INCR dulu sebelum apa pun dibaca, entry lama tidak tersaji lagi
+        assert await _cached_body("user-a") is None
+        assert service_response_cache.get_stats()["pending_invalidations"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_local_fallback_can_be_disabled(monkeypatch):
+    monkeypatch.setattr(service_response_cache, "get_async_redis", lambda: None)
+    monkeypatch.setattr(service_response_cache, "RESPONSE_CACHE_LOCAL_TTL", 0)
+
+    async def scenario():
+        lookup = await service_response_cache.lookup("user-b", "dashboard")
+        await lookup.store('"v1"', b"body")
+        return await _cached_body("user-b")
+
+    assert asyncio.run(scenario()) is None
@@ -0,0 +1,49 @@
+from app.model.playlist import PlaylistModel
+from app.schemas.schemas_playlist import PlaylistResponse
+from app.service.service_playlist import save_playlist
+from app.util.util_convert_time import calculate_time_ago
+from tests.conftest import GENRES, TRACKS, playlist_data
+
+
+def _sorted(response: PlaylistResponse) -> dict:
+    data = response.model_dump()
+    data["tracks"] = sorted(data["tracks"], key=lambda track: track["name"])
+    data["genres"] = sorted(data["genres"], key=lambda genre: genre["name"])
+    return data
+
+
+def test_response_matches_the_stored_rows(db, user):
+    created = save_playlist(db, playlist_data(user.spotify_id), TRACKS, GENRES)
+
+    # Yang dulu dibangun lewat refresh dan lazy load relasi
+    db.expire_all()
+    stored = db.get(PlaylistModel, created.id)
+    stored.time_ago = calculate_time_ago(stored.created_at)
+    assert _sorted(created) == _sorted(PlaylistResponse.model_validate(stored))
+
+
+def test_sequence_numbers_are_consecutive_and_every_row_is_written(db, user):
+    created = [save_playlist(db, playlist_data(user.spotify_id, pre_mood), TRACKS, GENRES) for pre_mood in range(5)]
+
+    assert [playlist.sequence_number for playlist in created] == [1, 2, 3, 4, 5]
+    rows = db.query(PlaylistModel).filter(PlaylistModel.spotify_id == user.spotify_id).order_by(PlaylistModel.sequence_number).all()
+    assert [(row.id, row.sequence_number) for row in rows] == [(playlist.id, playlist.sequence_number) for playlist in created]
+    db.refresh(user)
+    assert user.playlist_seq == 5
+
+    for row in rows:
+        assert sorted((track.name, track.artist, track.duration) for track in row.tracks) == sorted(
+            (track["title"], track["artist"], track["duration"]) for track in TRACKS
+        )
+        assert sorted(genre.name for genre in row.genres) == sorted(GENRES)
+
+
+def test_sequence_continues_after_the_latest_playlist_is_deleted(db, user):
+    first = save_playlist(db, playlist_data(user.spotify_id), TRACKS, GENRES)
+    second = save_playlist(db, playlist_data(user.spotify_id), TRACKS, GENRES)
+    db.query(PlaylistModel).filter(PlaylistModel.id == second.id).delete()
+    db.commit()
+
+    # Counter di user, bukan max(sequence_number): nomor yang sudah dipakai tidak dibagikan lagi
+    third = save_playlist(db, playlist_data(user.spotify_id), TRACKS, GENRES)
+    assert (first.sequence_number, third.sequence_number) == (1, 3)
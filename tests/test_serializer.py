@@ -0,0 +1,95 @@
+"""util_serializer must produce the exact bytes FastAPI's response_model path produced"""
+from datetime import datetime, timedelta
+from typing import List
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.schemas.schemas_playlist import ChartMoodItem, DashboardResponse, PlaylistListItem, PlaylistResponse
+from app.util import util_serializer
+from app.util.util_convert_time import calculate_time_ago
+
+NOW = datetime(2026, 3, 1, 9, 30, 15)
+
+
+def _row(i: int) -> dict:
+    return {
+        "id": f"playlist-{i}",
+        "spotify_id": "pengguna-é",
+        "name": f"Lagu untuk hati yang lelah — café ☕ {i}",
+        "sequence_number": 3 - i,
+        "phq9_score": 7 + i,
+        "depression_level": "Ringan",
+        "pre_mood": i,
+        "post_mood": i + 2 if i % 2 else None,
+        "duration": 2700000,
+        "total_tracks": 2,
+        "link_playlist": None if i == 1 else "https://open.spotify.com/playlist/x",
+        "feedback": "Lebih tenang 🙂" if i == 0 else None,
+        "mode": "healing",
+        "created_at": NOW - timedelta(days=i * 3, minutes=i * 7),
+    }
+
+
+TRACKS = [{"name": "Sampai Jadi Debu", "artist": "Banda Neira", "duration": 218000}, {"name": "Ñandú", "artist": "Björk", "duration": None}]
+GENRES = [{"name": "indie folk"}, {"name": "música ambiente"}]
+RELATIONS = {"tracks": TRACKS, "genres": GENRES}
+
+
+def _fastapi(response_model, content, **options) -> bytes:
+    app = FastAPI()
+
+    @app.get("/", response_model=response_model, **options)
+    def endpoint():
+        return content
+
+    return TestClient(app).get("/").content
+
+
+@pytest.fixture(params=["orjson", "json"])
+def encoder(request, monkeypatch):
+    if request.param == "json":
+        monkeypatch.setattr(util_serializer, "orjson", None)
+    return request.param
+
+
+@pytest.mark.parametrize("include", [(), ("tracks",), ("tracks", "genres")])
+def test_playlist_list_items(encoder, include):
+    rows = [_row(i) for i in range(3)]
+    items = []
+    for row in rows:
+        item = util_serializer.playlist_summary(row, NOW)
+        if "tracks" in include:
+            item["tracks"] = [util_serializer.track(track) for track in TRACKS]
+        if "genres" in include:
+            item["genres"] = [util_serializer.genre(genre) for genre in GENRES]
+        items.append(item)
+
+    expected = [
+        {**row, "time_ago": calculate_time_ago(row["created_at"], NOW), **{name: RELATIONS[name] for name in include}}
+        for row in rows
+    ]
+    assert util_serializer.dumps(items) == _fastapi(List[PlaylistListItem], expected, response_model_exclude_unset=True)
+
+
+def test_playlist_detail(encoder):
+    row = _row(1)
+    detail = util_serializer.playlist_detail(row, TRACKS, GENRES, NOW)
+    expected = {**row, "time_ago": calculate_time_ago(row["created_at"], NOW), "tracks": TRACKS, "genres": GENRES}
+    assert util_serializer.dumps(detail) == _fastapi(PlaylistResponse, expected)
+
+
+@pytest.mark.parametrize("dashboard", [
+    DashboardResponse(total_sessions=12, avg_mood_improvement=1.75, most_frequent_genre="dangdut koplo ✨"),
+    DashboardResponse(total_sessions=0),
+])
+def test_dashboard(encoder, dashboard):
+    assert util_serializer.dumps(dashboard.model_dump()) == _fastapi(DashboardResponse, dashboard)
+
+
+def test_chart_points(encoder):
+    values = [(1, 4, 6), (4, 6.5, None), (7, None, 8.33)]
+    points = [util_serializer.chart_point(*value) for value in values]
+    expected = [{"sequence_number": seq, "pre_mood": pre, "post_mood": post} for seq, pre, post in values]
+    assert util_serializer.dumps(points) == _fastapi(List[ChartMoodItem], expected)
@@ -0,0 +1,127 @@
+import json
+import math
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from app.service import service_ai, service_llm_gateway
+from app.util.util_llm_json import parse_llm_json, repair_json, strip_fences
+
+
+def _chunk(text):
+    return SimpleNamespace(usage=None, choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+def test_streamed_call_records_the_provider(monkeypatch):
+    def fake_stream(messages):
+        for text in ('{"playlist_title": ', '"Calm"}'):
+            yield _chunk(text), "backup"
+
+    monkeypatch.setattr(service_llm_gateway, "stream", fake_stream)
+
+    assert "".join(service_ai.call_hf_api_stream("prompt")) == '{"playlist_title": "Calm"}'
+    assert service_ai.get_stats()["last_call"]["provider"] == "backup"
+
+
+def _tracks(start, stop):
+    return [{"title": f"Song {i}", "artist": f"Artist {i}"} for i in range(start, stop)]
+
+
+def test_parse_drops_invalid_and_duplicate_tracks_and_caps_the_length():
+    items = _tracks(0, 20) + [{"title": "SONG 1 ", "artist": "artist 1"}, {"title": "", "artist": "Someone"}, "Song - Artist"]
+    reply = "Here you go:\n```json\n" + json.dumps({"playlist_title": " Calm ", "playlist": items, "genres": ["pop", 3, " "]}) + "\n```"
+
+    playlist, repaired = service_ai.parse_playlist_response(reply)
+
+    assert not repaired
+    assert playlist.playlist_title == "Calm"
+    assert [track.title for track in playlist.playlist] == [f"Song {i}" for i in range(service_ai.PLAYLIST_LENGTH)]
+    assert playlist.genres == ["pop"]
+
+
+def test_truncated_reply_is_repaired():
+    text = json.dumps({"playlist_title": "Calm", "playlist": _tracks(0, 3)})
+    cut = text[:text.index("Song 2") + 3]
+
+    assert json.loads(repair_json(cut)) == {"playlist_title": "Calm", "playlist": _tracks(0, 2) + [{}]}
+    playlist, repaired = service_ai.parse_playlist_response(cut)
+    assert repaired and len(playlist.playlist) == 2
+
+
+@pytest.mark.parametrize("reply, expected", [
+    ('{"a": 1} ... {ok}', '{"a": 1}'),
+    ('Here you go: {"a": "}"} Let me know {if} you need more', '{"a": "}"}'),
+    ('```json\n[1, {"b": "]"}]\n```\nNote: [draft]', '[1, {"b": "]"}]'),
+    ('{"a": [1, 2', '{"a": [1, 2'),
+])
+def test_prose_after_the_first_value_is_cut(reply, expected):
+    assert strip_fences(reply) == expected
+    assert parse_llm_json(reply)[0] == json.loads(repair_json(expected))
+
+
+@pytest.mark.parametrize("cut, expected", [
+    ('{"a": 1, "b": tr', {"a": 1}),
+    ('{"a": 1, "b": fals', {"a": 1}),
+    ('{"a": [1, 2, nu', {"a": [1, 2]}),
+    ('{"a": 1, "b": 2.', {"a": 1}),
+    ('{"a": 1, "b": -', {"a": 1}),
+    ('{"a": 1, "b": true', {"a": 1, "b": True}),
+    ('{"a": 1, "b": 25', {"a": 1, "b": 25}),
+])
+def test_partial_literal_at_the_cut_is_dropped(cut, expected):
+    assert json.loads(repair_json(cut)) == expected
+
+
+def test_followup_only_adds_new_tracks_up_to_the_playlist_length(monkeypatch):
+    prompts = []
+
+    def fake_call(prompt):
+        prompts.append(json.loads(prompt))
+        # Satu duplikat, satu artist yang sudah dipakai, lalu lebih banyak dari yang diminta
+        return json.dumps({"playlist": _tracks(9, 10) + [{"title": "Other", "artist": "Artist 0"}] + _tracks(10, 30)})
+
+    monkeypatch.setattr(service_ai, "call_hf_api", fake_call)
+    reply = json.dumps({"playlist_title": "Calm", "description": "A playlist", "playlist": _tracks(0, 10), "genres": ["pop"]})
+
+    data = service_ai.complete_playlist_response(reply, pre_mood=4, phq9=7, location="Indonesia")
+
+    assert len(prompts) == 1
+    assert prompts[0]["instructions"]["tracks_needed"] == service_ai.PLAYLIST_LENGTH - 10
+    assert data["playlist"] == _tracks(0, service_ai.PLAYLIST_LENGTH)
+    assert data["playlist_title"] == "Calm"
+
+
+with open(Path(__file__).parent / "data" / "prompt_playlist_healing_before.json", encoding="utf-8") as f:
+    # Output template lama (dict dibangun per request, json.dumps indent=2) untuk beberapa input
+    _PROMPTS_BEFORE = json.load(f)
+
+
+@pytest.mark.parametrize("case", _PROMPTS_BEFORE, ids=lambda case: case["args"][2] or "no-location")
+def test_spliced_prompt_is_the_old_prompt_in_compact_form(case):
+    prompt = service_ai.build_prompt_playlist_healing(*case["args"])
+
+    assert prompt.startswith(service_ai._PROMPT_PREFIX + ',"user":')
+    assert json.loads(prompt) == json.loads(case["prompt"])
+    assert prompt == json.dumps(json.loads(case["prompt"]), ensure_ascii=False, separators=(",", ":"))
+
+
+def _reset_encoding(monkeypatch, tiktoken):
+    monkeypatch.setattr(service_ai, "tiktoken", tiktoken)
+    monkeypatch.setattr(service_ai, "_encoding", None)
+    monkeypatch.setattr(service_ai, "_encoding_loaded", False)
+
+
+def _no_encoding_file(name):
+    raise OSError(f"cannot download {name}")
+
+
+@pytest.mark.parametrize("tiktoken", [None, SimpleNamespace(get_encoding=_no_encoding_file)], ids=["not-installed", "no-encoding-file"])
+def test_estimate_tokens_falls_back_to_four_characters_per_token(tiktoken, monkeypatch):
+    _reset_encoding(monkeypatch, tiktoken)
+
+    assert service_ai.estimate_tokens("") == 0
+    assert service_ai.estimate_tokens("abcd") == 1
+    assert service_ai.estimate_tokens("abcde") == 2
+    assert service_ai.estimate_tokens(service_ai._PROMPT_PREFIX) == math.ceil(len(service_ai._PROMPT_PREFIX) / 4)
+    assert service_ai.get_stats()["token_counter"] == "heuristic"
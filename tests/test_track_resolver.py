@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta
+
+from app.config.config import TRACK_CACHE_NEGATIVE_TTL
+from app.model.track_cache import TrackCacheModel
+from app.service import service_track_cache
+from app.service.service_track import resolve_tracks
+from tests.conftest import FakeSpotify
+
+TRACKS = [{"title": f"Song {i}", "artist": f"Artist {i}"} for i in range(3)]
+
+
+def _uris(resolved):
+    return [item["uri"] for _, item in resolved]
+
+
+def test_second_resolve_is_served_from_memory_then_from_the_table(db):
+    sp = FakeSpotify()
+    first = resolve_tracks(sp, TRACKS, db=db)
+    assert sp.searched == ["Song 0", "Song 1", "Song 2"]
+    assert db.query(TrackCacheModel).count() == 3
+
+    memory_hits = service_track_cache.get_stats()["memory_hits"]
+    assert _uris(resolve_tracks(sp, TRACKS, db=db)) == _uris(first)
+    assert service_track_cache.get_stats()["memory_hits"] == memory_hits + 3
+
+    # Proses lain (LRU kosong) membaca tabel track_cache, tetap tanpa pencarian
+    service_track_cache._memory.clear()
+    db_hits = service_track_cache.get_stats()["db_hits"]
+    assert _uris(resolve_tracks(sp, TRACKS, db=db)) == _uris(first)
+    assert service_track_cache.get_stats()["db_hits"] == db_hits + 3
+    assert len(sp.searched) == 3
+
+
+class _Later(datetime):
+    """datetime whose now() is just past the negative-cache TTL"""
+
+    @classmethod
+    def now(cls, tz=None):
+        return datetime.now(tz) + timedelta(seconds=TRACK_CACHE_NEGATIVE_TTL + 1)
+
+
+def test_negative_entry_blocks_searches_until_it_expires(db, monkeypatch):
+    sp = FakeSpotify()
+    sp.missing = {"Song 1"}
+    assert _uris(resolve_tracks(sp, TRACKS, db=db)) == ["spotify:track:Song 0", "spotify:track:Song 2"]
+
+    resolve_tracks(sp, TRACKS, db=db)
+    assert sp.searched.count("Song 1") == 1
+
+    sp.missing = set()
+    monkeypatch.setattr(service_track_cache, "datetime", _Later)
+    resolved = resolve_tracks(sp, TRACKS, db=db)
+
+    # Hanya entri negatif yang kedaluwarsa; lagu yang ditemukan masih berlaku lebih lama
+    assert sp.searched.count("Song 1") == 2
+    assert sp.searched.count("Song 0") == 1
+    assert "spotify:track:Song 1" in _uris(resolved)
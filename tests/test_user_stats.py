@@ -0,0 +1,76 @@
+import asyncio
+import uuid
+
+from sqlalchemy import select, text
+
+from app.config import database
+from app.model.user_stats import UserGenreStatsModel, UserStatsModel
+from app.schemas.schemas_playlist import PlaylistCreate
+from app.service import service_playlist, service_user_stats
+
+
+def _create(db, spotify_id, pre_mood, genres):
+    return service_playlist.save_playlist(
+        db,
+        PlaylistCreate(id=str(uuid.uuid4()), spotify_id=spotify_id, name="Test", phq9_score=7,
+                       depression_level="Ringan", pre_mood=pre_mood, mode="healing"),
+        [{"title": "Track", "artist": "Artist", "duration": 180000}],
+        genres,
+    )
+
+
+def _snapshot(db, spotify_id):
+    db.expire_all()
+    stats = db.get(UserStatsModel, spotify_id)
+    genres = db.execute(
+        select(UserGenreStatsModel.name, UserGenreStatsModel.count).where(UserGenreStatsModel.spotify_id == spotify_id)
+    ).all()
+    return (
+        (stats.session_count, stats.mood_delta_sum, stats.mood_delta_count, stats.most_frequent_genre),
+        sorted((name, count) for name, count in genres if count),
+    )
+
+
+def _run(coro_factory):
+    async def run():
+        async with database.AsyncSessionLocal() as session:
+            return await coro_factory(session)
+    return asyncio.run(run())
+
+
+def test_incremental_counters_match_a_rebuild(db, user):
+    first = _create(db, user.spotify_id, 3, ["pop", "jazz"])
+    second = _create(db, user.spotify_id, 5, ["pop"])
+    third = _create(db, user.spotify_id, 6, ["rock"])
+
+    _run(lambda session: service_playlist.update_playlist(session, first.id, post_mood=7))
+    _run(lambda session: service_playlist.update_playlist(session, first.id, post_mood=4))
+    _run(lambda session: service_playlist.update_playlist(session, second.id, post_mood=5, feedback="ok"))
+    _run(lambda session: service_playlist.delete_playlist(session, third.id))
+
+    incremental = _snapshot(db, user.spotify_id)
+    assert incremental[0][:3] == (2, 1, 2)
+
+    service_user_stats.rebuild_user_stats(db, user.spotify_id)
+    db.commit()
+    assert _snapshot(db, user.spotify_id) == incremental
+
+
+def test_feedback_uses_the_current_row_not_an_earlier_read(db, user):
+    playlist = _create(db, user.spotify_id, 3, ["pop"])
+
+    async def feedback(session):
+        # Router membaca playlist dulu; sementara itu request lain sudah mengisi post_mood
+        loaded = await service_playlist.get_playlist_by_id(session, playlist.id)
+        await session.commit()
+        with database.SessionLocal() as other:
+            other.execute(text("UPDATE playlist SET post_mood = 8 WHERE id = :id"), {"id": playlist.id})
+            service_user_stats.apply(other, service_user_stats.mood_changed(user.spotify_id, None, 5))
+            other.commit()
+        updated = await service_playlist.update_playlist(session, playlist.id, post_mood=6)
+        assert updated is loaded
+
+    _run(feedback)
+
+    stats, _ = _snapshot(db, user.spotify_id)
+    assert stats[1:3] == (3, 1)